@@ -0,0 +1,32 @@
+"""Process-wide logging/tracing setup shared by the starters."""
+
+from __future__ import annotations
+
+import logging
+
+_observability_initialized = False
+
+
+def init_observability() -> None:
+    """Configure logfire + root logging once per process.
+
+    `run()` may be invoked repeatedly in-process (tests, several bots in one
+    process); re-running `logfire.configure()` / `basicConfig` would stack
+    duplicate logfire state. `basicConfig` is itself a no-op when the
+    embedding application already installed root handlers. The once-flag is
+    only set after setup succeeds, so a failed attempt is retried.
+
+    `logfire` is imported here rather than at module scope so `--help` and
+    import-only users (tests, helper re-exports) skip its import chain.
+    """
+
+    global _observability_initialized
+    if _observability_initialized:
+        return
+
+    import logfire
+
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
+    logging.basicConfig(level=logging.INFO, handlers=[logfire.LogfireLoggingHandler()])
+    _observability_initialized = True
@@ -1,6 +1,7 @@
-"""Telegram long-poll starter.
+"""Telegram long-poll / webhook starter.
 
-This package polls the Telegram Bot API `getUpdates` endpoint and forwards
+This package receives Telegram Bot API updates (long-polling `getUpdates`, or
+pushed to a webhook receiver with `--webhook-url`) and forwards
 keyword-triggered batches of updates to :func:`k.agent.core.agent_run` as an
 `Event` with:
 
@@ -9,7 +10,9 @@ keyword-triggered batches of updates to :func:`k.agent.core.agent_run` as an
 - `content=<newline-delimited update JSON strings>`
 
 Design notes / boundaries:
-- This is a polling (no webhook) starter intended for local/dev usage.
+- Polling is the default and intended for local/dev usage. Webhook mode
+  (`kapy_collections.starters.telegram.webhook`) registers `setWebhook`, serves
+  plain HTTP behind a TLS-terminating proxy, and feeds the same dispatch loop.
 - The forwarded `content` is a newline-delimited stream where each line is a
   Telegram update JSON object.
   - Only definite plain-text message updates are compacted to reduce token usage.
@@ -69,6 +72,7 @@ from .compact import (
     filter_non_forum_topic_created_updates,
     filter_unseen_updates,
     filter_updates_in_time_window,
+    filter_updates_pipeline,
     group_updates_by_chat_id,
     trigger_flags_for_updates,
     update_is_forum_topic_created,
@@ -96,6 +100,7 @@ from .tz import (
     _format_unix_seconds,
     _parse_timezone,
 )
+from .webhook import _webhook_and_run_forever
 
 __all__ = [
     "_DEFAULT_TIMEZONE",
@@ -106,6 +111,7 @@ __all__ = [
     "_format_unix_seconds",
     "_parse_timezone",
     "_poll_and_run_forever",
+    "_webhook_and_run_forever",
     "append_updates_jsonl",
     "chat_group_is_triggered",
     "dispatch_groups_for_batch",
@@ -116,6 +122,7 @@ __all__ = [
     "filter_non_forum_topic_created_updates",
     "filter_unseen_updates",
     "filter_updates_in_time_window",
+    "filter_updates_pipeline",
     "group_updates_by_chat_id",
     "load_last_trigger_update_id_by_chat",
     "load_recent_updates_grouped_by_chat_id",
@@ -0,0 +1,33 @@
+"""JSON codec shared by the Telegram starters.
+
+Used for Bot API responses, webhook and AMQP bodies, and the JSONL update
+store.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_json(raw: bytes | bytearray) -> Any:
+    """Decode a JSON body.
+
+    Parses the raw bytes directly instead of allocating an intermediate UTF-8
+    `str` copy first. Malformed input raises a `ValueError` subclass
+    (`UnicodeDecodeError` or `json.JSONDecodeError`).
+    """
+
+    return json.loads(raw)
+
+
+def dumps_compact(obj: Any) -> str:
+    """Encode `obj` as minified JSON, keeping non-ASCII text unescaped.
+
+    Same output as `json.dumps(obj, ensure_ascii=False, separators=(",", ":"))`,
+    reusing one encoder instead of building it per call.
+    """
+
+    return _COMPACT_ENCODER.encode(obj)
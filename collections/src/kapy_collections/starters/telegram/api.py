@@ -1,94 +1,199 @@
-"""Telegram Bot API client used by the long-poll starter."""
+"""Telegram Bot API client used by the long-poll starter.
+
+Transport notes:
+- Requests go through one lazily created `httpx.AsyncClient` per
+  `TelegramBotApi` instance, so the TLS connection to `api.telegram.org` stays
+  warm across poll cycles and no worker thread is parked for the duration of a
+  long poll.
+- Callers own the client lifecycle and should `await api.aclose()` on shutdown.
+"""
 
 from __future__ import annotations
 
-import json
-import urllib.error
 import urllib.parse
-import urllib.request
-from dataclasses import dataclass
-from typing import Any, Final
+from dataclasses import dataclass, field
+from typing import Any, Final, Literal
+
+import httpx
 
-import anyio.to_thread as to_thread
+from ._json import loads_json
 
 _TELEGRAM_API_BASE: Final[str] = "https://api.telegram.org"
+_DEFAULT_TIMEOUT: Final[httpx.Timeout] = httpx.Timeout(10.0)
+_CLIENT_LIMITS: Final[httpx.Limits] = httpx.Limits(max_keepalive_connections=4)
+# Telegram `getUpdates` `limit` is capped (commonly 100). Use the maximum to
+# drain pending updates without needing a CLI knob.
+_GET_UPDATES_LIMIT: Final[int] = 100
+_MAX_RESPONSE_BYTES: Final[int] = 10 * 1024 * 1024
+_FORM_HEADERS: Final[dict[str, str]] = {
+    "Content-Type": "application/x-www-form-urlencoded"
+}
 
 
 class TelegramBotApiError(RuntimeError):
     """Raised when Telegram Bot API returns a non-ok response or invalid JSON."""
 
 
+async def _read_bounded(
+    resp: httpx.Response,
+    *,
+    method: str,
+    max_bytes: int = _MAX_RESPONSE_BYTES,
+) -> bytearray:
+    """Read a streamed response body into one buffer, enforcing `max_bytes`.
+
+    Telegram responses are small (a full 100-update `getUpdates` batch is
+    typically well under 1 MB); the cap only guards against a misbehaving
+    proxy returning an unbounded body. The contiguous `bytearray` is accepted
+    as-is by both JSON decoders.
+    """
+
+    declared = resp.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise TelegramBotApiError(f"Telegram {method} failed: response too large")
+
+    buf = bytearray()
+    async for chunk in resp.aiter_bytes():
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise TelegramBotApiError(f"Telegram {method} failed: response too large")
+    return buf
+
+
+def _encode_form(data: dict[str, Any]) -> bytes:
+    """URL-encode form fields into a request body.
+
+    Values are UTF-8 encoded up front and quoted with `quote_from_bytes`, so
+    long `text` payloads go through a single bytes quoting pass instead of
+    the str -> bytes round trip inside `quote_plus` (and httpx's own per-field
+    normalisation of `data=`). Output matches `urlencode(...,
+    quote_via=quote)` on the same fields.
+    """
+
+    quote = urllib.parse.quote_from_bytes
+    return "&".join(
+        quote(k.encode("utf-8"), "")
+        + "="
+        + quote((v if isinstance(v, str) else str(v)).encode("utf-8"), "")
+        for k, v in data.items()
+    ).encode("ascii")
+
+
 @dataclass(slots=True)
 class TelegramBotApi:
-    """Minimal Telegram Bot API client for `getUpdates` polling."""
+    """Minimal Telegram Bot API client for `getUpdates` polling and webhooks.
+
+    State: `_client` is created on first request and reused until `aclose()`.
+    A closed instance transparently creates a fresh client on the next call.
+    `_method_urls` memoizes per-method URLs as parsed `httpx.URL` objects (httpx
+    would otherwise re-parse the URL string on every request), so `token` must
+    not be reassigned after the first request.
+    """
 
     token: str
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _method_urls: dict[str, httpx.URL] = field(
+        default_factory=dict, init=False, repr=False
+    )
 
-    def _method_url(self, method: str) -> str:
+    def _method_url(self, method: str) -> httpx.URL:
         # Never log/print this URL; it embeds the bot token.
-        return f"{_TELEGRAM_API_BASE}/bot{self.token}/{method}"
-
-    def _send_message_sync(
+        url = self._method_urls.get(method)
+        if url is None:
+            url = httpx.URL(f"{_TELEGRAM_API_BASE}/bot{self.token}/{method}")
+            self._method_urls[method] = url
+        return url
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        client = self._client
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=_DEFAULT_TIMEOUT, limits=_CLIENT_LIMITS)
+            self._client = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (idempotent)."""
+
+        client = self._client
+        self._client = None
+        if client is not None:
+            await client.aclose()
+
+    async def _call(
         self,
+        method: str,
         *,
-        chat_id: int,
-        text: str,
-        reply_to_message_id: int | None = None,
-        message_thread_id: int | None = None,
-        parse_mode: str = "HTML",
-    ) -> dict[str, Any]:
-        params: dict[str, Any] = {
-            "chat_id": chat_id,
-            "text": text,
-            "parse_mode": parse_mode,
-        }
-        if reply_to_message_id is not None:
-            params["reply_to_message_id"] = reply_to_message_id
-        if message_thread_id is not None:
-            params["message_thread_id"] = message_thread_id
-
-        data = urllib.parse.urlencode(params).encode("utf-8")
-        request = urllib.request.Request(
-            self._method_url("sendMessage"),
-            data=data,
-            method="POST",
-        )
-        request.add_header("Content-Type", "application/x-www-form-urlencoded")
+        http_method: Literal["GET", "POST"] = "GET",
+        query: str = "",
+        data: dict[str, Any] | None = None,
+        timeout: httpx.Timeout | None = None,
+        expect: type = object,
+    ) -> Any:
+        """Invoke a Bot API method and return its `result` payload.
+
+        This is the single request chokepoint: transport, JSON decoding and the
+        `ok`/`result` envelope checks live here so every method shares them.
+
+        Args:
+            query: Pre-encoded query string (without `?`) appended to the URL.
+            data: Form fields for POST requests (see `_encode_form`).
+            timeout: Per-call override of the client default timeout.
+            expect: Required type of `result`.
+
+        Raises:
+            TelegramBotApiError: on network/HTTP errors, invalid JSON, a non-ok
+                envelope, or a `result` that is not an `expect` instance. The
+                message names `method` but never the URL (it embeds the token).
+        """
 
+        url = self._method_url(method)
+        if query:
+            # Stay on the cached parsed URL: a `str` here would be re-parsed
+            # by httpx on every poll.
+            url = url.copy_with(query=query.encode("ascii"))
+        client = self._ensure_client()
+        if http_method == "POST":
+            request = client.build_request(
+                "POST",
+                url,
+                content=_encode_form(data) if data else b"",
+                headers=_FORM_HEADERS,
+                timeout=timeout or _DEFAULT_TIMEOUT,
+            )
+        else:
+            request = client.build_request(
+                "GET", url, timeout=timeout or _DEFAULT_TIMEOUT
+            )
         try:
-            with urllib.request.urlopen(request, timeout=10) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
-            raise TelegramBotApiError(
-                f"Telegram sendMessage failed: HTTP {e.code}"
-            ) from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError(
-                "Telegram sendMessage failed: network error"
-            ) from e
+            resp = await client.send(request, stream=True)
+            try:
+                if resp.is_error:
+                    raise TelegramBotApiError(
+                        f"Telegram {method} failed: HTTP {resp.status_code}"
+                    )
+                raw = await _read_bounded(resp, method=method)
+            finally:
+                await resp.aclose()
+        except httpx.HTTPError as e:  # pragma: no cover (network dependent)
+            raise TelegramBotApiError(f"Telegram {method} failed: network error") from e
 
         try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError(
-                "Telegram sendMessage failed: invalid JSON"
-            ) from e
+            payload = loads_json(raw)
+        except ValueError as e:
+            raise TelegramBotApiError(f"Telegram {method} failed: invalid JSON") from e
 
         if not isinstance(payload, dict) or payload.get("ok") is not True:
             desc = payload.get("description") if isinstance(payload, dict) else None
             raise TelegramBotApiError(
-                "Telegram sendMessage failed"
+                f"Telegram {method} failed"
                 + (f": {desc}" if isinstance(desc, str) and desc else "")
             )
 
         result = payload.get("result")
-        if not isinstance(result, dict):
+        if not isinstance(result, expect):
             raise TelegramBotApiError(
-                "Telegram sendMessage failed: missing result dict"
+                f"Telegram {method} failed: missing result {expect.__name__}"
             )
-
         return result
 
     async def send_message(
@@ -98,129 +203,89 @@ class TelegramBotApi:
         text: str,
         reply_to_message_id: int | None = None,
         message_thread_id: int | None = None,
+        parse_mode: str = "HTML",
     ) -> dict[str, Any]:
-        """Send a message via `sendMessage` (async wrapper).
+        """Send a message via `sendMessage`.
 
         Uses `parse_mode="HTML"` by default.
         """
 
         # Keep a minimal guard to avoid Telegram rejecting NUL-containing strings.
         safe_text = text.replace("\x00", "\ufffd")
-        return await to_thread.run_sync(
-            lambda: self._send_message_sync(
-                chat_id=chat_id,
-                text=safe_text,
-                reply_to_message_id=reply_to_message_id,
-                message_thread_id=message_thread_id,
-                parse_mode="HTML",
-            )
-        )
+        params: dict[str, Any] = {
+            "chat_id": chat_id,
+            "text": safe_text,
+            "parse_mode": parse_mode,
+        }
+        if reply_to_message_id is not None:
+            params["reply_to_message_id"] = reply_to_message_id
+        if message_thread_id is not None:
+            params["message_thread_id"] = message_thread_id
 
-    def _get_me_sync(self) -> dict[str, Any]:
-        request = urllib.request.Request(self._method_url("getMe"), method="GET")
-        try:
-            with urllib.request.urlopen(request, timeout=10) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
-            raise TelegramBotApiError(f"Telegram getMe failed: HTTP {e.code}") from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError("Telegram getMe failed: network error") from e
+        return await self._call(
+            "sendMessage", http_method="POST", data=params, expect=dict
+        )
 
-        try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError("Telegram getMe failed: invalid JSON") from e
+    async def get_me(self) -> dict[str, Any]:
+        """Fetch bot metadata via `getMe`."""
 
-        if not isinstance(payload, dict) or payload.get("ok") is not True:
-            desc = payload.get("description") if isinstance(payload, dict) else None
-            raise TelegramBotApiError(
-                "Telegram getMe failed"
-                + (f": {desc}" if isinstance(desc, str) and desc else "")
-            )
+        return await self._call("getMe", expect=dict)
 
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramBotApiError("Telegram getMe failed: missing result dict")
+    async def set_webhook(
+        self,
+        *,
+        url: str,
+        secret_token: str,
+        max_connections: int = 1,
+    ) -> None:
+        """Register `url` as the push target via `setWebhook`.
+
+        `max_connections=1` makes Telegram deliver updates sequentially, which
+        keeps `update_id` order intact for the consumed-cursor dedupe.
+        """
 
-        return result
+        await self._call(
+            "setWebhook",
+            http_method="POST",
+            data={
+                "url": url,
+                "secret_token": secret_token,
+                "max_connections": max_connections,
+            },
+        )
 
-    async def get_me(self) -> dict[str, Any]:
-        """Fetch bot metadata via `getMe` (async wrapper)."""
+    async def delete_webhook(self) -> None:
+        """Remove the webhook via `deleteWebhook` so `getUpdates` works again."""
 
-        return await to_thread.run_sync(self._get_me_sync)
+        await self._call("deleteWebhook", http_method="POST")
 
-    def _get_updates_sync(
+    async def get_updates(
         self,
         *,
         offset: int | None,
         timeout_seconds: int,
     ) -> list[dict[str, Any]]:
-        params: dict[str, Any] = {
-            "timeout": timeout_seconds,
-            # Telegram `getUpdates` `limit` is capped (commonly 100). Use the
-            # maximum to drain pending updates without needing a CLI knob.
-            "limit": 10,
-        }
-        if offset is not None:
-            params["offset"] = offset
-
-        url = f"{self._method_url('getUpdates')}?{urllib.parse.urlencode(params)}"
-        request = urllib.request.Request(url, method="GET")
-
-        # Client timeout should exceed server long-poll timeout.
-        client_timeout = max(5, timeout_seconds + 15)
-        try:
-            with urllib.request.urlopen(request, timeout=client_timeout) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
-            raise TelegramBotApiError(
-                f"Telegram getUpdates failed: HTTP {e.code}"
-            ) from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError(
-                "Telegram getUpdates failed: network error"
-            ) from e
+        """Long-poll `getUpdates`.
 
-        try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError("Telegram getUpdates failed: invalid JSON") from e
+        The read timeout is widened per call so it always exceeds the
+        server-side long-poll window.
+        """
 
-        if not isinstance(payload, dict) or payload.get("ok") is not True:
-            desc = payload.get("description") if isinstance(payload, dict) else None
-            raise TelegramBotApiError(
-                "Telegram getUpdates failed"
-                + (f": {desc}" if isinstance(desc, str) and desc else "")
-            )
+        # Every query value is an int, so there is nothing to percent-encode;
+        # formatting the query directly keeps `urlencode`-style work and a
+        # params dict off the per-poll path.
+        query = f"timeout={timeout_seconds}&limit={_GET_UPDATES_LIMIT}"
+        if offset is not None:
+            query += f"&offset={offset}"
 
-        result = payload.get("result")
-        if not isinstance(result, list):
-            raise TelegramBotApiError("Telegram getUpdates failed: missing result list")
+        # Client timeout should exceed server long-poll timeout.
+        client_timeout = httpx.Timeout(max(5, timeout_seconds + 15), connect=10.0)
+        result = await self._call(
+            "getUpdates", query=query, timeout=client_timeout, expect=list
+        )
 
         updates: list[dict[str, Any]] = []
         for item in result:
             if isinstance(item, dict):
                 updates.append(item)
         return updates
-
-    async def get_updates(
-        self,
-        *,
-        offset: int | None,
-        timeout_seconds: int,
-    ) -> list[dict[str, Any]]:
-        """Long-poll `getUpdates` (async wrapper).
-
-        Note: stdlib `urllib` is blocking; this runs the request in a worker
-        thread so the polling loop and agent tasks remain async-friendly.
-        """
-
-        return await to_thread.run_sync(
-            lambda: self._get_updates_sync(
-                offset=offset, timeout_seconds=timeout_seconds
-            )
-        )
@@ -3,29 +3,25 @@
 from __future__ import annotations
 
 import argparse
-import logging
-import re
 from pathlib import Path
-from typing import TYPE_CHECKING, Final
-
-import logfire
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pydantic_ai.models import Model
 
 from k.config import Config
 
+from .._observability import init_observability
 from .compact import _expand_chat_id_watchlist
 from .runner import _poll_and_run_forever
 from .tz import _DEFAULT_TIMEZONE, _parse_timezone
-
-_ID_SPLIT_RE: Final[re.Pattern[str]] = re.compile(r"[,\s]+")
+from .webhook import _webhook_and_run_forever
 
 
 def _parse_cli_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="telegram",
-        description="Telegram long-poll starter (getUpdates -> agent_run).",
+        description="Telegram starter (getUpdates long-poll or webhook -> agent_run).",
     )
     parser.add_argument(
         "--model-name",
@@ -77,6 +73,33 @@ def _parse_cli_args(argv: list[str] | None = None) -> argparse.Namespace:
         help="Timezone for rendering compacted update `date` fields (default: UTC+8). "
         "Accepts IANA names (e.g. 'Asia/Shanghai') or offsets (e.g. 'UTC+8', '+08:00').",
     )
+    parser.add_argument(
+        "--webhook-url",
+        default="",
+        help=(
+            "Optional public https:// URL. When set, register it via setWebhook "
+            "and receive pushed updates instead of polling getUpdates."
+        ),
+    )
+    parser.add_argument(
+        "--webhook-host",
+        default="0.0.0.0",
+        help="Listen address for the webhook receiver (plain HTTP; put TLS in front).",
+    )
+    parser.add_argument(
+        "--webhook-port",
+        type=int,
+        default=8443,
+        help="Listen port for the webhook receiver.",
+    )
+    parser.add_argument(
+        "--webhook-secret",
+        default="",
+        help=(
+            "Optional webhook secret token (never printed). "
+            "A random one is generated per run when omitted."
+        ),
+    )
     return parser.parse_args(argv)
 
 
@@ -90,15 +113,18 @@ async def run(
     timeout_seconds: int = 60,
     updates_store_path: str = "",
     dispatch_recent_per_chat: int = 0,
+    webhook_url: str = "",
+    webhook_host: str = "0.0.0.0",
+    webhook_port: int = 8443,
+    webhook_secret: str = "",
 ) -> None:
     """Function entrypoint.
 
     `model` is required so callers must make an explicit model choice.
+    A non-empty `webhook_url` switches from long-polling to webhook mode.
     """
 
-    logfire.configure()
-    logfire.instrument_pydantic_ai()
-    logging.basicConfig(level=logging.INFO, handlers=[logfire.LogfireLoggingHandler()])
+    init_observability()
 
     config = Config()  # type: ignore[call-arg]
 
@@ -107,14 +133,15 @@ async def run(
     except ValueError as e:
         raise ValueError(f"Invalid timezone: {e}") from e
 
-    chat_ids: set[int] | None
+    chat_ids: frozenset[int] | None
     raw_chat_ids = str(chat_id).strip()
     if not raw_chat_ids:
         chat_ids = None
     else:
-        parts = [p for p in _ID_SPLIT_RE.split(raw_chat_ids) if p]
+        # Treat commas as whitespace; bare `split()` drops empty runs.
+        parts = raw_chat_ids.replace(",", " ").split()
         try:
-            chat_ids = {int(p) for p in parts}
+            chat_ids = frozenset(map(int, parts))
         except ValueError as e:
             raise ValueError(f"Invalid chat_id entry in: {raw_chat_ids!r}") from e
         chat_ids = _expand_chat_id_watchlist(chat_ids)
@@ -126,6 +153,23 @@ async def run(
     else:
         store_path = None
 
+    if str(webhook_url).strip():
+        await _webhook_and_run_forever(
+            config=config,
+            model=model,
+            token=token,
+            webhook_url=str(webhook_url).strip(),
+            listen_host=webhook_host,
+            listen_port=webhook_port,
+            secret_token=webhook_secret,
+            keyword=keyword,
+            chat_ids=chat_ids,
+            updates_store_path=store_path,
+            dispatch_recent_per_chat=dispatch_recent_per_chat,
+            tz=tz,
+        )
+        return
+
     await _poll_and_run_forever(
         config=config,
         model=model,
@@ -151,4 +195,8 @@ async def main() -> None:
         timeout_seconds=args.timeout_seconds,
         updates_store_path=args.updates_store_path,
         dispatch_recent_per_chat=args.dispatch_recent_per_chat,
+        webhook_url=args.webhook_url,
+        webhook_host=args.webhook_host,
+        webhook_port=args.webhook_port,
+        webhook_secret=args.webhook_secret,
     )
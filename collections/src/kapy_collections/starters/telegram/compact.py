@@ -5,18 +5,26 @@ fields while preserving routing-critical ids (`chat.id`, `from.id`) and the
 human-readable content (`text` / `caption` / `data`). For readability, unix
 seconds `date` values are rendered as ISO-8601 strings, with the original value
 preserved as `date_unix`.
+
+Type checks on update fields use `type(x) is dict/str/int/list` rather than
+`isinstance`: decoded JSON only ever yields those exact builtin types, the
+identity compare is cheaper on these hot paths, and it rejects `bool` where an
+id or date is expected.
 """
 
 from __future__ import annotations
 
 import datetime
-import json
-from collections import defaultdict
+import functools
+from collections.abc import Callable
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
 from typing import Any, Final
 
 from .tz import _format_unix_seconds
 
-_SUPERGROUP_ID_PREFIX: Final[str] = "100"
+# Supergroup/channel ids are `-100` followed by the bare id digits.
+_SUPERGROUP_ID_PREFIX: Final[int] = 100
 _UPDATE_DATE_PATHS: Final[tuple[tuple[str, ...], ...]] = (
     ("message", "date"),
     ("edited_message", "date"),
@@ -73,18 +81,40 @@ _REPLY_TO_FROM_USERNAME_PATHS: Final[tuple[tuple[str, ...], ...]] = (
     ("message", "reply_to_message", "from", "username"),
     ("edited_message", "reply_to_message", "from", "username"),
 )
-_FORUM_TOPIC_CREATED_PATHS: Final[tuple[tuple[str, ...], ...]] = (
-    ("message", "forum_topic_created"),
-    ("edited_message", "forum_topic_created"),
-    ("channel_post", "forum_topic_created"),
-    ("edited_channel_post", "forum_topic_created"),
-    ("callback_query", "message", "forum_topic_created"),
-    ("business_message", "forum_topic_created"),
-    ("edited_business_message", "forum_topic_created"),
+# Closed sets of short strings repeated across every update. Mapping parsed
+# values to these canonical (interned literal) instances lets compacted
+# batches share one object per value instead of one per update.
+_CHAT_TYPES: Final[dict[str, str]] = {
+    t: t for t in ("private", "group", "supergroup", "channel")
+}
+_CHAT_MEMBER_STATUSES: Final[dict[str, str]] = {
+    s: s for s in ("creator", "administrator", "member", "restricted", "left", "kicked")
+}
+# Media message keys compacted down to their `file_id` / `file_unique_id`.
+_DOCUMENT_LIKE_KEYS: Final[tuple[str, ...]] = (
+    "document",
+    "video",
+    "audio",
+    "voice",
+    "animation",
+    "sticker",
+    "video_note",
+)
+# Message-like payload keys that can carry `forum_topic_created` directly
+# (`callback_query.message` is checked separately).
+_FORUM_TOPIC_MESSAGE_KEYS: Final[frozenset[str]] = frozenset(
+    {
+        "message",
+        "edited_message",
+        "channel_post",
+        "edited_channel_post",
+        "business_message",
+        "edited_business_message",
+    }
 )
 
 
-def _expand_chat_id_watchlist(chat_ids: set[int]) -> set[int]:
+def _expand_chat_id_watchlist(chat_ids: AbstractSet[int]) -> frozenset[int]:
     """Expand a chat-id watchlist to be resilient to Telegram supergroup IDs.
 
     Telegram supergroup/channel chat ids are often presented with a `-100...`
@@ -92,21 +122,28 @@ def _expand_chat_id_watchlist(chat_ids: set[int]) -> set[int]:
     `-1886218691` form from other places. To reduce footguns, expand the
     watchlist to include both forms when the number appears to be a supergroup
     variant.
+
+    The result is a `frozenset` since the watchlist is fixed for the lifetime
+    of a starter and only used for membership tests.
     """
 
     expanded: set[int] = set(chat_ids)
-    for chat_id in list(chat_ids):
+    for chat_id in chat_ids:
         if chat_id >= 0:
             continue
 
-        abs_str = str(abs(chat_id))
-        if abs_str.startswith(_SUPERGROUP_ID_PREFIX) and len(abs_str) > 3:
-            expanded.add(-int(abs_str[3:]))
-            continue
+        n = -chat_id
+        # Chat ids are at most 64-bit, so `str()` is cheap here.
+        ndigits = len(str(n))
+        if ndigits > 3:
+            scale = 10 ** (ndigits - 3)
+            if n // scale == _SUPERGROUP_ID_PREFIX:
+                expanded.add(-(n - _SUPERGROUP_ID_PREFIX * scale))
+                continue
 
-        expanded.add(-int(_SUPERGROUP_ID_PREFIX + abs_str))
+        expanded.add(-(_SUPERGROUP_ID_PREFIX * 10**ndigits + n))
 
-    return expanded
+    return frozenset(expanded)
 
 
 def _compact_telegram_update(
@@ -130,29 +167,13 @@ def _compact_telegram_update(
 
     out: dict[str, Any] = {}
     update_id = update.get("update_id")
-    if isinstance(update_id, int):
+    if type(update_id) is int:
         out["update_id"] = update_id
 
     for key, val in update.items():
         if key == "update_id":
             continue
-        if key in {
-            "message",
-            "edited_message",
-            "channel_post",
-            "edited_channel_post",
-            "business_message",
-            "edited_business_message",
-        }:
-            compacted = _compact_message(val, tz=tz)
-        elif key == "callback_query":
-            compacted = _compact_callback_query(val, tz=tz)
-        elif key in {"my_chat_member", "chat_member"}:
-            compacted = _compact_chat_member_update(val, tz=tz)
-        elif key == "chat_join_request":
-            compacted = _compact_chat_join_request(val, tz=tz)
-        else:
-            compacted = _compact_generic(val, tz=tz)
+        compacted = _COMPACT_HANDLERS.get(key, _compact_generic)(val, tz=tz)
 
         if compacted is not None:
             out[key] = compacted
@@ -160,58 +181,61 @@ def _compact_telegram_update(
     return out
 
 
+def _display_name(first: Any, last: Any) -> str:
+    """Join `first_name`/`last_name` into a display name ("" if neither is set).
+
+    Only joins when both parts are non-empty; otherwise returns the single
+    part without building a concatenated temporary.
+    """
+
+    first_s = first if type(first) is str else ""
+    last_s = last if type(last) is str else ""
+    if first_s and last_s:
+        return f"{first_s} {last_s}".strip()
+    return (first_s or last_s).strip()
+
+
 def _compact_user(user: Any) -> dict[str, Any] | None:
-    if not isinstance(user, dict):
+    if type(user) is not dict:
         return None
     user_id = user.get("id")
-    if not isinstance(user_id, int):
+    if type(user_id) is not int:
         return None
 
     out: dict[str, Any] = {"id": user_id}
     username = user.get("username")
-    if isinstance(username, str) and username:
+    if type(username) is str and username:
         out["username"] = username
 
-    first = user.get("first_name")
-    last = user.get("last_name")
-    if isinstance(first, str) or isinstance(last, str):
-        first_s = first if isinstance(first, str) else ""
-        last_s = last if isinstance(last, str) else ""
-        name = (first_s + (" " if first_s and last_s else "") + last_s).strip()
-        if name:
-            out["name"] = name
+    name = _display_name(user.get("first_name"), user.get("last_name"))
+    if name:
+        out["name"] = name
 
     return out
 
 
 def _compact_chat(chat: Any) -> dict[str, Any] | None:
-    if not isinstance(chat, dict):
+    if type(chat) is not dict:
         return None
     chat_id = chat.get("id")
-    if not isinstance(chat_id, int):
+    if type(chat_id) is not int:
         return None
 
     out: dict[str, Any] = {"id": chat_id}
     chat_type = chat.get("type")
-    if isinstance(chat_type, str) and chat_type:
-        out["type"] = chat_type
+    if type(chat_type) is str and chat_type:
+        out["type"] = _CHAT_TYPES.get(chat_type, chat_type)
 
     title = chat.get("title")
-    if isinstance(title, str) and title:
+    if type(title) is str and title:
         out["title"] = title
 
     username = chat.get("username")
-    if isinstance(username, str) and username:
+    if type(username) is str and username:
         out["username"] = username
 
-    first = chat.get("first_name")
-    last = chat.get("last_name")
-    if (not title and not username) and (
-        isinstance(first, str) or isinstance(last, str)
-    ):
-        first_s = first if isinstance(first, str) else ""
-        last_s = last if isinstance(last, str) else ""
-        name = (first_s + (" " if first_s and last_s else "") + last_s).strip()
+    if not title and not username:
+        name = _display_name(chat.get("first_name"), chat.get("last_name"))
         if name:
             out["name"] = name
 
@@ -219,31 +243,18 @@ def _compact_chat(chat: Any) -> dict[str, Any] | None:
 
 
 def _compact_photo_sizes(photo: Any) -> dict[str, Any] | None:
-    if not isinstance(photo, list) or not photo:
+    if type(photo) is not list or not photo:
         return None
     # Telegram sends multiple sizes; keep the biggest (typically last).
     last = photo[-1]
-    if not isinstance(last, dict):
+    if type(last) is not dict:
         return None
     out: dict[str, Any] = {}
     file_id = last.get("file_id")
-    if isinstance(file_id, str) and file_id:
+    if type(file_id) is str and file_id:
         out["file_id"] = file_id
     file_unique_id = last.get("file_unique_id")
-    if isinstance(file_unique_id, str) and file_unique_id:
-        out["file_unique_id"] = file_unique_id
-    return out or None
-
-
-def _compact_document_like(doc: Any) -> dict[str, Any] | None:
-    if not isinstance(doc, dict):
-        return None
-    out: dict[str, Any] = {}
-    file_id = doc.get("file_id")
-    if isinstance(file_id, str) and file_id:
-        out["file_id"] = file_id
-    file_unique_id = doc.get("file_unique_id")
-    if isinstance(file_unique_id, str) and file_unique_id:
+    if type(file_unique_id) is str and file_unique_id:
         out["file_unique_id"] = file_unique_id
     return out or None
 
@@ -251,20 +262,45 @@ def _compact_document_like(doc: Any) -> dict[str, Any] | None:
 def _message_is_forum_topic_created(message: Any) -> bool:
     """Whether a message-like payload is a forum-topic-created service event."""
 
-    return isinstance(message, dict) and "forum_topic_created" in message
+    return type(message) is dict and "forum_topic_created" in message
 
 
 def _compact_message(msg: Any, *, tz: datetime.tzinfo) -> dict[str, Any] | None:
-    if not isinstance(msg, dict):
+    """Compact a message-like payload, including one level of reply context.
+
+    Telegram does not nest `reply_to_message` inside a replied-to message, so
+    the reply is compacted with `_compact_message_shallow` directly instead of
+    recursing.
+    """
+
+    if type(msg) is not dict:
+        return None
+
+    reply: dict[str, Any] | None = None
+    reply_to = msg.get("reply_to_message")
+    if type(reply_to) is dict and not _message_is_forum_topic_created(reply_to):
+        reply = _compact_message_shallow(reply_to, tz=tz)
+    return _compact_message_shallow(msg, tz=tz, reply=reply)
+
+
+def _compact_message_shallow(
+    msg: Any, *, tz: datetime.tzinfo, reply: dict[str, Any] | None = None
+) -> dict[str, Any] | None:
+    """Compact a message-like payload without looking at `reply_to_message`.
+
+    `reply` is an already compacted reply, emitted as `reply_to_message`.
+    """
+
+    if type(msg) is not dict:
         return None
 
     out: dict[str, Any] = {}
     message_id = msg.get("message_id")
-    if isinstance(message_id, int):
+    if type(message_id) is int:
         out["message_id"] = message_id
 
     date = msg.get("date")
-    if isinstance(date, int):
+    if type(date) is int:
         out["date"] = _format_unix_seconds(date, tz=tz)
         out["date_unix"] = date
 
@@ -277,40 +313,39 @@ def _compact_message(msg: Any, *, tz: datetime.tzinfo) -> dict[str, Any] | None:
         out["from"] = sender
 
     text = msg.get("text")
-    if isinstance(text, str) and text:
+    if type(text) is str and text:
         out["text"] = text
 
     caption = msg.get("caption")
-    if isinstance(caption, str) and caption:
+    if type(caption) is str and caption:
         out["caption"] = caption
 
     # Entities are verbose and primarily describe formatting; drop them to reduce tokens.
 
-    reply_to = msg.get("reply_to_message")
-    if isinstance(reply_to, dict) and not _message_is_forum_topic_created(reply_to):
-        compact_reply = _compact_message(reply_to, tz=tz)
-        if compact_reply:
-            out["reply_to_message"] = compact_reply
+    if reply:
+        out["reply_to_message"] = reply
 
     photo = _compact_photo_sizes(msg.get("photo"))
     if photo is not None:
         out["photo"] = photo
 
-    for k in (
-        "document",
-        "video",
-        "audio",
-        "voice",
-        "animation",
-        "sticker",
-        "video_note",
-    ):
-        compacted = _compact_document_like(msg.get(k))
-        if compacted is not None:
-            out[k] = compacted
+    # Keep only the file ids of each media payload (hot per message).
+    for k in _DOCUMENT_LIKE_KEYS:
+        doc = msg.get(k)
+        if type(doc) is not dict:
+            continue
+        file_id = doc.get("file_id")
+        file_unique_id = doc.get("file_unique_id")
+        if type(file_id) is str and file_id:
+            media: dict[str, Any] = {"file_id": file_id}
+            if type(file_unique_id) is str and file_unique_id:
+                media["file_unique_id"] = file_unique_id
+            out[k] = media
+        elif type(file_unique_id) is str and file_unique_id:
+            out[k] = {"file_unique_id": file_unique_id}
 
     location = msg.get("location")
-    if isinstance(location, dict):
+    if type(location) is dict:
         loc_out: dict[str, Any] = {}
         lat = location.get("latitude")
         lon = location.get("longitude")
@@ -325,12 +360,12 @@ def _compact_message(msg: Any, *, tz: datetime.tzinfo) -> dict[str, Any] | None:
 
 
 def _compact_callback_query(val: Any, *, tz: datetime.tzinfo) -> dict[str, Any] | None:
-    if not isinstance(val, dict):
+    if type(val) is not dict:
         return None
 
     out: dict[str, Any] = {}
     cid = val.get("id")
-    if isinstance(cid, str) and cid:
+    if type(cid) is str and cid:
         out["id"] = cid
 
     sender = _compact_user(val.get("from"))
@@ -342,7 +377,7 @@ def _compact_callback_query(val: Any, *, tz: datetime.tzinfo) -> dict[str, Any]
         out["message"] = message
 
     data = val.get("data")
-    if isinstance(data, str) and data:
+    if type(data) is str and data:
         out["data"] = data
 
     return out or None
@@ -351,7 +386,7 @@ def _compact_callback_query(val: Any, *, tz: datetime.tzinfo) -> dict[str, Any]
 def _compact_chat_member_update(
     val: Any, *, tz: datetime.tzinfo
 ) -> dict[str, Any] | None:
-    if not isinstance(val, dict):
+    if type(val) is not dict:
         return None
 
     out: dict[str, Any] = {}
@@ -364,19 +399,19 @@ def _compact_chat_member_update(
         out["from"] = sender
 
     date = val.get("date")
-    if isinstance(date, int):
+    if type(date) is int:
         out["date"] = _format_unix_seconds(date, tz=tz)
         out["date_unix"] = date
 
     new_member = val.get("new_chat_member")
-    if isinstance(new_member, dict):
+    if type(new_member) is dict:
         nco: dict[str, Any] = {}
         user = _compact_user(new_member.get("user"))
         if user is not None:
             nco["user"] = user
         status = new_member.get("status")
-        if isinstance(status, str) and status:
-            nco["status"] = status
+        if type(status) is str and status:
+            nco["status"] = _CHAT_MEMBER_STATUSES.get(status, status)
         if nco:
             out["new_chat_member"] = nco
 
@@ -386,7 +421,7 @@ def _compact_chat_member_update(
 def _compact_chat_join_request(
     val: Any, *, tz: datetime.tzinfo
 ) -> dict[str, Any] | None:
-    if not isinstance(val, dict):
+    if type(val) is not dict:
         return None
     out: dict[str, Any] = {}
     chat = _compact_chat(val.get("chat"))
@@ -396,24 +431,24 @@ def _compact_chat_join_request(
     if sender is not None:
         out["from"] = sender
     date = val.get("date")
-    if isinstance(date, int):
+    if type(date) is int:
         out["date"] = _format_unix_seconds(date, tz=tz)
         out["date_unix"] = date
     bio = val.get("bio")
-    if isinstance(bio, str) and bio:
+    if type(bio) is str and bio:
         out["bio"] = bio
     return out or None
 
 
 def _compact_generic(val: Any, *, tz: datetime.tzinfo) -> Any | None:
     # For unknown update types, keep only a small set of universally useful keys.
-    if isinstance(val, dict):
+    if type(val) is dict:
         out: dict[str, Any] = {}
 
         # Keep id/date first for readability.
         for k in ("id", "date"):
             v = val.get(k)
-            if k == "date" and isinstance(v, int):
+            if k == "date" and type(v) is int:
                 out["date"] = _format_unix_seconds(v, tz=tz)
                 out["date_unix"] = v
             elif isinstance(v, (int, str)):
@@ -428,16 +463,16 @@ def _compact_generic(val: Any, *, tz: datetime.tzinfo) -> Any | None:
             out["from"] = sender
 
         text = val.get("text")
-        if isinstance(text, str) and text:
+        if type(text) is str and text:
             out["text"] = text
         caption = val.get("caption")
-        if isinstance(caption, str) and caption:
+        if type(caption) is str and caption:
             out["caption"] = caption
         data = val.get("data")
-        if isinstance(data, str) and data:
+        if type(data) is str and data:
             out["data"] = data
         query = val.get("query")
-        if isinstance(query, str) and query:
+        if type(query) is str and query:
             out["query"] = query
 
         return out or None
@@ -449,11 +484,28 @@ def _compact_generic(val: Any, *, tz: datetime.tzinfo) -> Any | None:
     return None
 
 
+# Update payload key -> compaction handler; keys not listed use
+# `_compact_generic`. One dict probe per key replaces a chain of membership
+# tests in `_compact_telegram_update`.
+_COMPACT_HANDLERS: Final[dict[str, Callable[..., Any | None]]] = {
+    "message": _compact_message,
+    "edited_message": _compact_message,
+    "channel_post": _compact_message,
+    "edited_channel_post": _compact_message,
+    "business_message": _compact_message,
+    "edited_business_message": _compact_message,
+    "callback_query": _compact_callback_query,
+    "my_chat_member": _compact_chat_member_update,
+    "chat_member": _compact_chat_member_update,
+    "chat_join_request": _compact_chat_join_request,
+}
+
+
 def extract_update_id(update: dict[str, Any]) -> int | None:
     """Extract `update_id` from a Telegram update dict (or return `None`)."""
 
     update_id = update.get("update_id")
-    if isinstance(update_id, int):
+    if type(update_id) is int:
         return update_id
     return None
 
@@ -463,81 +515,144 @@ def filter_unseen_updates(
     *,
     last_processed_update_id: int | None,
 ) -> list[dict[str, Any]]:
-    """Filter out updates that are already processed or duplicates in the batch."""
+    """Filter out updates that are already processed or duplicates in the batch.
 
-    res: list[dict[str, Any]] = []
-    seen: set[int] = set()
+    A single insertion-ordered dict serves as both the seen-set and the result
+    (first occurrence of each id wins).
+    """
 
+    unseen: dict[int, dict[str, Any]] = {}
     for update in updates:
-        update_id = extract_update_id(update)
-        if update_id is None:
+        update_id = update.get("update_id")
+        if type(update_id) is not int:
             continue
         if (
             last_processed_update_id is not None
             and update_id <= last_processed_update_id
         ):
             continue
-        if update_id in seen:
-            continue
-        seen.add(update_id)
-        res.append(update)
+        if update_id not in unseen:
+            unseen[update_id] = update
+
+    return list(unseen.values())
 
-    return res
 
+def _compile_path_getter(path: tuple[str, ...]) -> Callable[[dict[str, Any]], Any]:
+    """Compile a nested key path into a straight-line getter.
 
-def _extract_nested_int(update: dict[str, Any], path: tuple[str, ...]) -> int | None:
-    cur: Any = update
-    for key in path:
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(key)
-    return cur if isinstance(cur, int) else None
+    The getter returns the value at `path`, or `None` when an intermediate
+    value is missing or not a dict. Paths of length <= 4 (all paths used in
+    this module) are unrolled so lookups avoid the per-key loop and tuple
+    indexing of a generic walk.
+    """
 
+    if len(path) == 1:
+        (k1,) = path
 
-def _extract_first_int(
-    update: dict[str, Any], paths: tuple[tuple[str, ...], ...]
-) -> int | None:
-    for path in paths:
-        val = _extract_nested_int(update, path)
-        if val is not None:
-            return val
-    return None
+        def get1(update: dict[str, Any]) -> Any:
+            return update.get(k1)
 
+        return get1
 
-def extract_update_date_unix_seconds(update: dict[str, Any]) -> int | None:
-    """Best-effort extraction of an update's `date` (unix seconds)."""
+    if len(path) == 2:
+        k1, k2 = path
 
-    return _extract_first_int(update, _UPDATE_DATE_PATHS)
+        def get2(update: dict[str, Any]) -> Any:
+            v = update.get(k1)
+            return v.get(k2) if type(v) is dict else None
 
+        return get2
 
-def _extract_nested_str(update: dict[str, Any], path: tuple[str, ...]) -> str | None:
-    cur: Any = update
-    for key in path:
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(key)
-    return cur if isinstance(cur, str) else None
+    if len(path) == 3:
+        k1, k2, k3 = path
 
+        def get3(update: dict[str, Any]) -> Any:
+            v = update.get(k1)
+            if type(v) is not dict:
+                return None
+            v = v.get(k2)
+            return v.get(k3) if type(v) is dict else None
 
-def _extract_first_str(
-    update: dict[str, Any], paths: tuple[tuple[str, ...], ...]
-) -> str | None:
-    for path in paths:
-        val = _extract_nested_str(update, path)
-        if val is not None:
-            return val
-    return None
+        return get3
 
+    if len(path) == 4:
+        k1, k2, k3, k4 = path
+
+        def get4(update: dict[str, Any]) -> Any:
+            v = update.get(k1)
+            if type(v) is not dict:
+                return None
+            v = v.get(k2)
+            if type(v) is not dict:
+                return None
+            v = v.get(k3)
+            return v.get(k4) if type(v) is dict else None
+
+        return get4
+
+    def get_any(update: dict[str, Any]) -> Any:
+        cur: Any = update
+        for key in path:
+            if type(cur) is not dict:
+                return None
+            cur = cur.get(key)
+        return cur
+
+    return get_any
+
+
+def _compile_first_extractor[T](
+    paths: tuple[tuple[str, ...], ...], value_type: type[T]
+) -> Callable[[dict[str, Any]], T | None]:
+    """Compile `paths` into an extractor returning the first `value_type` hit.
+
+    Paths are grouped by their top-level key (in first-seen order) so each
+    update payload key is looked up once and its sub-paths are then tried
+    against that payload. A path whose value has another type is skipped
+    (exact type match, see the module notes on `type(...) is` checks).
+
+    Grouping only reorders paths across different top-level keys (e.g.
+    `edited_message.text` is now tried after `message.caption`), which cannot
+    change the result for a real update: Telegram sets exactly one payload
+    key per update.
+    """
+
+    grouped: dict[str, list[tuple[str, ...]]] = {}
+    for top_key, *rest in paths:
+        grouped.setdefault(top_key, []).append(tuple(rest))
+    groups = tuple(
+        (top_key, tuple(_compile_path_getter(sub) for sub in subpaths))
+        for top_key, subpaths in grouped.items()
+    )
+
+    def extract(update: dict[str, Any]) -> T | None:
+        for top_key, getters in groups:
+            payload = update.get(top_key)
+            if type(payload) is not dict:
+                continue
+            for get in getters:
+                val = get(payload)
+                if type(val) is value_type:
+                    return val
+        return None
+
+    return extract
+
+
+_extract_update_date = _compile_first_extractor(_UPDATE_DATE_PATHS, int)
+_extract_keyword_text = _compile_first_extractor(_KEYWORD_TEXT_PATHS, str)
+_extract_chat_id = _compile_first_extractor(_CHAT_ID_PATHS, int)
+_extract_chat_type = _compile_first_extractor(_CHAT_TYPE_PATHS, str)
+_extract_reply_to_from_id = _compile_first_extractor(_REPLY_TO_FROM_ID_PATHS, int)
+_extract_reply_to_from_username = _compile_first_extractor(
+    _REPLY_TO_FROM_USERNAME_PATHS, str
+)
 
-def _extract_nested_dict(
-    update: dict[str, Any], path: tuple[str, ...]
-) -> dict[str, Any] | None:
-    cur: Any = update
-    for key in path:
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(key)
-    return cur if isinstance(cur, dict) else None
+
+def extract_update_date_unix_seconds(update: dict[str, Any]) -> int | None:
+    """Best-effort extraction of an update's `date` (unix seconds)."""
+
+    return _extract_update_date(update)
 
 
 def update_is_forum_topic_created(update: dict[str, Any]) -> bool:
@@ -546,11 +661,22 @@ def update_is_forum_topic_created(update: dict[str, Any]) -> bool:
     Telegram carries this as `forum_topic_created` inside message-like payloads.
     Callers can use this to filter out topic-creation service noise before
     triggering/dispatching.
+
+    Iterates the update's own keys (typically just `update_id` plus one
+    payload) instead of probing every message-like key.
     """
 
-    for path in _FORUM_TOPIC_CREATED_PATHS:
-        if _extract_nested_dict(update, path) is not None:
-            return True
+    for key, val in update.items():
+        if key in _FORUM_TOPIC_MESSAGE_KEYS:
+            if type(val) is dict and type(val.get("forum_topic_created")) is dict:
+                return True
+        elif key == "callback_query" and type(val) is dict:
+            message = val.get("message")
+            if (
+                type(message) is dict
+                and type(message.get("forum_topic_created")) is dict
+            ):
+                return True
     return False
 
 
@@ -599,52 +725,165 @@ def filter_updates_in_time_window(
     return res
 
 
+def filter_updates_pipeline(
+    updates: list[dict[str, Any]],
+    *,
+    last_processed_update_id: int | None,
+    now_unix_seconds: int | None = None,
+    window_seconds: int | None = None,
+) -> tuple[list[dict[str, Any]], int]:
+    """Apply the unseen, forum-topic-created and time-window filters in one pass.
+
+    Equivalent to chaining `filter_unseen_updates`,
+    `filter_non_forum_topic_created_updates` and (when `window_seconds` is
+    given) `filter_updates_in_time_window`, but walks `updates` once and builds
+    a single result list.
+
+    Returns:
+        A tuple `(kept_updates, dropped_forum_topic_created_count)`; the count
+        only includes unseen updates, as with the chained filters.
+    """
+
+    # Updates dated before `min_date` fall outside the window.
+    min_date: int | None = None
+    if window_seconds is not None:
+        if window_seconds < 0:
+            raise ValueError(f"window_seconds must be >= 0; got {window_seconds}")
+        if now_unix_seconds is None:
+            raise ValueError("now_unix_seconds is required with window_seconds")
+        min_date = now_unix_seconds - window_seconds
+
+    kept: list[dict[str, Any]] = []
+    seen: set[int] = set()
+    dropped_forum_topic_created = 0
+    for update in updates:
+        update_id = update.get("update_id")
+        if type(update_id) is not int:
+            continue
+        if last_processed_update_id is not None and (
+            update_id <= last_processed_update_id
+        ):
+            continue
+        if update_id in seen:
+            continue
+        seen.add(update_id)
+
+        if update_is_forum_topic_created(update):
+            dropped_forum_topic_created += 1
+            continue
+
+        if min_date is not None:
+            date = _extract_update_date(update)
+            if date is not None and date < min_date:
+                continue
+
+        kept.append(update)
+
+    return kept, dropped_forum_topic_created
+
+
 def extract_chat_id(update: dict[str, Any]) -> int | None:
     """Best-effort extraction of a Telegram update chat id."""
 
-    return _extract_first_int(update, _CHAT_ID_PATHS)
+    return _extract_chat_id(update)
 
 
 def extract_chat_type(update: dict[str, Any]) -> str | None:
     """Best-effort extraction of a Telegram update chat type."""
 
-    return _extract_first_str(update, _CHAT_TYPE_PATHS)
+    return _extract_chat_type(update)
 
 
 def update_is_private_chat(update: dict[str, Any]) -> bool:
     return extract_chat_type(update) == "private"
 
 
+def _fold_text(text: str) -> str:
+    """Casefold update text for case-insensitive matching.
+
+    For pure-ASCII text `str.lower()` gives the same result as `casefold()` and
+    is noticeably faster on long messages, so it is used when possible.
+    """
+
+    return text.lower() if text.isascii() else text.casefold()
+
+
+def _update_mentions_bot_cf(update: dict[str, Any], *, bot_mention_cf: str) -> bool:
+    """`update_mentions_bot` with a pre-casefolded `"@<bot_username>"`."""
+
+    text = _extract_keyword_text(update)
+    if text is None:
+        return False
+    return bot_mention_cf in _fold_text(text)
+
+
 def update_mentions_bot(update: dict[str, Any], *, bot_username: str | None) -> bool:
     if not bot_username:
         return False
-    text = _extract_first_str(update, _KEYWORD_TEXT_PATHS)
-    if text is None:
-        return False
-    return f"@{bot_username}".casefold() in text.casefold()
+    return _update_mentions_bot_cf(update, bot_mention_cf=f"@{bot_username}".casefold())
 
 
-def update_is_reply_to_bot(
+def _update_is_reply_to_bot_cf(
     update: dict[str, Any],
     *,
     bot_user_id: int | None,
-    bot_username: str | None,
+    bot_username_cf: str | None,
 ) -> bool:
-    reply_to_from_id = _extract_first_int(update, _REPLY_TO_FROM_ID_PATHS)
+    """`update_is_reply_to_bot` with a pre-casefolded bot username."""
+
+    reply_to_from_id = _extract_reply_to_from_id(update)
     if bot_user_id is not None and reply_to_from_id == bot_user_id:
         return True
 
-    if bot_username:
-        reply_to_username = _extract_first_str(update, _REPLY_TO_FROM_USERNAME_PATHS)
-        if (
-            reply_to_username
-            and reply_to_username.casefold() == bot_username.casefold()
-        ):
+    if bot_username_cf:
+        reply_to_username = _extract_reply_to_from_username(update)
+        if reply_to_username and reply_to_username.casefold() == bot_username_cf:
             return True
 
     return False
 
 
+def update_is_reply_to_bot(
+    update: dict[str, Any],
+    *,
+    bot_user_id: int | None,
+    bot_username: str | None,
+) -> bool:
+    return _update_is_reply_to_bot_cf(
+        update,
+        bot_user_id=bot_user_id,
+        bot_username_cf=bot_username.casefold() if bot_username else None,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _TriggerNeedles:
+    """Casefolded, batch-invariant strings used by the trigger checks.
+
+    `keyword_cf` is `""` when the keyword is blank (keyword matching is then
+    skipped); the bot fields are `None` without a bot username.
+    """
+
+    keyword_cf: str
+    bot_mention_cf: str | None
+    bot_username_cf: str | None
+
+
+@functools.lru_cache(maxsize=16)
+def _trigger_needles(keyword: str, bot_username: str | None) -> _TriggerNeedles:
+    """Normalize trigger options once per distinct `(keyword, bot_username)`.
+
+    A starter uses the same pair for its whole lifetime, so every batch after
+    the first gets the stripped/casefolded strings from the cache.
+    """
+
+    return _TriggerNeedles(
+        keyword_cf=keyword.strip().casefold(),
+        bot_mention_cf=f"@{bot_username}".casefold() if bot_username else None,
+        bot_username_cf=bot_username.casefold() if bot_username else None,
+    )
+
+
 def chat_group_is_triggered(
     updates: list[dict[str, Any]],
     *,
@@ -652,17 +891,39 @@ def chat_group_is_triggered(
     bot_user_id: int | None,
     bot_username: str | None,
 ) -> bool:
+    """Return whether any update in a chat group satisfies a trigger condition.
+
+    Conditions are evaluated cheapest-first across the whole group: the
+    private-chat and reply-to-bot checks are a few dict lookups per update, so
+    they run in a first pass, and text is only extracted/casefolded (possibly
+    walking the whole update for the keyword fallback) when none of them hit.
+    """
+
+    needles = _trigger_needles(keyword, bot_username)
+    keyword_cf = needles.keyword_cf
+    bot_mention_cf = needles.bot_mention_cf
+    bot_username_cf = needles.bot_username_cf
+
     for update in updates:
-        if update_matches_keyword(update, keyword=keyword):
-            return True
-        if update_is_private_chat(update):
+        if _extract_chat_type(update) == "private":
             return True
-        if update_mentions_bot(update, bot_username=bot_username):
+        if _update_is_reply_to_bot_cf(
+            update, bot_user_id=bot_user_id, bot_username_cf=bot_username_cf
+        ):
             return True
-        if update_is_reply_to_bot(
-            update, bot_user_id=bot_user_id, bot_username=bot_username
+
+    if not keyword_cf and not bot_mention_cf:
+        return False
+    for update in updates:
+        # Keyword and mention checks share one text extraction + casefold.
+        text = _extract_keyword_text(update)
+        text_cf = _fold_text(text) if text is not None else None
+        if keyword_cf and _keyword_in_text_cf(
+            update, text_cf=text_cf, keyword_cf=keyword_cf
         ):
             return True
+        if bot_mention_cf and text_cf is not None and bot_mention_cf in text_cf:
+            return True
 
     return False
 
@@ -674,20 +935,41 @@ def trigger_flags_for_updates(
     bot_user_id: int | None,
     bot_username: str | None,
 ) -> dict[str, bool]:
-    """Return which trigger conditions are present in an update list."""
+    """Return which trigger conditions are present in an update list.
 
-    return {
-        "keyword": any(update_matches_keyword(u, keyword=keyword) for u in updates),
-        "private": any(update_is_private_chat(u) for u in updates),
-        "mention": any(
-            update_mentions_bot(u, bot_username=bot_username) for u in updates
-        ),
-        "reply": any(
-            update_is_reply_to_bot(
-                u, bot_user_id=bot_user_id, bot_username=bot_username
+    Evaluated in a single pass: each update's text is extracted/casefolded at
+    most once, and checks for flags that are already set are skipped.
+    """
+
+    needles = _trigger_needles(keyword, bot_username)
+    keyword_cf = needles.keyword_cf
+    bot_mention_cf = needles.bot_mention_cf
+    bot_username_cf = needles.bot_username_cf
+    keyword_hit = private_hit = mention_hit = reply_hit = False
+    for update in updates:
+        if (keyword_cf and not keyword_hit) or (bot_mention_cf and not mention_hit):
+            text = _extract_keyword_text(update)
+            text_cf = _fold_text(text) if text is not None else None
+            if keyword_cf and not keyword_hit:
+                keyword_hit = _keyword_in_text_cf(
+                    update, text_cf=text_cf, keyword_cf=keyword_cf
+                )
+            if bot_mention_cf and not mention_hit and text_cf is not None:
+                mention_hit = bot_mention_cf in text_cf
+        if not private_hit:
+            private_hit = update_is_private_chat(update)
+        if not reply_hit:
+            reply_hit = _update_is_reply_to_bot_cf(
+                update, bot_user_id=bot_user_id, bot_username_cf=bot_username_cf
             )
-            for u in updates
-        ),
+        if keyword_hit and private_hit and mention_hit and reply_hit:
+            break
+
+    return {
+        "keyword": keyword_hit,
+        "private": private_hit,
+        "mention": mention_hit,
+        "reply": reply_hit,
     }
 
 
@@ -695,7 +977,7 @@ def dispatch_groups_for_batch(
     updates: list[dict[str, Any]],
     *,
     keyword: str,
-    chat_ids: set[int] | None,
+    chat_ids: AbstractSet[int] | None,
     bot_user_id: int | None,
     bot_username: str | None,
 ) -> dict[int | None, list[dict[str, Any]]] | None:
@@ -735,7 +1017,7 @@ def dispatch_groups_for_batch(
 def group_updates_by_chat_id(
     updates: list[dict[str, Any]],
     *,
-    chat_ids: set[int] | None,
+    chat_ids: AbstractSet[int] | None,
 ) -> dict[int | None, list[dict[str, Any]]]:
     """Group updates by chat id.
 
@@ -744,13 +1026,68 @@ def group_updates_by_chat_id(
     `chat_ids` is None.
     """
 
-    grouped: dict[int | None, list[dict[str, Any]]] = defaultdict(list)
+    grouped: dict[int | None, list[dict[str, Any]]] = {}
+    if chat_ids is None:
+        for update in updates:
+            grouped.setdefault(_extract_chat_id(update), []).append(update)
+        return grouped
+
+    # `None` is never a member of an int watchlist, so unknown-chat updates are
+    # dropped by the membership test alone.
     for update in updates:
-        chat_id = extract_chat_id(update)
-        if chat_ids is not None and (chat_id is None or chat_id not in chat_ids):
-            continue
-        grouped[chat_id].append(update)
-    return dict(grouped)
+        chat_id = _extract_chat_id(update)
+        if chat_id in chat_ids:
+            grouped.setdefault(chat_id, []).append(update)
+    return grouped
+
+
+def _any_str_value_contains(obj: Any, needle_cf: str) -> bool:
+    """Return True if any string leaf of `obj` contains `needle_cf` (casefolded).
+
+    Walks dict values and list items with an explicit stack and stops at the
+    first hit, so a match near the top of an update never touches the rest of
+    it and no serialized copy of the update is built. Dict keys and non-string
+    scalars are not searched.
+    """
+
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if type(node) is str:
+            if needle_cf in _fold_text(node):
+                return True
+        elif type(node) is dict:
+            stack.extend(node.values())
+        elif type(node) is list:
+            stack.extend(node)
+    return False
+
+
+def _keyword_in_text_cf(
+    update: dict[str, Any], *, text_cf: str | None, keyword_cf: str
+) -> bool:
+    """Match `keyword_cf` against an update's already-casefolded keyword text.
+
+    `text_cf=None` means the update has no known text field.
+    """
+
+    if text_cf is None:
+        # Fall back to searching every string value so we still trigger on
+        # less common update types without a known text field.
+        return _any_str_value_contains(update, keyword_cf)
+
+    return keyword_cf in text_cf
+
+
+def _update_matches_keyword_cf(update: dict[str, Any], *, keyword_cf: str) -> bool:
+    """`update_matches_keyword` with a stripped, casefolded, non-empty keyword."""
+
+    text = _extract_keyword_text(update)
+    return _keyword_in_text_cf(
+        update,
+        text_cf=_fold_text(text) if text is not None else None,
+        keyword_cf=keyword_cf,
+    )
 
 
 def update_matches_keyword(
@@ -758,14 +1095,7 @@ def update_matches_keyword(
     *,
     keyword: str,
 ) -> bool:
-    keyword = keyword.strip()
-    if not keyword:
+    keyword_cf = keyword.strip().casefold()
+    if not keyword_cf:
         return False
-
-    text = _extract_first_str(update, _KEYWORD_TEXT_PATHS)
-    if text is None:
-        # Fall back to searching the JSON representation so we still trigger on
-        # less common update types without a known text field.
-        text = json.dumps(update, ensure_ascii=False)
-
-    return keyword.casefold() in text.casefold()
+    return _update_matches_keyword_cf(update, keyword_cf=keyword_cf)
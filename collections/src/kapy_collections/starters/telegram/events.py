@@ -3,11 +3,11 @@
 from __future__ import annotations
 
 import datetime
-import json
 from typing import Any
 
 from k.agent.core import Event
 
+from ._json import dumps_compact
 from .compact import _compact_telegram_update, extract_chat_id
 from .tz import _DEFAULT_TZINFO
 
@@ -40,7 +40,7 @@ def telegram_update_to_event(
     - `out_channel`: omitted (`None`), which means "same as input channel"
     """
 
-    body = _json_dumps(_compact_telegram_update(update, tz=tz) if compact else update)
+    body = _update_event_body(update, compact=compact, tz=tz)
     return Event(in_channel=_in_channel_for_update(update), content=body)
 
 
@@ -58,10 +58,7 @@ def telegram_updates_to_event(
     share the same chat, so retrieval can include all threads in that chat.
     """
 
-    bodies = [
-        _json_dumps(_compact_telegram_update(update, tz=tz) if compact else update)
-        for update in updates
-    ]
+    bodies = [_update_event_body(update, compact=compact, tz=tz) for update in updates]
     return Event(in_channel=_in_channel_for_updates(updates), content="\n".join(bodies))
 
 
@@ -76,6 +73,14 @@ def telegram_update_to_event_json(
     return telegram_update_to_event(update, compact=compact, tz=tz).model_dump_json()
 
 
+def _update_event_body(
+    update: dict[str, Any], *, compact: bool, tz: datetime.tzinfo
+) -> str:
+    """Serialize one update as an event content line (optionally compacted)."""
+
+    return _json_dumps(_compact_telegram_update(update, tz=tz) if compact else update)
+
+
 def _json_dumps(obj: Any) -> str:
     """Token-friendly JSON.
 
@@ -87,7 +92,7 @@ def _json_dumps(obj: Any) -> str:
       regex matchers that assume that layout.
     """
 
-    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return dumps_compact(obj)
 
 
 def _in_channel_for_updates(updates: list[dict[str, Any]]) -> str:
@@ -18,9 +18,11 @@ from __future__ import annotations
 import json
 import tempfile
 from collections import deque
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Any
 
+from ._json import dumps_compact
 from .compact import extract_chat_id
 
 _TRIGGER_STATE_VERSION = 1
@@ -46,13 +48,11 @@ def append_updates_jsonl(path: Path, updates: list[dict[str, Any]]) -> int:
 
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    written = 0
+    # Encode the whole batch first so the file sees a single write.
+    lines = [dumps_compact(update) + "\n" for update in updates]
     with path.open("a", encoding="utf-8") as f:
-        for update in updates:
-            f.write(json.dumps(update, ensure_ascii=False, separators=(",", ":")))
-            f.write("\n")
-            written += 1
-    return written
+        f.write("".join(lines))
+    return len(lines)
 
 
 def load_recent_updates_grouped_by_chat_id(
@@ -174,23 +174,15 @@ def load_last_trigger_update_id_by_chat(path: Path) -> dict[int, int]:
     return out
 
 
-def save_last_trigger_update_id_by_chat(path: Path, by_chat: dict[int, int]) -> None:
-    """Persist trigger cursor state atomically.
-
-    Args:
-        path: Trigger-state JSON file path.
-        by_chat: Mapping `chat_id -> last_triggered_update_id` to persist.
-
-    Side effects:
-    - Creates parent directories for `path`.
-    - Atomically replaces `path` via temporary file + rename.
+def _encode_trigger_state(by_chat: Mapping[int, int]) -> str:
+    """Validate and encode trigger cursor state as one JSON line.
 
     Raises:
     - ValueError: If `by_chat` contains invalid values.
     """
 
     encoded: dict[str, int] = {}
-    for chat_id, update_id in by_chat.items():
+    for chat_id, update_id in sorted(by_chat.items()):
         if not isinstance(update_id, int) or update_id < 0:
             raise ValueError(
                 f"Invalid trigger cursor for chat_id={chat_id!r}: {update_id!r}"
@@ -199,23 +191,42 @@ def save_last_trigger_update_id_by_chat(path: Path, by_chat: dict[int, int]) ->
 
     payload = {
         "version": _TRIGGER_STATE_VERSION,
-        "last_trigger_update_id_by_chat": dict(
-            sorted(encoded.items(), key=lambda kv: int(kv[0]))
-        ),
+        "last_trigger_update_id_by_chat": encoded,
     }
+    return dumps_compact(payload) + "\n"
+
+
+def _write_text_atomic(path: Path, text: str) -> None:
+    """Replace `path` with `text` via temporary file + rename."""
 
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_dir = path.parent if path.parent.exists() else None
     with tempfile.NamedTemporaryFile(
         "w",
         encoding="utf-8",
-        dir=tmp_dir,
+        dir=path.parent,
         prefix=f".{path.name}.",
         suffix=".tmp",
         delete=False,
     ) as tf:
         tmp_path = Path(tf.name)
-        tf.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
-        tf.write("\n")
+        tf.write(text)
 
     tmp_path.replace(path)
+
+
+def save_last_trigger_update_id_by_chat(path: Path, by_chat: Mapping[int, int]) -> None:
+    """Persist trigger cursor state atomically.
+
+    Args:
+        path: Trigger-state JSON file path.
+        by_chat: Mapping `chat_id -> last_triggered_update_id` to persist.
+
+    Side effects:
+    - Creates parent directories for `path`.
+    - Atomically replaces `path` via temporary file + rename.
+
+    Raises:
+    - ValueError: If `by_chat` contains invalid values.
+    """
+
+    _write_text_atomic(path, _encode_trigger_state(by_chat))
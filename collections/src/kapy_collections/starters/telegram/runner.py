@@ -12,6 +12,9 @@ from __future__ import annotations
 
 import datetime
 import html
+import threading
+from collections.abc import Awaitable, Callable
+from collections.abc import Set as AbstractSet
 from functools import partial
 from pathlib import Path
 from typing import Any
@@ -19,6 +22,8 @@ from typing import Any
 import anyio
 import anyio.to_thread as to_thread
 from k.agent.core import Event, agent_run
+from k.agent.core.media_tools import aclose_media_client
+from k.agent.memory.entities import MemoryRecord
 from k.agent.memory.folder import FolderMemoryStore
 from k.agent.memory.paths import memory_root_from_config_base
 from k.config import Config
@@ -32,10 +37,10 @@ from .compact import (
     extract_chat_id,
     extract_update_id,
     filter_non_forum_topic_created_updates,
-    filter_unseen_updates,
+    filter_updates_pipeline,
     trigger_flags_for_updates,
 )
-from .events import telegram_update_to_event, telegram_updates_to_event
+from .events import _in_channel_for_updates, _update_event_body
 from .history import (
     append_updates_jsonl,
     load_last_trigger_update_id_by_chat,
@@ -172,16 +177,15 @@ def _telegram_updates_to_event_text_only_compaction(
     lines that are plain text messages.
     """
 
-    in_channel = telegram_updates_to_event(updates, compact=False, tz=tz).in_channel
+    # Derive the channel directly instead of building (and serializing) a full
+    # uncompacted batch event just to read its `in_channel`.
     bodies = [
-        telegram_update_to_event(
-            update,
-            compact=_should_compact_update_for_agent(update),
-            tz=tz,
-        ).content
+        _update_event_body(
+            update, compact=_should_compact_update_for_agent(update), tz=tz
+        )
         for update in updates
     ]
-    return Event(in_channel=in_channel, content="\n".join(bodies))
+    return Event(in_channel=_in_channel_for_updates(updates), content="\n".join(bodies))
 
 
 def filter_dispatch_groups_without_forum_topic_created_updates(
@@ -207,6 +211,15 @@ def filter_dispatch_groups_without_forum_topic_created_updates(
     return filtered, dropped_updates, dropped_groups
 
 
+def _append_memory_locked(
+    memory_store: FolderMemoryStore, mem: MemoryRecord, lock: threading.Lock
+) -> None:
+    """Append `mem` while holding `lock` (runs in a worker thread)."""
+
+    with lock:
+        memory_store.append(mem)
+
+
 async def run_agent_for_chat_batch(
     api: TelegramBotApi,
     chat_id: int | None,
@@ -214,7 +227,7 @@ async def run_agent_for_chat_batch(
     model: OpenRouterModel,
     config: Config,
     memory_store: FolderMemoryStore,
-    append_lock: anyio.Lock,
+    append_lock: threading.Lock,
     tz: datetime.tzinfo,
 ) -> None:
     try:
@@ -271,9 +284,9 @@ async def run_agent_for_chat_batch(
         return
 
     # `FolderMemoryStore.append()` mutates on-disk files; serialize appends
-    # across concurrent chat runs to avoid corrupting `order.jsonl`.
-    async with append_lock:
-        await to_thread.run_sync(memory_store.append, mem)
+    # across concurrent chat runs to avoid corrupting `order.jsonl`. The lock
+    # is taken inside the worker thread, so the event loop makes one hop.
+    await to_thread.run_sync(_append_memory_locked, memory_store, mem, append_lock)
     if mem.output.strip():
         prefix = f"[chat_id={chat_id}] " if chat_id is not None else "[chat_id=?] "
         print(prefix + mem.output)
@@ -408,20 +421,9 @@ def update_last_trigger_update_id_by_chat(
     return updated_chats
 
 
-async def _poll_and_run_forever(
-    *,
-    config: Config,
-    model: Model | str,
-    token: str,
-    timeout_seconds: int,
-    keyword: str,
-    chat_ids: set[int] | None,
-    updates_store_path: Path | None = None,
-    dispatch_recent_per_chat: int = 0,
-    tz: datetime.tzinfo,
-) -> None:
-    if timeout_seconds <= 0:
-        raise ValueError(f"timeout_seconds must be > 0; got {timeout_seconds}")
+def _check_dispatch_options(*, keyword: str, dispatch_recent_per_chat: int) -> None:
+    """Validate dispatch knobs shared by every update source."""
+
     if not keyword.strip():
         raise ValueError(
             "Refusing to start with an empty --keyword. "
@@ -432,12 +434,37 @@ async def _poll_and_run_forever(
             f"dispatch_recent_per_chat must be >= 0; got {dispatch_recent_per_chat}"
         )
 
-    mem_store = FolderMemoryStore(
-        root=memory_root_from_config_base(config.config_base)
-    )
+
+async def _run_updates_forever(
+    *,
+    config: Config,
+    model: Model | str,
+    api: TelegramBotApi,
+    fetch_updates: Callable[[int | None], Awaitable[list[dict[str, Any]]]],
+    source_label: str,
+    banner_lines: list[str],
+    keyword: str,
+    chat_ids: AbstractSet[int] | None,
+    updates_store_path: Path | None,
+    dispatch_recent_per_chat: int,
+    tz: datetime.tzinfo,
+) -> None:
+    """Consume update batches and dispatch triggered chat groups forever.
+
+    This is the source-agnostic half of the starter: `fetch_updates(next_offset)`
+    returns the next batch of raw updates (long-poll `getUpdates`, or updates
+    pushed to the webhook receiver). `next_offset` is the `getUpdates` offset
+    implied by the latest consumed `update_id`; push sources may ignore it.
+    A `TelegramBotApiError` from `fetch_updates` is logged with `source_label`
+    and retried with exponential backoff.
+
+    The caller owns `api` (including `aclose()`); it is used here for `getMe`
+    and for agent error replies.
+    """
+
+    mem_store = FolderMemoryStore(root=memory_root_from_config_base(config.config_base))
     if isinstance(model, str):
         model = OpenRouterModel(model)
-    api = TelegramBotApi(token=token)
     try:
         me = await api.get_me()
     except TelegramBotApiError as e:
@@ -455,7 +482,7 @@ async def _poll_and_run_forever(
     backoff_seconds = 1.0
 
     pending_updates_by_id: dict[int, dict[str, Any]] = {}
-    append_lock = anyio.Lock()
+    append_lock = threading.Lock()
     last_trigger_update_id_by_chat: dict[int, int] = {}
     trigger_cursor_state_path: Path | None = None
     if updates_store_path is not None:
@@ -477,9 +504,8 @@ async def _poll_and_run_forever(
     print(
         "\n".join(
             [
-                "Telegram starter running (polling getUpdates).",
+                *banner_lines,
                 f"- model: {model}",
-                f"- timeout_seconds: {timeout_seconds}",
                 f"- last_consumed_update_id: {last_consumed_update_id}",
                 f"- keyword: {keyword!r}",
                 f"- chat_ids: {sorted(chat_ids) if chat_ids is not None else None}",
@@ -497,26 +523,22 @@ async def _poll_and_run_forever(
     async with anyio.create_task_group() as tg:
         while True:
             try:
-                updates = await api.get_updates(
-                    offset=next_offset,
-                    timeout_seconds=timeout_seconds,
-                )
+                updates = await fetch_updates(next_offset)
             except TelegramBotApiError as e:
-                print(f"[red]Telegram poll error[/red]: {e}")
+                print(f"[red]Telegram {source_label} error[/red]: {e}")
                 await anyio.sleep(backoff_seconds)
                 backoff_seconds = min(backoff_seconds * 2, 30.0)
                 continue
 
             backoff_seconds = 1.0
             if updates:
-                unseen_updates = filter_unseen_updates(
-                    updates,
-                    last_processed_update_id=last_consumed_update_id,
-                )
                 (
                     unseen_updates,
                     ignored_forum_topic_created_updates,
-                ) = filter_non_forum_topic_created_updates(unseen_updates)
+                ) = filter_updates_pipeline(
+                    updates,
+                    last_processed_update_id=last_consumed_update_id,
+                )
 
                 seen_chat_ids = sorted(
                     {
@@ -750,3 +772,51 @@ async def _poll_and_run_forever(
                     append_lock,
                     tz,
                 )
+
+
+async def _poll_and_run_forever(
+    *,
+    config: Config,
+    model: Model | str,
+    token: str,
+    timeout_seconds: int,
+    keyword: str,
+    chat_ids: AbstractSet[int] | None,
+    updates_store_path: Path | None = None,
+    dispatch_recent_per_chat: int = 0,
+    tz: datetime.tzinfo,
+) -> None:
+    if timeout_seconds <= 0:
+        raise ValueError(f"timeout_seconds must be > 0; got {timeout_seconds}")
+    _check_dispatch_options(
+        keyword=keyword, dispatch_recent_per_chat=dispatch_recent_per_chat
+    )
+
+    api = TelegramBotApi(token=token)
+
+    async def fetch_updates(offset: int | None) -> list[dict[str, Any]]:
+        return await api.get_updates(offset=offset, timeout_seconds=timeout_seconds)
+
+    try:
+        await _run_updates_forever(
+            config=config,
+            model=model,
+            api=api,
+            fetch_updates=fetch_updates,
+            source_label="poll",
+            banner_lines=[
+                "Telegram starter running (polling getUpdates).",
+                f"- timeout_seconds: {timeout_seconds}",
+            ],
+            keyword=keyword,
+            chat_ids=chat_ids,
+            updates_store_path=updates_store_path,
+            dispatch_recent_per_chat=dispatch_recent_per_chat,
+            tz=tz,
+        )
+    finally:
+        # The poll loop only exits via cancellation/errors; shield the close so
+        # the pooled HTTP connections are released even while being cancelled.
+        with anyio.CancelScope(shield=True):
+            await api.aclose()
+            await aclose_media_client()
@@ -8,14 +8,23 @@ original seconds as `date_unix` for exact comparisons.
 from __future__ import annotations
 
 import datetime
+import functools
 import re
+import time
 from typing import Final
 from zoneinfo import ZoneInfo
 
 _DEFAULT_TIMEZONE: Final[str] = "UTC+8"
 _DEFAULT_TZINFO: Final[datetime.tzinfo] = datetime.timezone(datetime.timedelta(hours=8))
+# Fast-path bounds for `_format_unix_seconds`: `%Y` is only zero-padded to four
+# digits for years 1000..9999, so stay within 1970..9999 local time.
+_MAX_FAST_LOCAL_SECONDS: Final[int] = 253402300800  # 10000-01-01T00:00:00
+_TZ_OFFSET_RE: Final[re.Pattern[str]] = re.compile(
+    r"(?:(?:UTC)?\s*)?([+-])\s*(\d{1,2})(?::?(\d{2}))?\s*", re.IGNORECASE
+)
 
 
+@functools.lru_cache(maxsize=64)
 def _parse_timezone(value: str) -> datetime.tzinfo:
     """Parse a timezone argument into a tzinfo.
 
@@ -23,6 +32,9 @@ def _parse_timezone(value: str) -> datetime.tzinfo:
     - IANA timezone name, e.g. "Asia/Shanghai"
     - UTC offsets: "UTC+8", "UTC+08:00", "+08:00", "-05", "-0530"
     - "UTC" / "Z"
+
+    Results are memoized per input string, so repeated parses of the same
+    setting return the identical tzinfo object. Invalid inputs are not cached.
     """
 
     raw = value.strip()
@@ -33,11 +45,7 @@ def _parse_timezone(value: str) -> datetime.tzinfo:
     if upper in {"UTC", "Z"}:
         return datetime.UTC
 
-    m = re.fullmatch(
-        r"(?:(?:UTC)?\s*)?([+-])\s*(\d{1,2})(?::?(\d{2}))?\s*",
-        raw,
-        flags=re.IGNORECASE,
-    )
+    m = _TZ_OFFSET_RE.fullmatch(raw)
     if m is not None:
         sign_s, hours_s, minutes_s = m.groups()
         hours = int(hours_s)
@@ -59,8 +67,39 @@ def _parse_timezone(value: str) -> datetime.tzinfo:
         ) from e
 
 
+@functools.cache
+def _fixed_offset_parts(tz: datetime.timezone) -> tuple[int, str] | None:
+    """Return `(offset_seconds, "+HH:MM")` for a fixed-offset tz, if minute-aligned."""
+
+    offset = tz.utcoffset(None)
+    if offset.microseconds or offset.seconds % 60:
+        return None
+    offset_seconds = int(offset.total_seconds())
+    sign = "-" if offset_seconds < 0 else "+"
+    hours, minutes = divmod(abs(offset_seconds) // 60, 60)
+    return offset_seconds, f"{sign}{hours:02d}:{minutes:02d}"
+
+
 def _format_unix_seconds(unix_seconds: int, *, tz: datetime.tzinfo) -> str:
-    """Render unix seconds as an ISO-8601 datetime string in `tz`."""
+    """Render unix seconds as an ISO-8601 datetime string in `tz`.
+
+    Fixed-offset timezones (the CLI default and every `UTC±HH:MM` setting) are
+    formatted from `time.gmtime` of the shifted timestamp plus a cached offset
+    suffix, skipping the aware `datetime` construction. The output is
+    identical to `datetime.fromtimestamp(..., tz=tz).isoformat("seconds")`,
+    which remains the path for IANA zones (DST-dependent offsets).
+    """
+
+    if type(tz) is datetime.timezone:
+        parts = _fixed_offset_parts(tz)
+        if parts is not None:
+            offset_seconds, suffix = parts
+            local_seconds = unix_seconds + offset_seconds
+            if 0 <= local_seconds < _MAX_FAST_LOCAL_SECONDS:
+                return (
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(local_seconds))
+                    + suffix
+                )
 
     dt = datetime.datetime.fromtimestamp(unix_seconds, tz=tz)
     return dt.isoformat(timespec="seconds")
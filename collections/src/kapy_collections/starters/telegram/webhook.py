@@ -0,0 +1,227 @@
+"""Webhook (push) receiver for the Telegram starter.
+
+Instead of long-polling `getUpdates`, Telegram POSTs each update to a public
+HTTPS URL registered via `setWebhook`. This module runs a minimal HTTP/1.1
+receiver on a plain TCP listener (terminate TLS at a reverse proxy) that:
+- accepts `POST` requests on any path, authenticated by the
+  `X-Telegram-Bot-Api-Secret-Token` header,
+- parses the JSON body into the same update dict shape `getUpdates` returns,
+- feeds the updates into the shared dispatch loop
+  (`runner._run_updates_forever`), so trigger/dispatch behaviour is identical
+  to polling mode.
+
+Gotchas:
+- Telegram refuses `getUpdates` while a webhook is set; the webhook is deleted
+  on shutdown so polling mode keeps working afterwards.
+- The webhook is registered with `max_connections=1` so deliveries stay in
+  `update_id` order; the dispatch loop drops updates at or below the latest
+  consumed id.
+- A request is acknowledged only after its update is queued, so a full queue
+  pushes back on Telegram (which retries non-2xx deliveries) instead of
+  dropping updates.
+- Each connection serves one request (`Connection: close`).
+"""
+
+from __future__ import annotations
+
+import datetime
+import hmac
+import secrets
+from collections.abc import Set as AbstractSet
+from functools import partial
+from pathlib import Path
+from typing import Any, Final
+
+import anyio
+from anyio.abc import ByteStream
+from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from k.agent.core.media_tools import aclose_media_client
+from k.config import Config
+from pydantic_ai.models import Model
+from rich import print
+
+from ._json import loads_json
+from .api import TelegramBotApi, TelegramBotApiError
+from .runner import _check_dispatch_options, _run_updates_forever
+
+_SECRET_TOKEN_HEADER: Final[bytes] = b"x-telegram-bot-api-secret-token"
+_MAX_HEADER_BYTES: Final[int] = 16 * 1024
+_MAX_BODY_BYTES: Final[int] = 10 * 1024 * 1024
+_REQUEST_TIMEOUT_SECONDS: Final[float] = 30.0
+_QUEUE_MAX_UPDATES: Final[int] = 1000
+# Same as the `getUpdates` limit so both sources hand the dispatcher
+# similarly sized batches.
+_MAX_BATCH_UPDATES: Final[int] = 100
+
+
+def _http_response(status: int, reason: str) -> bytes:
+    return (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        + "Content-Length: 0\r\n"
+        + "Connection: close\r\n\r\n"
+    ).encode("ascii")
+
+
+async def _read_webhook_update(
+    stream: ByteStream,
+    *,
+    secret_token: str,
+) -> tuple[int, str, dict[str, Any] | None]:
+    """Read one HTTP request and validate it as a Telegram webhook delivery.
+
+    Returns:
+        `(status, reason, update)`; `update` is set only for `200` responses.
+
+    Raises:
+        anyio.IncompleteRead / anyio.EndOfStream: peer disconnected mid-request.
+    """
+
+    buffered = BufferedByteReceiveStream(stream)
+    try:
+        head = await buffered.receive_until(b"\r\n\r\n", _MAX_HEADER_BYTES)
+    except anyio.DelimiterNotFound:
+        return 431, "Request Header Fields Too Large", None
+
+    request_line, _, header_block = head.partition(b"\r\n")
+    parts = request_line.split(b" ")
+    if len(parts) != 3:
+        return 400, "Bad Request", None
+    if parts[0] != b"POST":
+        return 405, "Method Not Allowed", None
+
+    headers: dict[bytes, bytes] = {}
+    for line in header_block.split(b"\r\n"):
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    if not hmac.compare_digest(
+        headers.get(_SECRET_TOKEN_HEADER, b""), secret_token.encode("utf-8")
+    ):
+        return 401, "Unauthorized", None
+
+    try:
+        length = int(headers.get(b"content-length", b""))
+    except ValueError:
+        return 411, "Length Required", None
+    if length < 0 or length > _MAX_BODY_BYTES:
+        return 413, "Content Too Large", None
+
+    body = await buffered.receive_exactly(length)
+    try:
+        update = loads_json(body)
+    except ValueError:
+        return 400, "Bad Request", None
+    if not isinstance(update, dict):
+        return 400, "Bad Request", None
+    return 200, "OK", update
+
+
+async def _handle_webhook_connection(
+    stream: ByteStream,
+    *,
+    secret_token: str,
+    send: MemoryObjectSendStream[dict[str, Any]],
+) -> None:
+    async with stream:
+        with anyio.move_on_after(_REQUEST_TIMEOUT_SECONDS):
+            try:
+                status, reason, update = await _read_webhook_update(
+                    stream, secret_token=secret_token
+                )
+            except (anyio.IncompleteRead, anyio.EndOfStream, anyio.BrokenResourceError):
+                return
+            if update is not None:
+                await send.send(update)
+            try:
+                await stream.send(_http_response(status, reason))
+            except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                return
+
+
+async def _receive_update_batch(
+    receive: MemoryObjectReceiveStream[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Wait for at least one pushed update, then drain what is already queued."""
+
+    batch = [await receive.receive()]
+    while len(batch) < _MAX_BATCH_UPDATES:
+        try:
+            batch.append(receive.receive_nowait())
+        except anyio.WouldBlock:
+            break
+    return batch
+
+
+async def _webhook_and_run_forever(
+    *,
+    config: Config,
+    model: Model | str,
+    token: str,
+    webhook_url: str,
+    listen_host: str,
+    listen_port: int,
+    secret_token: str = "",
+    keyword: str,
+    chat_ids: AbstractSet[int] | None,
+    updates_store_path: Path | None = None,
+    dispatch_recent_per_chat: int = 0,
+    tz: datetime.tzinfo,
+) -> None:
+    """Register a webhook, receive pushed updates, and dispatch them forever.
+
+    When `secret_token` is empty a random one is generated per run; it is sent
+    to Telegram via `setWebhook` and never printed.
+    """
+
+    if not webhook_url.startswith("https://"):
+        raise ValueError(f"webhook_url must be an https:// URL; got {webhook_url!r}")
+    _check_dispatch_options(
+        keyword=keyword, dispatch_recent_per_chat=dispatch_recent_per_chat
+    )
+
+    secret = secret_token or secrets.token_urlsafe(32)
+    api = TelegramBotApi(token=token)
+    send, receive = anyio.create_memory_object_stream[dict[str, Any]](
+        _QUEUE_MAX_UPDATES
+    )
+    listener = await anyio.create_tcp_listener(
+        local_host=listen_host, local_port=listen_port
+    )
+
+    async def fetch_updates(_offset: int | None) -> list[dict[str, Any]]:
+        return await _receive_update_batch(receive)
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                listener.serve,
+                partial(_handle_webhook_connection, secret_token=secret, send=send),
+            )
+            await api.set_webhook(url=webhook_url, secret_token=secret)
+            await _run_updates_forever(
+                config=config,
+                model=model,
+                api=api,
+                fetch_updates=fetch_updates,
+                source_label="webhook",
+                banner_lines=[
+                    "Telegram starter running (webhook).",
+                    f"- listen: {listen_host}:{listen_port}",
+                ],
+                keyword=keyword,
+                chat_ids=chat_ids,
+                updates_store_path=updates_store_path,
+                dispatch_recent_per_chat=dispatch_recent_per_chat,
+                tz=tz,
+            )
+    finally:
+        with anyio.CancelScope(shield=True):
+            await listener.aclose()
+            try:
+                await api.delete_webhook()
+            except TelegramBotApiError as e:
+                print(f"[yellow]Telegram deleteWebhook failed[/yellow]: {e}")
+            await api.aclose()
+            await aclose_media_client()
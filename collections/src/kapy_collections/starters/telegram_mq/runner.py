@@ -4,39 +4,52 @@ This variant consumes Telegram-like updates from RabbitMQ and reuses the core
 Telegram dispatch pipeline.
 """
 
+import contextlib
 import datetime
+import functools
 import html
-import json
 import logging
 import os
+import sys
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
 from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final
 
 import aio_pika
 import anyio
 import anyio.to_thread as to_thread
-import logfire
+from aio_pika.abc import AbstractIncomingMessage
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from k.agent.core import agent_run
+from k.agent.core.media_tools import aclose_media_client
 from k.agent.memory.folder import FolderMemoryStore
 from k.config import Config
 
+from .._observability import init_observability
+from ..telegram._json import loads_json
 from ..telegram.api import TelegramBotApi, TelegramBotApiError
 from ..telegram.compact import (
     _expand_chat_id_watchlist,
     dispatch_groups_for_batch,
-    extract_update_id,
-    filter_non_forum_topic_created_updates,
-    filter_unseen_updates,
+    filter_updates_pipeline,
+    update_is_forum_topic_created,
 )
 from ..telegram.history import (
+    _encode_trigger_state,
+    _write_text_atomic,
     append_updates_jsonl,
     load_last_trigger_update_id_by_chat,
     load_recent_updates_grouped_by_chat_id,
-    save_last_trigger_update_id_by_chat,
     trigger_cursor_state_path_for_updates_store,
 )
 from ..telegram.runner import (
+    _append_memory_locked,
     _telegram_updates_to_event_text_only_compaction,
     cap_dispatch_groups_per_chat,
     filter_dispatch_groups_after_last_trigger,
@@ -49,6 +62,58 @@ from ..telegram.tz import _DEFAULT_TIMEZONE, _parse_timezone
 if TYPE_CHECKING:
     pass
 
+logger = logging.getLogger(__name__)
+
+# Unacked deliveries the broker may push ahead of processing. Small values
+# leave the consumer idle waiting on broker round trips; ~100 keeps it busy
+# without holding a large backlog in memory.
+_DEFAULT_PREFETCH_COUNT: Final[int] = 100
+# Agent runs allowed in flight at once; further triggered chats wait for a
+# slot without holding up AMQP acknowledgements.
+_DEFAULT_MAX_CONCURRENT_AGENTS: Final[int] = 4
+# Untriggered updates kept for the next trigger check; oldest are evicted.
+_MAX_PENDING_UPDATES: Final[int] = 100
+# Micro-batches whose bodies add up to more than this are decoded in a worker
+# thread; below it the thread hop costs more than parsing inline.
+_PARSE_OFF_LOOP_MIN_BYTES: Final[int] = 64 * 1024
+# Persistence jobs are buffered for this long before a flush so bursts of
+# micro-batches share one file open per path.
+_PERSIST_COOLDOWN_SECONDS: Final[float] = 0.05
+_PERSIST_QUEUE_MAX_JOBS: Final[int] = 1024
+# Checked in order before `callback_query` (see `_extract_update_from_user_id`).
+_SENDER_MESSAGE_KEYS: Final[tuple[str, ...]] = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_message",
+    "edited_business_message",
+)
+
+
+@dataclass(slots=True)
+class _AppendUpdatesJob:
+    path: Path
+    updates: list[dict[str, Any]]
+
+
+@dataclass(slots=True)
+class _SaveTriggerCursorJob:
+    """`state` is the live cursor mapping, encoded when the flush runs."""
+
+    path: Path
+    state: Mapping[int, int]
+
+
+@dataclass(slots=True)
+class _FlushJob:
+    """Barrier: `done` is set once every job queued before it is written."""
+
+    done: anyio.Event
+
+
+type _PersistJob = _AppendUpdatesJob | _SaveTriggerCursorJob | _FlushJob
+
 
 async def run_agent_for_chat_batch(
     api: TelegramBotApi | None,
@@ -57,7 +122,7 @@ async def run_agent_for_chat_batch(
     model: Any,
     config: Config,
     memory_store: FolderMemoryStore,
-    append_lock: anyio.Lock,
+    append_lock: threading.Lock,
     tz: datetime.tzinfo,
 ) -> None:
     try:
@@ -119,83 +184,330 @@ async def run_agent_for_chat_batch(
                 )
         return
 
-    async with append_lock:
-        await to_thread.run_sync(memory_store.append, mem)
+    await to_thread.run_sync(_append_memory_locked, memory_store, mem, append_lock)
     if mem.output.strip():
         prefix = f"[chat_id={chat_id}] " if chat_id is not None else "[chat_id=?] "
         print(prefix + mem.output)
 
 
+async def _receive_message_batch(
+    receive: MemoryObjectReceiveStream[AbstractIncomingMessage],
+    *,
+    max_messages: int,
+) -> list[AbstractIncomingMessage]:
+    """Wait for one delivery, then drain what is already buffered (up to max)."""
+
+    batch = [await receive.receive()]
+    while len(batch) < max_messages:
+        try:
+            batch.append(receive.receive_nowait())
+        except anyio.WouldBlock:
+            break
+    return batch
+
+
+async def _write_persist_jobs(jobs: list[_PersistJob]) -> None:
+    """Write one coalesced flush: one append per path, then the latest cursors."""
+
+    appends: dict[Path, list[dict[str, Any]]] = {}
+    cursor: _SaveTriggerCursorJob | None = None
+    barriers: list[anyio.Event] = []
+    for job in jobs:
+        if isinstance(job, _AppendUpdatesJob):
+            appends.setdefault(job.path, []).extend(job.updates)
+        elif isinstance(job, _SaveTriggerCursorJob):
+            # Each snapshot supersedes the previous ones.
+            cursor = job
+        else:
+            barriers.append(job.done)
+
+    for path, updates in appends.items():
+        try:
+            await to_thread.run_sync(append_updates_jsonl, path, updates)
+        except OSError as e:
+            logger.warning(
+                "telegram persist error path=%s: %s: %s", path, type(e).__name__, e
+            )
+    if cursor is not None:
+        try:
+            # Encode on the event loop, where the mapping is mutated, so the
+            # worker thread only sees an immutable string.
+            text = _encode_trigger_state(cursor.state)
+            await to_thread.run_sync(_write_text_atomic, cursor.path, text)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "telegram trigger cursor save error path=%s: %s: %s",
+                cursor.path,
+                type(e).__name__,
+                e,
+            )
+    for done in barriers:
+        done.set()
+
+
+async def _run_persist_writer(
+    receive: MemoryObjectReceiveStream[_PersistJob],
+    *,
+    cooldown_seconds: float = _PERSIST_COOLDOWN_SECONDS,
+) -> None:
+    """Drain persistence jobs off the dispatch path until the stream closes.
+
+    Jobs arriving within `cooldown_seconds` of the first one are coalesced
+    into a single flush; a `_FlushJob` skips the cooldown. A flush that has
+    started is shielded, so jobs already received are written on shutdown.
+    """
+
+    async with receive:
+        while True:
+            try:
+                jobs: list[_PersistJob] = [await receive.receive()]
+            except anyio.EndOfStream:
+                return
+            try:
+                if not isinstance(jobs[0], _FlushJob):
+                    await anyio.sleep(cooldown_seconds)
+            finally:
+                while True:
+                    try:
+                        jobs.append(receive.receive_nowait())
+                    except (anyio.WouldBlock, anyio.EndOfStream):
+                        break
+                with anyio.CancelScope(shield=True):
+                    await _write_persist_jobs(jobs)
+
+
+async def _flush_persist_writer(send: MemoryObjectSendStream[_PersistJob]) -> None:
+    """Wait until every job queued so far has been written."""
+
+    done = anyio.Event()
+    await send.send(_FlushJob(done))
+    await done.wait()
+
+
+def _intern_str(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_iso_unix_seconds(value: str) -> int:
+    """Parse an ISO 8601 timestamp to Unix seconds.
+
+    Cached because bursts of deliveries share second-resolution timestamps.
+    """
+
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
 def _mq_to_update(mq_msg: dict[str, Any]) -> dict[str, Any]:
-    """Map custom MQ format to standard Telegram Update format."""
-    dt_str = mq_msg.get("date")
-    try:
-        # Handle ISO format with potential Z or timezone offset
-        dt = datetime.datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-        ts = int(dt.timestamp())
-    except Exception:
-        ts = int(datetime.datetime.now().timestamp())
+    """Map custom MQ format to standard Telegram Update format.
 
+    `date` is an ISO 8601 string; `fromisoformat` accepts a trailing `Z`
+    directly. A missing or unparsable date falls back to the current time.
+
+    Keys and the chat type are code constants, so they are already shared
+    across updates; sender names repeat heavily within a chat and are
+    interned so pending/dispatch batches hold one copy per distinct name.
+    """
+
+    get = mq_msg.get
+    dt_str = get("date")
+    ts: int | None = None
+    if type(dt_str) is str:
+        with contextlib.suppress(ValueError, OverflowError, OSError):
+            ts = _parse_iso_unix_seconds(dt_str)
+    if ts is None:
+        ts = int(time.time())
+
+    message_id = get("message_id")
     # Build a fake Telegram Update object
     msg = {
-        "message_id": mq_msg.get("message_id"),
+        "message_id": message_id,
         "date": ts,
-        "chat": {"id": mq_msg.get("chat_id"), "type": "supergroup"},
+        "chat": {"id": get("chat_id"), "type": "supergroup"},
         "from": {
-            "id": mq_msg.get("sender_id"),
-            "username": mq_msg.get("sender_username"),
-            "first_name": mq_msg.get("sender_fullname"),
-            "is_bot": mq_msg.get("is_bot", False),
+            "id": get("sender_id"),
+            "username": _intern_str(get("sender_username")),
+            "first_name": _intern_str(get("sender_fullname")),
+            "is_bot": get("is_bot", False),
         },
-        "text": mq_msg.get("text"),
-        "caption": mq_msg.get("caption"),
-        "message_thread_id": mq_msg.get("message_thread_id"),
+        "text": get("text"),
+        "caption": get("caption"),
+        "message_thread_id": get("message_thread_id"),
     }
 
-    if mq_msg.get("is_reply") and mq_msg.get("reply_to"):
-        reply = mq_msg["reply_to"]
+    if get("is_reply") and (reply := get("reply_to")):
         msg["reply_to_message"] = {
             "message_id": reply.get("message_id"),
             "from": {
                 "id": reply.get("sender_id"),
-                "username": reply.get("sender_username"),
-                "first_name": reply.get("sender_fullname"),
+                "username": _intern_str(reply.get("sender_username")),
+                "first_name": _intern_str(reply.get("sender_fullname")),
             },
             "text": reply.get("text"),
         }
 
     # Use message_id as a surrogate for update_id
-    return {"update_id": mq_msg.get("message_id"), "message": msg}
+    return {"update_id": message_id, "message": msg}
+
+
+def _sender_id(container: Any) -> int | None:
+    if type(container) is not dict:
+        return None
+    sender = container.get("from")
+    if type(sender) is not dict:
+        return None
+    sender_id = sender.get("id")
+    return sender_id if type(sender_id) is int else None
+
+
+def _parse_amqp_bodies(bodies: list[bytes]) -> list[dict[str, Any]]:
+    """Decode delivery bodies into updates, skipping malformed ones.
+
+    Bodies carrying `chat_id` use the custom MQ format (see `_mq_to_update`);
+    other JSON objects are taken as Telegram updates as-is.
+    """
+
+    updates: list[dict[str, Any]] = []
+    for raw in bodies:
+        try:
+            body = loads_json(raw)
+            if type(body) is not dict:
+                raise ValueError(f"expected a JSON object, got {type(body).__name__}")
+            # Convert to standard format
+            updates.append(_mq_to_update(body) if "chat_id" in body else body)
+        except Exception as e:
+            logger.warning("Failed to parse AMQP message: %s", e)
+    return updates
 
 
 def _extract_update_from_user_id(update: dict[str, Any]) -> int | None:
-    for top_key in (
-        "message",
-        "edited_message",
-        "channel_post",
-        "edited_channel_post",
-        "business_message",
-        "edited_business_message",
-        "callback_query",
-    ):
-        val = update.get(top_key)
-        if not isinstance(val, dict):
+    """Return the sender id of the first message-like payload in `update`.
+
+    A `callback_query` without its own sender falls back to the sender of the
+    message it is attached to.
+    """
+
+    for top_key in _SENDER_MESSAGE_KEYS:
+        sender_id = _sender_id(update.get(top_key))
+        if sender_id is not None:
+            return sender_id
+
+    callback_query = update.get("callback_query")
+    if type(callback_query) is not dict:
+        return None
+    sender_id = _sender_id(callback_query)
+    if sender_id is not None:
+        return sender_id
+    return _sender_id(callback_query.get("message"))
+
+
+def _accept_updates(
+    updates: list[dict[str, Any]],
+    *,
+    pending_updates_by_id: dict[int, dict[str, Any]],
+    last_consumed_update_id: int | None,
+    bot_user_id: int | None,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Add the unseen, non-bot updates of one micro-batch to pending.
+
+    Returns the accepted updates in ascending `update_id` order and the new
+    consumed cursor. Only ids above every previously consumed id are accepted
+    and each batch is sorted, so `pending_updates_by_id` stays insertion-ordered
+    by ascending id and its first key is always the oldest pending update.
+    """
+
+    if len(updates) == 1:
+        # Common when traffic is light: same checks as
+        # `filter_updates_pipeline` without building a new list.
+        update_id = updates[0].get("update_id")
+        if (
+            type(update_id) is not int
+            or (
+                last_consumed_update_id is not None
+                and update_id <= last_consumed_update_id
+            )
+            or update_is_forum_topic_created(updates[0])
+        ):
+            return [], last_consumed_update_id
+        unseen_updates = updates
+    else:
+        unseen_updates, _ignored_forum_topic_created_updates = filter_updates_pipeline(
+            updates,
+            last_processed_update_id=last_consumed_update_id,
+        )
+        if not unseen_updates:
+            return [], last_consumed_update_id
+        # Deliveries can be reordered within a micro-batch.
+        unseen_updates.sort(key=itemgetter("update_id"))
+
+    # Both paths above leave only int `update_id`s, unique and ascending, so
+    # the last accepted update carries the newest id and no per-update
+    # re-validation is needed.
+    if bot_user_id is None:
+        accepted_updates = unseen_updates
+    else:
+        accepted_updates = [
+            unseen
+            for unseen in unseen_updates
+            if _extract_update_from_user_id(unseen) != bot_user_id
+        ]
+    for unseen in accepted_updates:
+        pending_updates_by_id.setdefault(unseen["update_id"], unseen)
+    if accepted_updates:
+        last_consumed_update_id = accepted_updates[-1]["update_id"]
+    return accepted_updates, last_consumed_update_id
+
+
+def _evict_oldest_pending(
+    pending_updates_by_id: dict[int, dict[str, Any]],
+    *,
+    max_pending: int = _MAX_PENDING_UPDATES,
+) -> None:
+    """Drop the oldest pending updates until at most `max_pending` remain."""
+
+    while len(pending_updates_by_id) > max_pending:
+        del pending_updates_by_id[next(iter(pending_updates_by_id))]
+
+
+async def _requeue_unsettled(batch: list[AbstractIncomingMessage]) -> None:
+    """Hand back every delivery of `batch` not yet acked or rejected.
+
+    Used when shutting down mid-batch, so the next consumer sees them.
+    """
+
+    with anyio.CancelScope(shield=True), contextlib.suppress(Exception):
+        await batch[-1].nack(multiple=True, requeue=True)
+
+
+async def _handle_deliveries_individually(
+    batch: list[AbstractIncomingMessage],
+    handle_bodies: Callable[[list[bytes]], Awaitable[None]],
+) -> Exception | None:
+    """Retry a failed micro-batch one delivery at a time.
+
+    Each delivery is acked once handled. One that fails on its own is rejected
+    without requeue, as `message.process()` does, so a poison update is dropped
+    while the healthy deliveries around it are still processed. Returns the
+    first such failure, or `None` when every delivery succeeded.
+    """
+
+    first_error: Exception | None = None
+    for message in batch:
+        try:
+            await handle_bodies([message.body])
+        except Exception as e:
+            logger.warning(
+                "AMQP delivery rejected (delivery_tag=%s): %s: %s",
+                message.delivery_tag,
+                type(e).__name__,
+                e,
+            )
+            await message.reject(requeue=False)
+            if first_error is None:
+                first_error = e
             continue
-        sender = val.get("from")
-        if isinstance(sender, dict):
-            sender_id = sender.get("id")
-            if isinstance(sender_id, int):
-                return sender_id
-        if top_key == "callback_query":
-            msg = val.get("message")
-            if not isinstance(msg, dict):
-                continue
-            sender = msg.get("from")
-            if isinstance(sender, dict):
-                sender_id = sender.get("id")
-                if isinstance(sender_id, int):
-                    return sender_id
-    return None
+        await message.ack()
+    return first_error
 
 
 async def run_amqp_forever(
@@ -206,20 +518,48 @@ async def run_amqp_forever(
     amqp_url: str,
     queue_name: str,
     keyword: str,
-    chat_ids: set[int] | None,
+    chat_ids: AbstractSet[int] | None,
     updates_store_path: Path | None = None,
     dispatch_recent_per_chat: int = 0,
     tz: datetime.tzinfo,
+    prefetch_count: int = _DEFAULT_PREFETCH_COUNT,
+    max_concurrent_agents: int = _DEFAULT_MAX_CONCURRENT_AGENTS,
 ) -> None:
-    """Run AMQP consumption once and propagate unexpected failures."""
+    """Run AMQP consumption once and propagate unexpected failures.
+
+    Up to `prefetch_count` unacknowledged deliveries are in flight. Deliveries
+    are processed in micro-batches of whatever has already arrived, and each
+    micro-batch is acknowledged with a single `multiple=True` ack. When a
+    micro-batch fails it is retried one delivery at a time: handled deliveries
+    are acked and only the failing ones are rejected (without requeue), after
+    which the first failure is raised. A cancellation requeues every delivery
+    not yet settled.
+
+    Each triggered chat batch runs the agent in its own task, but at most
+    `max_concurrent_agents` agent runs execute at once.
+    """
 
     if dispatch_recent_per_chat < 0:
         raise ValueError(
             f"dispatch_recent_per_chat must be >= 0; got {dispatch_recent_per_chat}"
         )
+    if prefetch_count <= 0:
+        raise ValueError(f"prefetch_count must be > 0; got {prefetch_count}")
+    if max_concurrent_agents <= 0:
+        raise ValueError(
+            f"max_concurrent_agents must be > 0; got {max_concurrent_agents}"
+        )
+
+    # Triggers are checked per keyword in the `|`-separated list; the list and
+    # the watchlist are loop invariants, so normalize them once.
+    keywords: tuple[str, ...] = tuple(
+        k.strip() for k in keyword.split("|") if k.strip()
+    )
+    if chat_ids is not None:
+        chat_ids = frozenset(chat_ids)
 
     mem_store = FolderMemoryStore(root=config.config_base / "memories")
-    append_lock = anyio.Lock()
+    append_lock = threading.Lock()
 
     bot_user_id = None
     bot_username = None
@@ -233,7 +573,25 @@ async def run_amqp_forever(
         except TelegramBotApiError as e:
             print(f"[yellow]Telegram getMe failed[/yellow]: {e}")
 
+    agent_slots = anyio.Semaphore(max_concurrent_agents)
+
+    async def run_agent_in_slot(
+        chat_id: int | None, batch_updates: list[dict[str, Any]]
+    ) -> None:
+        async with agent_slots:
+            await run_agent_for_chat_batch(
+                api,
+                chat_id,
+                batch_updates,
+                model,
+                config,
+                mem_store,
+                append_lock,
+                tz,
+            )
+
     last_consumed_update_id: int | None = None
+    # Insertion-ordered in ascending `update_id` (see `_accept_updates`).
     pending_updates_by_id: dict[int, dict[str, Any]] = {}
 
     last_trigger_update_id_by_chat: dict[int, int] = {}
@@ -274,263 +632,270 @@ async def run_amqp_forever(
         )
     )
 
-    connection = await aio_pika.connect_robust(amqp_url)
-    async with connection:
-        channel = await connection.channel()
-        await channel.set_qos(prefetch_count=10)
-
-        # Ensure we have our own queue to avoid missing messages due to other consumers
-        # and bind it to the chats we care about.
-        queue = await channel.declare_queue(exclusive=True)
-        if chat_ids:
-            for cid in chat_ids:
-                # Standard routing key format for the userbot-listener
-                routing_key = f"chat:{cid}"
-                await queue.bind("telegram.messages", routing_key=routing_key)
-                print(f"Bound to chat: {cid}")
-        else:
-            # Fallback to the provided queue name if no chat_ids specified
-            queue = await channel.get_queue(queue_name)
-        async with anyio.create_task_group() as tg:
-            async with queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    async with message.process():
-                        try:
-                            body = json.loads(message.body.decode())
-                            # Convert to standard format
-                            update = _mq_to_update(body) if "chat_id" in body else body
-                        except Exception as e:
-                            print(f"Failed to parse message: {e}")
-                            continue
-
-                        unseen_updates = filter_unseen_updates(
-                            [update],
-                            last_processed_update_id=last_consumed_update_id,
-                        )
-                        unseen_updates, _ignored_forum_topic_created_updates = (
-                            filter_non_forum_topic_created_updates(unseen_updates)
-                        )
-                        if not unseen_updates:
-                            continue
-
-                        accepted_updates: list[dict[str, Any]] = []
-                        latest_observed_update_id = last_consumed_update_id
-                        for unseen in unseen_updates:
-                            if bot_user_id is not None:
-                                from_user_id = _extract_update_from_user_id(unseen)
-                                if from_user_id == bot_user_id:
-                                    continue
-                            update_id = extract_update_id(unseen)
-                            if update_id is None:
-                                continue
-                            pending_updates_by_id.setdefault(update_id, unseen)
-                            accepted_updates.append(unseen)
-                            if (
-                                latest_observed_update_id is None
-                                or update_id > latest_observed_update_id
-                            ):
-                                latest_observed_update_id = update_id
-
-                        if latest_observed_update_id is not None:
-                            last_consumed_update_id = latest_observed_update_id
-
-                        persisted = 0
-                        if updates_store_path is not None and accepted_updates:
-                            try:
-                                persisted = await to_thread.run_sync(
-                                    append_updates_jsonl,
-                                    updates_store_path,
-                                    list(accepted_updates),
-                                )
-                            except OSError as e:
-                                print(
-                                    "[yellow]telegram persist error[/yellow] "
-                                    + f"path={updates_store_path}: {type(e).__name__}: {e}"
-                                )
-
-                        # Check triggers for each keyword in the list (split by |)
-                        keywords = [k.strip() for k in keyword.split("|") if k.strip()]
-
-                        # We use a custom trigger check to support multiple keywords
-                        pending_updates_in_order = [
-                            pending_updates_by_id[update_id]
-                            for update_id in sorted(pending_updates_by_id)
-                        ]
-
-                        def get_triggered_keyword(
-                            updates: list[dict[str, Any]],
-                        ) -> str | None:
-                            for k in keywords:
-                                if dispatch_groups_for_batch(
-                                    updates,
-                                    keyword=k,
-                                    chat_ids=chat_ids,
-                                    bot_user_id=bot_user_id,
-                                    bot_username=bot_username,
-                                ):
-                                    return k
-                            return None
-
-                        triggered_keyword = get_triggered_keyword(
-                            pending_updates_in_order
+    try:
+        connection = await aio_pika.connect_robust(amqp_url)
+        async with connection:
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=prefetch_count)
+
+            # Ensure we have our own queue to avoid missing messages due to other consumers
+            # and bind it to the chats we care about.
+            queue = await channel.declare_queue(exclusive=True)
+            if chat_ids:
+                for cid in chat_ids:
+                    # Standard routing key format for the userbot-listener
+                    routing_key = f"chat:{cid}"
+                    await queue.bind("telegram.messages", routing_key=routing_key)
+                    print(f"Bound to chat: {cid}")
+            else:
+                # Fallback to the provided queue name if no chat_ids specified
+                queue = await channel.get_queue(queue_name)
+            # Deliveries are pushed into a local stream by the consumer callback
+            # and drained in micro-batches. Unacked deliveries are capped by
+            # `prefetch_count`, so the stream buffer never blocks the callback.
+            send, receive = anyio.create_memory_object_stream[AbstractIncomingMessage](
+                prefetch_count
+            )
+            await queue.consume(send.send, no_ack=False)
+            persist_send, persist_receive = anyio.create_memory_object_stream[
+                _PersistJob
+            ](_PERSIST_QUEUE_MAX_JOBS)
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(_run_persist_writer, persist_receive)
+
+                async def handle_updates(updates: list[dict[str, Any]]) -> None:
+                    """Dedupe, persist and trigger-check one micro-batch of updates."""
+
+                    nonlocal last_consumed_update_id
+                    accepted_updates, last_consumed_update_id = _accept_updates(
+                        updates,
+                        pending_updates_by_id=pending_updates_by_id,
+                        last_consumed_update_id=last_consumed_update_id,
+                        bot_user_id=bot_user_id,
+                    )
+                    if not accepted_updates:
+                        # Pending is unchanged, so the trigger check would
+                        # give the same answer as for the previous batch.
+                        return
+
+                    persist_queued = 0
+                    if updates_store_path is not None and accepted_updates:
+                        # Written by the background writer; failures are
+                        # reported there.
+                        await persist_send.send(
+                            _AppendUpdatesJob(updates_store_path, accepted_updates)
                         )
-
-                        grouped = None
-                        if triggered_keyword:
-                            grouped = dispatch_groups_for_batch(
-                                pending_updates_in_order,
-                                keyword=triggered_keyword,
+                        persist_queued = len(accepted_updates)
+
+                    # We use a custom trigger check to support multiple keywords
+                    pending_updates_in_order = list(pending_updates_by_id.values())
+
+                    def get_triggered_groups(
+                        updates: list[dict[str, Any]],
+                    ) -> dict[int | None, list[dict[str, Any]]] | None:
+                        # The first keyword that triggers also yields the
+                        # dispatch groups, so no second evaluation is needed.
+                        for k in keywords:
+                            groups = dispatch_groups_for_batch(
+                                updates,
+                                keyword=k,
                                 chat_ids=chat_ids,
                                 bot_user_id=bot_user_id,
                                 bot_username=bot_username,
                             )
+                            if groups:
+                                return groups
+                        return None
+
+                    grouped = get_triggered_groups(pending_updates_in_order)
+
+                    if grouped:
+                        # If chat_ids is provided, treat it as an exclusive filter for dispatching
+                        # to avoid duplicate processing in multi-instance setups.
+                        if chat_ids is not None:
+                            dispatch_groups = {
+                                cid: updates
+                                for cid, updates in grouped.items()
+                                if cid in chat_ids
+                            }
+                        else:
+                            dispatch_groups = grouped
 
-                        if grouped:
-                            # If chat_ids is provided, treat it as an exclusive filter for dispatching
-                            # to avoid duplicate processing in multi-instance setups.
-                            if chat_ids is not None:
-                                dispatch_groups = {
-                                    cid: updates
-                                    for cid, updates in grouped.items()
-                                    if cid in chat_ids
-                                }
-                            else:
-                                dispatch_groups = grouped
-
-                            if not dispatch_groups:
-                                # Trigger condition matched but no updates from watched chats to dispatch.
-                                # Clear pending to avoid re-evaluating the same batch.
-                                pending_updates_by_id.clear()
-                                continue
-
-                            dispatch_source = "pending"
-                            replaced_groups = 0
-                            if (
-                                updates_store_path is not None
-                                and dispatch_recent_per_chat > 0
-                            ):
-                                try:
-                                    recent_groups = await to_thread.run_sync(
-                                        partial(
-                                            load_recent_updates_grouped_by_chat_id,
-                                            updates_store_path,
-                                            per_chat_limit=dispatch_recent_per_chat,
-                                        )
-                                    )
-                                except (OSError, ValueError) as e:
-                                    print(
-                                        "[yellow]telegram recent load error[/yellow] "
-                                        + f"path={updates_store_path}: {type(e).__name__}: {e}"
+                        if not dispatch_groups:
+                            # Trigger condition matched but no updates from watched chats to dispatch.
+                            # Clear pending to avoid re-evaluating the same batch.
+                            pending_updates_by_id.clear()
+                            return
+
+                        dispatch_source = "pending"
+                        replaced_groups = 0
+                        if (
+                            updates_store_path is not None
+                            and dispatch_recent_per_chat > 0
+                        ):
+                            # The recent window must include this batch.
+                            await _flush_persist_writer(persist_send)
+                            try:
+                                recent_groups = await to_thread.run_sync(
+                                    partial(
+                                        load_recent_updates_grouped_by_chat_id,
+                                        updates_store_path,
+                                        per_chat_limit=dispatch_recent_per_chat,
                                     )
-                                else:
-                                    dispatch_groups, replaced_groups = (
-                                        overlay_dispatch_groups_with_recent(
-                                            grouped,
-                                            recent_groups=recent_groups,
-                                        )
+                                )
+                            except (OSError, ValueError) as e:
+                                logger.warning(
+                                    "telegram recent load error path=%s: %s: %s",
+                                    updates_store_path,
+                                    type(e).__name__,
+                                    e,
+                                )
+                            else:
+                                dispatch_groups, replaced_groups = (
+                                    overlay_dispatch_groups_with_recent(
+                                        grouped,
+                                        recent_groups=recent_groups,
                                     )
-                                    if replaced_groups:
-                                        dispatch_source = "stored_recent"
-
-                            cursor_dropped_updates = 0
-                            cursor_dropped_groups = 0
-                            (
-                                dispatch_groups,
-                                forum_topic_created_dropped_updates,
-                                forum_topic_created_dropped_groups,
-                            ) = filter_dispatch_groups_without_forum_topic_created_updates(
-                                dispatch_groups
-                            )
-                            if forum_topic_created_dropped_updates:
-                                dispatch_source += "+forum_topic_created"
+                                )
+                                if replaced_groups:
+                                    dispatch_source = "stored_recent"
+
+                        cursor_dropped_updates = 0
+                        cursor_dropped_groups = 0
+                        (
+                            dispatch_groups,
+                            forum_topic_created_dropped_updates,
+                            forum_topic_created_dropped_groups,
+                        ) = filter_dispatch_groups_without_forum_topic_created_updates(
+                            dispatch_groups
+                        )
+                        if forum_topic_created_dropped_updates:
+                            dispatch_source += "+forum_topic_created"
+
+                        (
+                            dispatch_groups,
+                            cursor_dropped_updates,
+                            cursor_dropped_groups,
+                        ) = filter_dispatch_groups_after_last_trigger(
+                            dispatch_groups,
+                            last_trigger_update_id_by_chat=last_trigger_update_id_by_chat,
+                        )
+                        if cursor_dropped_updates:
+                            dispatch_source += "+cursor"
 
+                        capped_dropped_updates = 0
+                        capped_dropped_groups = 0
+                        if dispatch_recent_per_chat > 0:
                             (
                                 dispatch_groups,
-                                cursor_dropped_updates,
-                                cursor_dropped_groups,
-                            ) = filter_dispatch_groups_after_last_trigger(
+                                capped_dropped_updates,
+                                capped_dropped_groups,
+                            ) = cap_dispatch_groups_per_chat(
                                 dispatch_groups,
-                                last_trigger_update_id_by_chat=last_trigger_update_id_by_chat,
+                                per_chat_limit=dispatch_recent_per_chat,
                             )
-                            if cursor_dropped_updates:
-                                dispatch_source += "+cursor"
-
-                            capped_dropped_updates = 0
-                            capped_dropped_groups = 0
-                            if dispatch_recent_per_chat > 0:
-                                (
-                                    dispatch_groups,
-                                    capped_dropped_updates,
-                                    capped_dropped_groups,
-                                ) = cap_dispatch_groups_per_chat(
-                                    dispatch_groups,
-                                    per_chat_limit=dispatch_recent_per_chat,
-                                )
-                                if capped_dropped_updates:
-                                    dispatch_source += "+cap"
-
-                            print(
-                                "[green]AMQP trigger[/green] "
-                                + f"pending={len(pending_updates_in_order)} groups={len(dispatch_groups)} "
-                                + f"source={dispatch_source} replaced_groups={replaced_groups} "
-                                + "forum_topic_created_dropped_updates="
-                                + f"{forum_topic_created_dropped_updates} "
-                                + "forum_topic_created_dropped_groups="
-                                + f"{forum_topic_created_dropped_groups} "
-                                + f"cursor_dropped_updates={cursor_dropped_updates} cursor_dropped_groups={cursor_dropped_groups} "
-                                + f"cap_dropped_updates={capped_dropped_updates} cap_dropped_groups={capped_dropped_groups} "
-                                + f"persisted={persisted if updates_store_path is not None else None}"
-                            )
-
-                            if not dispatch_groups:
-                                print(
-                                    "[green]AMQP dispatch[/green] "
-                                    + "skipped: no updates newer than last trigger cursor"
-                                )
-                                pending_updates_by_id.clear()
-                                continue
+                            if capped_dropped_updates:
+                                dispatch_source += "+cap"
+
+                        logger.info(
+                            "AMQP trigger pending=%d groups=%d source=%s "
+                            "replaced_groups=%d "
+                            "forum_topic_created_dropped_updates=%d "
+                            "forum_topic_created_dropped_groups=%d "
+                            "cursor_dropped_updates=%d cursor_dropped_groups=%d "
+                            "cap_dropped_updates=%d cap_dropped_groups=%d "
+                            "persist_queued=%s",
+                            len(pending_updates_in_order),
+                            len(dispatch_groups),
+                            dispatch_source,
+                            replaced_groups,
+                            forum_topic_created_dropped_updates,
+                            forum_topic_created_dropped_groups,
+                            cursor_dropped_updates,
+                            cursor_dropped_groups,
+                            capped_dropped_updates,
+                            capped_dropped_groups,
+                            persist_queued if updates_store_path is not None else None,
+                        )
 
+                        if not dispatch_groups:
+                            logger.info(
+                                "AMQP dispatch skipped: "
+                                "no updates newer than last trigger cursor"
+                            )
                             pending_updates_by_id.clear()
+                            return
+
+                        pending_updates_by_id.clear()
 
-                            updated_cursor_chats = (
-                                update_last_trigger_update_id_by_chat(
+                        updated_cursor_chats = update_last_trigger_update_id_by_chat(
+                            last_trigger_update_id_by_chat,
+                            dispatched_groups=dispatch_groups,
+                        )
+                        if (
+                            updated_cursor_chats
+                            and trigger_cursor_state_path is not None
+                        ):
+                            await persist_send.send(
+                                _SaveTriggerCursorJob(
+                                    trigger_cursor_state_path,
                                     last_trigger_update_id_by_chat,
-                                    dispatched_groups=dispatch_groups,
                                 )
                             )
-                            if (
-                                updated_cursor_chats
-                                and trigger_cursor_state_path is not None
-                            ):
-                                try:
-                                    await to_thread.run_sync(
-                                        save_last_trigger_update_id_by_chat,
-                                        trigger_cursor_state_path,
-                                        dict(last_trigger_update_id_by_chat),
-                                    )
-                                except (OSError, ValueError) as e:
-                                    print(
-                                        "[yellow]telegram trigger cursor save error[/yellow] "
-                                        + f"path={trigger_cursor_state_path}: {type(e).__name__}: {e}"
-                                    )
 
-                            for cid, updates_for_chat in dispatch_groups.items():
-                                tg.start_soon(
-                                    run_agent_for_chat_batch,
-                                    api,
-                                    cid,
-                                    list(updates_for_chat),
-                                    model,
-                                    config,
-                                    mem_store,
-                                    append_lock,
-                                    tz,
-                                )
-                        else:
-                            # Keep pending bounded while waiting for a trigger.
-                            while len(pending_updates_by_id) > 100:
-                                oldest_update_id = min(pending_updates_by_id)
-                                pending_updates_by_id.pop(oldest_update_id, None)
+                        for cid, updates_for_chat in dispatch_groups.items():
+                            tg.start_soon(
+                                run_agent_in_slot, cid, list(updates_for_chat)
+                            )
+                    else:
+                        # Keep pending bounded while waiting for a trigger.
+                        _evict_oldest_pending(pending_updates_by_id)
+
+                async def handle_bodies(bodies: list[bytes]) -> None:
+                    if sum(map(len, bodies)) > _PARSE_OFF_LOOP_MIN_BYTES:
+                        updates = await to_thread.run_sync(_parse_amqp_bodies, bodies)
+                    else:
+                        updates = _parse_amqp_bodies(bodies)
+                    if updates:
+                        await handle_updates(updates)
+
+                while True:
+                    batch = await _receive_message_batch(
+                        receive, max_messages=prefetch_count
+                    )
+                    try:
+                        await handle_bodies([message.body for message in batch])
+                    except anyio.get_cancelled_exc_class():
+                        await _requeue_unsettled(batch)
+                        raise
+                    except Exception as e:
+                        if len(batch) == 1:
+                            await batch[0].reject(requeue=False)
+                            raise
+                        logger.warning(
+                            "AMQP micro-batch of %d failed (%s: %s); "
+                            "retrying deliveries one by one",
+                            len(batch),
+                            type(e).__name__,
+                            e,
+                        )
+                        try:
+                            error = await _handle_deliveries_individually(
+                                batch, handle_bodies
+                            )
+                        except anyio.get_cancelled_exc_class():
+                            await _requeue_unsettled(batch)
+                            raise
+                        if error is not None:
+                            raise error from e
+                        continue
+                    # One broker round trip acknowledges the whole micro-batch.
+                    await batch[-1].ack(multiple=True)
+    finally:
+        with anyio.CancelScope(shield=True):
+            if api is not None:
+                await api.aclose()
+            await aclose_media_client()
 
 
 async def run(
@@ -544,6 +909,8 @@ async def run(
     updates_store_path: str | Path | None = None,
     dispatch_recent_per_chat: int = 0,
     timezone: str = _DEFAULT_TIMEZONE,
+    prefetch_count: int = _DEFAULT_PREFETCH_COUNT,
+    max_concurrent_agents: int = _DEFAULT_MAX_CONCURRENT_AGENTS,
 ) -> None:
     """Entrypoint for the Telegram AMQP starter.
 
@@ -557,9 +924,7 @@ async def run(
         raise ValueError(
             "amqp_url is required (pass it directly or set AMQP_URL env var)"
         )
-    logfire.configure()
-    logfire.instrument_pydantic_ai()
-    logging.basicConfig(level=logging.INFO, handlers=[logfire.LogfireLoggingHandler()])
+    init_observability()
 
     config = Config()
     try:
@@ -567,16 +932,15 @@ async def run(
     except ValueError as e:
         raise ValueError(f"Invalid timezone: {e}") from e
 
-    parsed_chat_ids: set[int] | None
+    parsed_chat_ids: AbstractSet[int] | None
     raw_chat_ids = str(chat_id).strip()
     if not raw_chat_ids:
         parsed_chat_ids = None
     else:
-        import re
-
-        parts = [p for p in re.split(r"[,\s]+", raw_chat_ids) if p]
+        # Treat commas as whitespace; bare `split()` drops empty runs.
+        parts = raw_chat_ids.replace(",", " ").split()
         try:
-            parsed_chat_ids = {int(p) for p in parts}
+            parsed_chat_ids = frozenset(map(int, parts))
         except ValueError as e:
             raise ValueError(f"Invalid chat_id entry in: {raw_chat_ids!r}") from e
         parsed_chat_ids = _expand_chat_id_watchlist(parsed_chat_ids)
@@ -601,4 +965,6 @@ async def run(
         updates_store_path=store_path,
         dispatch_recent_per_chat=dispatch_recent_per_chat,
         tz=tz,
+        prefetch_count=prefetch_count,
+        max_concurrent_agents=max_concurrent_agents,
     )
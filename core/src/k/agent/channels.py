@@ -26,8 +26,8 @@ def validate_channel_path(value: str, *, field_name: str) -> str:
     if channel.startswith("/") or channel.endswith("/"):
         raise ValueError(f"{field_name} must not start/end with '/': {value!r}")
 
-    parts = channel.split("/")
-    if any(not part for part in parts):
+    # With both ends checked above, an empty segment can only be a `//` run.
+    if "//" in channel:
         raise ValueError(f"{field_name} contains empty path segment(s): {value!r}")
     return channel
 
@@ -55,11 +55,23 @@ def channel_root(channel: str) -> str:
 def channel_has_prefix(*, channel: str, prefix: str) -> bool:
     """Return true when `channel` is equal to `prefix` or in its subtree."""
 
-    return channel == prefix or channel.startswith(prefix + "/")
+    # Index the boundary instead of building `prefix + "/"` per call.
+    return channel.startswith(prefix) and (
+        len(channel) == len(prefix) or channel[len(prefix)] == "/"
+    )
 
 
 def iter_channel_prefixes(channel: str) -> list[str]:
-    """Return root-to-leaf channel prefixes."""
+    """Return root-to-leaf channel prefixes.
 
-    parts = channel.split("/")
-    return ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    Each prefix is a slice of `channel` up to a separator, so the work is
+    linear in the channel length rather than re-joining segments per prefix.
+    """
+
+    out: list[str] = []
+    sep = channel.find("/")
+    while sep != -1:
+        out.append(channel[:sep])
+        sep = channel.find("/", sep + 1)
+    out.append(channel)
+    return out
@@ -4,10 +4,43 @@ Public entrypoints:
 - `Event`: structured input wrapper used by starters (e.g. Telegram polling).
 - `MyDeps`: deps container used by tools/runtime.
 - `agent_run`: run the agent and return a `MemoryRecord`.
+- `agent_run_batch`: run many independent events with bounded concurrency.
+
+Exports are resolved lazily (PEP 562): importing this package, or a light
+submodule such as `k.agent.core.entities`, does not build the agent module and
+its `pydantic_ai.Agent` until one of its names is first accessed.
+
+Gotcha: `k.agent.core.agent` names both the submodule and the `Agent` object.
+A lazy lookup binds every export of the loaded module (so `agent` is the
+`Agent`), but after a direct `import k.agent.core.agent` the package attribute
+is the submodule until an export is looked up; prefer
+`from k.agent.core.agent import agent`.
 """
 
-from k.agent.core.agent import MyDeps, agent, agent_run, finish_action
-from k.agent.core.entities import Event, MemoryHint
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from k.agent.core.agent import (
+        MyDeps,
+        agent,
+        agent_run,
+        agent_run_batch,
+        finish_action,
+    )
+    from k.agent.core.entities import Event, MemoryHint
+
+_EXPORTS: dict[str, str] = {
+    "Event": "k.agent.core.entities",
+    "MemoryHint": "k.agent.core.entities",
+    "MyDeps": "k.agent.core.agent",
+    "agent": "k.agent.core.agent",
+    "agent_run": "k.agent.core.agent",
+    "agent_run_batch": "k.agent.core.agent",
+    "finish_action": "k.agent.core.agent",
+}
 
 __all__ = [
     "Event",
@@ -15,5 +48,24 @@ __all__ = [
     "MyDeps",
     "agent",
     "agent_run",
+    "agent_run_batch",
     "finish_action",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name)
+    # Bind all of the module's exports at once; this also replaces the
+    # package attribute the import system sets for the `agent` submodule.
+    g = globals()
+    for export, export_module in _EXPORTS.items():
+        if export_module == module_name:
+            g[export] = getattr(module, export)
+    return g[name]
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
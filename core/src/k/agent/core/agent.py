@@ -4,6 +4,7 @@ This module owns:
 - `MyDeps`: deps container shared by tools and runtime orchestration.
 - `agent`: the `pydantic_ai.Agent` wiring (system prompts + tools).
 - `agent_run`: the primary runtime entrypoint (memory selection + compaction).
+- `agent_run_batch`: bounded-concurrency `agent_run` over independent events.
 
 Preference injection:
     Channel preferences are injected from
@@ -24,12 +25,15 @@ Memory compaction contract:
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Sequence
+import functools
+import time
+from collections.abc import Iterator, Sequence
 from copy import copy
 from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import cast
+from typing import cast, overload
 
 from pydantic_ai import (
     Agent,
@@ -74,11 +78,13 @@ from k.agent.memory.folder import FolderMemoryStore
 from k.agent.memory.paths import memory_root_from_config_base
 from k.agent.memory.store import MemoryStore
 from k.config import Config
+from k.io_helpers.file_cache import read_text_cached
 from k.io_helpers.shell import ShellSessionManager
 from k.runner_helpers.basic_os import (
     AGENT_CONFIG_BASE_EXPR,
     BasicOSHelper,
     agent_config_base_value,
+    cached_agent_config_base_value,
 )
 
 
@@ -89,7 +95,9 @@ class MyDeps:
     Lifecycle:
         `MyDeps` owns a `ShellSessionManager` which may keep subprocesses alive
         across multiple tool calls. Always close it when the deps are no longer
-        needed (prefer `async with MyDeps(...)`).
+        needed (prefer `async with MyDeps(...)`). The manager and
+        `basic_os_helper` are created on first access, so deps that never
+        touch the shell skip both.
 
     Input event:
         Prompt builders use
@@ -113,13 +121,31 @@ class MyDeps:
     count_down: int = 6
     stuck_warning: int = 0
     stuck_warning_limit: int = 3
-    basic_os_helper: BasicOSHelper = field(init=False)
-    shell_manager: ShellSessionManager = field(init=False)
+    _basic_os_helper: BasicOSHelper | None = field(default=None, init=False, repr=False)
+    _shell_manager: ShellSessionManager | None = field(
+        default=None, init=False, repr=False
+    )
     _closed: bool = field(default=False, init=False, repr=False)
 
-    def __post_init__(self):
-        self.basic_os_helper = BasicOSHelper(config=self.config)
-        self.shell_manager = ShellSessionManager()
+    @property
+    def basic_os_helper(self) -> BasicOSHelper:
+        """Shell command builder for `config`, created on first access."""
+
+        helper = self._basic_os_helper
+        if helper is None:
+            helper = self._basic_os_helper = BasicOSHelper(config=self.config)
+        return helper
+
+    @property
+    def shell_manager(self) -> ShellSessionManager:
+        """Shell sessions for this run, created on first access."""
+
+        manager = self._shell_manager
+        if manager is None:
+            if self._closed:
+                raise RuntimeError("MyDeps is closed")
+            manager = self._shell_manager = ShellSessionManager()
+        return manager
 
     async def __aenter__(self) -> MyDeps:
         return self
@@ -133,7 +159,41 @@ class MyDeps:
         if self._closed:
             return
         self._closed = True
-        await self.shell_manager.close()
+        if self._shell_manager is not None:
+            await self._shell_manager.close()
+
+
+class _AppendedMessages(Sequence[ModelMessage]):
+    """Read-only view of `messages` followed by one extra message."""
+
+    __slots__ = ("_extra", "_messages")
+
+    def __init__(self, messages: Sequence[ModelMessage], extra: ModelMessage) -> None:
+        self._messages = messages
+        self._extra = extra
+
+    def __len__(self) -> int:
+        return len(self._messages) + 1
+
+    @overload
+    def __getitem__(self, index: int) -> ModelMessage: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[ModelMessage]: ...
+    def __getitem__(self, index: int | slice) -> ModelMessage | list[ModelMessage]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        n = len(self._messages)
+        if index < 0:
+            index += n + 1
+        if index == n:
+            return self._extra
+        if not 0 <= index < n:
+            raise IndexError(index)
+        return self._messages[index]
+
+    def __iter__(self) -> Iterator[ModelMessage]:
+        yield from self._messages
+        yield self._extra
 
 
 @tool_exception_guard
@@ -143,8 +203,8 @@ async def fork(
 ) -> str:
     """Run `instruct` in a forked agent run.
 
-    The fork reuses the current conversation and memory context by copying the
-    current model history and appending a synthetic tool-return message that
+    The fork reuses the current conversation and memory context by viewing the
+    current model history with a synthetic tool-return message that
     represents the current tool call completion.
 
     Returns a short status string; on success it includes the forked run's
@@ -159,15 +219,16 @@ async def fork(
     # parent_mems = (
     #     inject_memories if inject_memories else []
     # )
-    # Copy the current exchange so the child run starts from the same context.
-    message_history = copy(ctx.messages)
-    if isinstance(message_history[-1], ModelResponse):
+    # View the current exchange plus the completing tool return without copying
+    # it; `agent.run` materializes its own history list anyway.
+    if isinstance(ctx.messages[-1], ModelResponse):
         if not ctx.tool_name or not ctx.tool_call_id:
             raise RuntimeError(
                 "Tool name and call id must be set when forking from a ModelResponse"
             )
         # The child run should see this tool call as completed before continuing.
-        message_history.append(
+        message_history = _AppendedMessages(
+            ctx.messages,
             ModelRequest(
                 parts=[
                     ToolReturnPart(
@@ -176,7 +237,7 @@ async def fork(
                         tool_call_id=ctx.tool_call_id,
                     )
                 ]
-            )
+            ),
         )
     else:
         raise RuntimeError("Last message when forking must be a ModelResponse")
@@ -199,7 +260,7 @@ async def fork(
     except Exception as e:
         return f"Fork failed: {type(e).__name__}: {e}"
     else:
-        mem.parents = list(set(mem.parents + ctx.deps.memory_parents))
+        mem.parents = list(dict.fromkeys(chain(mem.parents, ctx.deps.memory_parents)))
         ctx.deps.memory_storage.append(mem)
         ctx.deps.memory_parents.append(mem.id_)
         return "\n".join(
@@ -241,12 +302,41 @@ def _channel_preference_candidates(in_channel: str, *, pref_root: Path) -> list[
     """
 
     out: list[Path] = _root_preference_candidates(pref_root)
-    for prefix in iter_channel_prefixes(in_channel):
-        out.append(pref_root / f"{prefix}.md")
-        out.append(pref_root / prefix / "PREFERENCES.md")
+    out.extend(_channel_prefix_preference_candidates(in_channel, pref_root=pref_root))
     return out
 
 
+@functools.lru_cache(maxsize=256)
+def _channel_prefix_preference_candidates(
+    in_channel: str, *, pref_root: Path
+) -> tuple[Path, ...]:
+    """Build the per-prefix part of `_channel_preference_candidates`.
+
+    Memoized: the paths depend only on the arguments, and each run on a
+    channel would otherwise rebuild two `Path` objects per prefix.
+    """
+
+    return tuple(
+        path
+        for prefix in iter_channel_prefixes(in_channel)
+        for path in (pref_root / f"{prefix}.md", pref_root / prefix / "PREFERENCES.md")
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _root_preference_paths(pref_root: Path) -> tuple[Path, Path]:
+    """Return the `(PREFERENCES.md, PREFERENCES.default.md)` paths."""
+
+    return pref_root / "PREFERENCES.md", pref_root / "PREFERENCES.default.md"
+
+
+# (in_channel, pref_root) -> (loaded (path, text) pairs, assembled prompt).
+_PREFERENCES_PROMPT_CACHE: dict[
+    tuple[str, Path], tuple[tuple[tuple[Path, str | None], ...], str]
+] = {}
+_PREFERENCES_PROMPT_CACHE_MAX = 256
+
+
 def _load_preferences_prompt(*, in_channel: str, pref_root: Path) -> str:
     """Load root-level + channel-prefix preferences into a prompt chunk.
 
@@ -259,24 +349,50 @@ def _load_preferences_prompt(*, in_channel: str, pref_root: Path) -> str:
         Each section starts with its corresponding absolute file path.
     """
 
+    # Same order as `_channel_preference_candidates`, but the root choice is
+    # made from the read itself: a separate `exists()` probe would stat
+    # `PREFERENCES.md` twice per run.
+    root_path, default_path = _root_preference_paths(pref_root)
+    root_text = read_text_cached(root_path)
+    if root_text is None:
+        root_path = default_path
+        root_text = read_text_cached(root_path)
+    loaded: list[tuple[Path, str | None]] = [(root_path, root_text)]
+    loaded.extend(
+        (path, read_text_cached(path))
+        for path in _channel_prefix_preference_candidates(
+            in_channel, pref_root=pref_root
+        )
+    )
+
+    key = tuple(loaded)
+    cached = _PREFERENCES_PROMPT_CACHE.get((in_channel, pref_root))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
     blocks: list[str] = []
-    for path in _channel_preference_candidates(in_channel, pref_root=pref_root):
-        if not path.exists():
-            continue
-        try:
-            text = path.read_text(encoding="utf-8").strip()
-        except OSError:
+    for path, text in loaded:
+        if text is None:
             continue
+        text = text.strip()
         if not text:
             continue
         blocks.append("\n".join([f"Path: {path}", text, "---"]))
 
-    if not blocks:
-        return ""
-    comment = "**The following are your preferences, written in your first person.**"
-    return (
-        f"<Preferences>\n{comment}\n" + "\n".join(blocks).rstrip() + "\n</Preferences>"
-    )
+    out = ""
+    if blocks:
+        comment = (
+            "**The following are your preferences, written in your first person.**"
+        )
+        out = (
+            f"<Preferences>\n{comment}\n"
+            + "\n".join(blocks).rstrip()
+            + "\n</Preferences>"
+        )
+    if len(_PREFERENCES_PROMPT_CACHE) >= _PREFERENCES_PROMPT_CACHE_MAX:
+        _PREFERENCES_PROMPT_CACHE.clear()
+    _PREFERENCES_PROMPT_CACHE[(in_channel, pref_root)] = (key, out)
+    return out
 
 
 def _validate_referenced_memory_ids(
@@ -301,11 +417,11 @@ def _validate_referenced_memory_ids(
             f"Invalid id(s): {invalid_ids}"
         )
 
-    return [
-        mem_id
-        for mem_id in referenced_memory_ids
-        if memory_store.get_by_id(mem_id) is not None
-    ]
+    # One batched lookup: a store may re-validate its backing files per call.
+    found = {
+        record.id_ for record in memory_store.get_by_ids(set(referenced_memory_ids))
+    }
+    return [mem_id for mem_id in referenced_memory_ids if mem_id in found]
 
 
 def finish_action(
@@ -356,10 +472,26 @@ def finish_action(
     )
 
 
+# Run-independent prompt sections, joined once at import. Static system prompts
+# precede the dynamic `@agent.system_prompt` functions below, matching the
+# previous registration order without a function call per section per run.
+_STATIC_SYSTEM_PROMPT = "".join(
+    [
+        general_prompt,
+        bash_tool_prompt,
+        input_event_prompt,
+        response_instruct_prompt,
+        memory_instruct_prompt,
+        preference_prompt,
+        intent_instruct_prompt,
+        compacted_prompt,
+    ]
+)
+
 agent = cast(
     Agent[MyDeps, MemoryRecord],
     Agent(
-        system_prompt=[],
+        system_prompt=_STATIC_SYSTEM_PROMPT,
         tools=[
             bash,
             bash_input,
@@ -376,16 +508,6 @@ agent = cast(
 )
 
 
-agent.system_prompt(lambda: general_prompt)
-agent.system_prompt(lambda: bash_tool_prompt)
-agent.system_prompt(lambda: input_event_prompt)
-agent.system_prompt(lambda: response_instruct_prompt)
-agent.system_prompt(lambda: memory_instruct_prompt)
-agent.system_prompt(lambda: preference_prompt)
-agent.system_prompt(lambda: intent_instruct_prompt)
-agent.system_prompt(lambda: compacted_prompt)
-
-
 @agent.system_prompt
 def preferences_system_prompt(ctx: RunContext[MyDeps]) -> str:
     """Inject channel-scoped preferences ahead of skill documents.
@@ -420,7 +542,20 @@ def concat_skills_prompt(ctx: RunContext[MyDeps]) -> str:
             channel=out_channel,
         ),
     ]
-    channel_md = "\n".join(x for x in channel_chunks if x is not None).rstrip()
+    return _render_skills_prompt(skills_md, *channel_chunks)
+
+
+@functools.lru_cache(maxsize=64)
+def _render_skills_prompt(
+    skills_md: str, context_md: str | None, messager_md: str | None
+) -> str:
+    """Assemble the skills prompt block.
+
+    Memoized on the texts returned by the skills caches.
+    """
+
+    channel_md = "\n".join(x for x in (context_md, messager_md) if x is not None)
+    channel_md = channel_md.rstrip()
 
     if channel_md:
         return f"<BasicSkills>{skills_md}</BasicSkills>\n<ChannelSkills>{channel_md}\n</ChannelSkills>"
@@ -429,12 +564,20 @@ def concat_skills_prompt(ctx: RunContext[MyDeps]) -> str:
 
 @agent.system_prompt
 def sop_system_prompt() -> str:
+    # Kept as a function: it must follow the dynamic skills prompt.
     return SOP_prompt
 
 
 def _strip_history(
     msgs: list[ModelRequest | ModelResponse], instruct: Sequence[UserContent]
 ):
+    """Trim a run's new messages down to what the memory record stores.
+
+    Mutates and returns `msgs` (the caller owns the `new_messages()` list) so
+    long histories are not re-sliced; the message objects themselves are
+    shallow-copied before editing.
+    """
+
     first_msg = msgs[0]
     if isinstance(first_msg, ModelRequest):
         last_part = first_msg.parts[-1]
@@ -443,10 +586,9 @@ def _strip_history(
             last_part.content = instruct  # update the first message's instruct part to the current instruct
         first_msg = copy(first_msg)
         first_msg.parts = [last_part]  # only keep the instruct
-    msgs = [
-        first_msg,
-        *msgs[1:-1],
-    ]  # remove initial message and final finish message
+        msgs[0] = first_msg
+    if len(msgs) > 1:
+        del msgs[-1]  # remove the final finish message
     return msgs
 
 
@@ -457,8 +599,25 @@ def _event_meta_prompt(event: Event) -> str:
     the potentially large free-form `Event.content` body.
     """
 
-    meta_json = event.model_dump_json(exclude={"content"})
-    return f"<EventMeta>{meta_json}</EventMeta>\n"
+    return f"<EventMeta>{event.meta_json}</EventMeta>\n"
+
+
+# (unix second, formatted local time) of the last `_now_text()` call.
+_NOW_CACHE: tuple[int, str] = (-1, "")
+
+
+def _now_text() -> str:
+    """Return local "now" at one-second granularity, formatted once per second.
+
+    Runs started in the same second (e.g. an `agent_run_batch` burst) share
+    the string instead of re-formatting it.
+    """
+
+    global _NOW_CACHE
+    sec = int(time.time())
+    if _NOW_CACHE[0] != sec:
+        _NOW_CACHE = (sec, str(datetime.fromtimestamp(sec)))
+    return _NOW_CACHE[1]
 
 
 async def _system_runtime_prompt(deps: MyDeps) -> str:
@@ -469,10 +628,15 @@ async def _system_runtime_prompt(deps: MyDeps) -> str:
     """
 
     try:
-        runtime_config_base = await agent_config_base_value(
-            basic_os_helper=deps.basic_os_helper,
-            shell_manager=deps.shell_manager,
+        # Check the cache first: `deps.shell_manager` is created on access.
+        runtime_config_base = cached_agent_config_base_value(
+            basic_os_helper=deps.basic_os_helper
         )
+        if runtime_config_base is None:
+            runtime_config_base = await agent_config_base_value(
+                basic_os_helper=deps.basic_os_helper,
+                shell_manager=deps.shell_manager,
+            )
     except Exception as exc:
         runtime_config_base = (
             f"<unresolved:{type(exc).__name__}:{str(exc).replace(chr(10), ' ')}>"
@@ -480,7 +644,7 @@ async def _system_runtime_prompt(deps: MyDeps) -> str:
 
     return (
         "<System>\n"
-        f"Now: {datetime.now()}\n"
+        f"Now: {_now_text()}\n"
         f"Value of `{AGENT_CONFIG_BASE_EXPR}`: {runtime_config_base}\n"
         "</System>\n"
     )
@@ -492,11 +656,25 @@ async def _memory_select(
     compacted_level_num: int = 5,
     raw_pair_level_num: int = 20,
 ):
-    recent_mem = set(parent_memories)
+    if not parent_memories:
+        return [], set()
+    # One walk at the deeper level; each subset is read off the depths and
+    # merged with a single bulk `update` instead of per-id adds.
+    level = max(compacted_level_num, raw_pair_level_num)
+    depths = memory_store.get_ancestor_depths(parent_memories, level=level)
+
     all_mem = set(parent_memories)
-    for mem in parent_memories:
-        recent_mem.update(memory_store.get_ancestors(mem, level=compacted_level_num))
-        all_mem.update(memory_store.get_ancestors(mem, level=raw_pair_level_num))
+    recent_mem = set(parent_memories)
+    for subset, subset_level in (
+        (all_mem, raw_pair_level_num),
+        (recent_mem, compacted_level_num),
+    ):
+        if subset_level >= level:
+            subset.update(depths)
+        else:
+            subset.update(
+                mem_id for mem_id, depth in depths.items() if depth <= subset_level
+            )
 
     all_mem_rec = memory_store.get_by_ids(all_mem)
     return all_mem_rec, recent_mem
@@ -521,14 +699,17 @@ async def agent_run(
 
     parent_memories = parent_memories or []
 
-    all_mem_rec, recent_mem = await _memory_select(
-        memory_store,
-        parent_memories,
-    )
-    memory_string = "\n".join(
-        x.dump_compated() if x.id_ in recent_mem else x.dump_raw_pair()
-        for x in all_mem_rec
-    )
+    memory_prompt = ""
+    if parent_memories:
+        all_mem_rec, recent_mem = await _memory_select(
+            memory_store,
+            parent_memories,
+        )
+        memory_string = "\n".join(
+            x.dump_compated() if x.id_ in recent_mem else x.dump_raw_pair()
+            for x in all_mem_rec
+        )
+        memory_prompt = f"<Memory>{memory_string}</Memory>\n"
 
     async with MyDeps(
         config=config,
@@ -540,7 +721,7 @@ async def agent_run(
             model=model,
             deps=my_deps,
             user_prompt=(
-                f"<Memory>{memory_string}</Memory>\n" if parent_memories else "",
+                memory_prompt,
                 await _system_runtime_prompt(my_deps),
                 _event_meta_prompt(instruct),
                 instruct.content,
@@ -557,6 +738,67 @@ async def agent_run(
     return memory_record
 
 
+async def agent_run_batch(
+    model: Model | KnownModelName,
+    config: Config,
+    memory_store: FolderMemoryStore,
+    instructs: Sequence[Event],
+    *,
+    max_concurrency: int = 16,
+    max_model_requests: int | None = None,
+) -> list[MemoryRecord | Exception]:
+    """Run `agent_run` for each event concurrently, at most `max_concurrency` at once.
+
+    Runs are independent (no parent memories). Preference and skills file reads
+    are shared across the batch through the stat-validated cache in
+    `k.io_helpers.file_cache`, so concurrent runs do not re-read unchanged
+    files.
+
+    `max_model_requests` additionally caps in-flight LLM requests across the
+    whole batch (via pydantic_ai's `ConcurrencyLimitedModel`), so more runs
+    can progress through tool calls while provider rate limits are respected.
+
+    Returns:
+        One entry per `instructs` item, in order: the run's `MemoryRecord`, or
+        the exception that run raised. Records are not appended to
+        `memory_store`; callers persist them as with `agent_run`.
+    """
+
+    if max_concurrency <= 0:
+        raise ValueError(f"max_concurrency must be > 0; got {max_concurrency}")
+
+    if max_model_requests is not None:
+        if max_model_requests <= 0:
+            raise ValueError(
+                f"max_model_requests must be > 0; got {max_model_requests}"
+            )
+        from pydantic_ai.models.concurrency import ConcurrencyLimitedModel
+
+        model = ConcurrencyLimitedModel(model, limiter=max_model_requests)
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(instruct: Event) -> MemoryRecord:
+        async with sem:
+            return await agent_run(
+                model=model,
+                config=config,
+                memory_store=memory_store,
+                instruct=instruct,
+            )
+
+    results = await asyncio.gather(
+        *(run_one(instruct) for instruct in instructs), return_exceptions=True
+    )
+    out: list[MemoryRecord | Exception] = []
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            # Cancellation and interpreter exits are not per-run failures.
+            raise result
+        out.append(result)
+    return out
+
+
 if __name__ == "__main__":
     import asyncio
 
@@ -25,6 +25,13 @@ from k.agent.memory.store import MemoryStore
 logger = getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=256)
+def _event_meta_json(in_channel: str, out_channel: str | None) -> str:
+    return Event.model_construct(
+        in_channel=in_channel, out_channel=out_channel, content=""
+    ).model_dump_json(exclude={"content"})
+
+
 class Event(BaseModel):
     """Structured input event with hierarchical channel routing.
 
@@ -62,6 +69,16 @@ class Event(BaseModel):
             out_channel=self.out_channel,
         )
 
+    @property
+    def meta_json(self) -> str:
+        """Return `model_dump_json(exclude={"content"})`, memoized by routing.
+
+        Keyed on the channel fields rather than the instance, so reassigning
+        them on this (mutable) model never serves a stale value.
+        """
+
+        return _event_meta_json(self.in_channel, self.out_channel)
+
 
 class MemoryHint(BaseModel):
     referenced_memory_ids: list[str]
@@ -82,21 +99,43 @@ def tool_exception_guard[**P, R](
 
     - Lets `asyncio.CancelledError` propagate (cancellation should abort).
     - Catches all other `Exception` instances and returns `str(e)`.
+
+    The wrapper is specialised once at decoration time: coroutine functions
+    are awaited directly, without a per-call `isawaitable` probe. Other
+    callables still get an `async` wrapper that calls them inline, because
+    pydantic-ai would run a sync tool in a worker thread.
     """
 
-    @functools.wraps(fn)
-    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R | str:
-        try:
-            res = fn(*args, **kwargs)
-            if inspect.isawaitable(res):
-                return await cast(Awaitable[R], res)
-            return cast(R, res)
-        except asyncio.CancelledError:
-            raise
-        except Exception as exc:
-            tool_name = getattr(fn, "__name__", type(fn).__name__)
-            logger.info(f"Exception in tool {tool_name}: {exc}", exc_info=True)
-            return str(exc)
-
-    wrapper.__signature__ = inspect.signature(fn)  # type: ignore[attr-defined]
+    tool_name = getattr(fn, "__name__", type(fn).__name__)
+
+    def on_error(exc: Exception) -> str:
+        logger.info(f"Exception in tool {tool_name}: {exc}", exc_info=True)
+        return str(exc)
+
+    if inspect.iscoroutinefunction(fn):
+        async_fn = cast(Callable[P, Awaitable[R]], fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R | str:
+            try:
+                return await async_fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                return on_error(exc)
+
+    else:
+
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R | str:
+            try:
+                res = fn(*args, **kwargs)
+                if inspect.isawaitable(res):
+                    return await cast(Awaitable[R], res)
+                return cast(R, res)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                return on_error(exc)
+
     return wrapper
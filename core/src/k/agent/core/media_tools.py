@@ -13,8 +13,11 @@ Security notes:
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import mimetypes
 import os
+import re
 from pathlib import Path
 from typing import Literal
 from urllib.parse import urlparse
@@ -25,10 +28,20 @@ from pydantic_ai.messages import AudioUrl, DocumentUrl, ImageUrl, VideoUrl
 
 from k.agent.core.entities import tool_exception_guard
 
+# Build the MIME tables (reads the system mime.types files, a few ms) at import
+# rather than inside the first `read_media` call; skipped if already loaded so
+# tables initialised or customised elsewhere are kept.
+if not mimetypes.inited:
+    mimetypes.init()
+
+# An http(s) scheme followed by a non-empty authority: the same test as
+# `urlparse(value)` having scheme http/https and a netloc, without building a
+# `ParseResult` per spec.
+_HTTP_URL_RE = re.compile(r"https?://[^/?#]", re.IGNORECASE)
+
 
 def _is_http_url(value: str) -> bool:
-    parsed = urlparse(value)
-    return parsed.scheme in {"http", "https"} and bool(parsed.netloc)
+    return _HTTP_URL_RE.match(value) is not None
 
 
 UrlMediaKind = Literal["image-url", "video-url", "audio-url", "document-url"]
@@ -59,34 +72,69 @@ def _url_kind_from_media_type(media_type: str) -> UrlMediaKind | None:
     return None
 
 
-async def _sniff_url_media_type(url: str) -> str | None:
+_SNIFF_TIMEOUT = httpx.Timeout(5.0, connect=5.0)
+_SNIFF_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+# Shared sniffing client and the event loop its pooled connections belong to.
+_sniff_client_state: tuple[asyncio.AbstractEventLoop, httpx.AsyncClient] | None = None
+
+
+def _sniff_client() -> httpx.AsyncClient:
+    """Return the process-wide sniffing client, creating it on first use.
+
+    Keep-alive connections survive across `read_media` calls, so repeat
+    sniffs to a host skip the TCP/TLS handshake. A client left over from
+    another event loop (or closed) is replaced rather than reused.
+    """
+
+    global _sniff_client_state
+    loop = asyncio.get_running_loop()
+    state = _sniff_client_state
+    if state is not None and state[0] is loop and not state[1].is_closed:
+        return state[1]
+    client = httpx.AsyncClient(
+        follow_redirects=True, timeout=_SNIFF_TIMEOUT, limits=_SNIFF_LIMITS
+    )
+    _sniff_client_state = (loop, client)
+    return client
+
+
+async def aclose_media_client() -> None:
+    """Close the shared URL-sniffing client (idempotent); call on shutdown."""
+
+    global _sniff_client_state
+    state = _sniff_client_state
+    _sniff_client_state = None
+    if state is not None:
+        await state[1].aclose()
+
+
+async def _sniff_url_media_type(url: str, *, client: httpx.AsyncClient) -> str | None:
     """
     Best-effort MIME sniffing for extensionless URLs using HTTP headers.
 
     We prefer HEAD and fall back to a streamed GET with a tiny range request.
+    `client` is the shared `_sniff_client()`, so sniffs reuse its pool.
     """
 
-    timeout = httpx.Timeout(5.0, connect=5.0)
-    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
-        try:
-            head = await client.head(url, headers={"Accept": "*/*"})
-            content_type = head.headers.get("Content-Type")
+    try:
+        head = await client.head(url, headers={"Accept": "*/*"})
+        content_type = head.headers.get("Content-Type")
+        if content_type:
+            return content_type.split(";", 1)[0].strip().lower() or None
+    except Exception:
+        pass
+
+    try:
+        async with client.stream(
+            "GET",
+            url,
+            headers={"Accept": "*/*", "Range": "bytes=0-0"},
+        ) as resp:
+            content_type = resp.headers.get("Content-Type")
             if content_type:
                 return content_type.split(";", 1)[0].strip().lower() or None
-        except Exception:
-            pass
-
-        try:
-            async with client.stream(
-                "GET",
-                url,
-                headers={"Accept": "*/*", "Range": "bytes=0-0"},
-            ) as resp:
-                content_type = resp.headers.get("Content-Type")
-                if content_type:
-                    return content_type.split(";", 1)[0].strip().lower() or None
-        except Exception:
-            return None
+    except Exception:
+        return None
     return None
 
 
@@ -95,25 +143,82 @@ def _is_generic_binary_media_type(media_type: str) -> bool:
     return mt in {"application/octet-stream", "binary/octet-stream"}
 
 
-async def _infer_url_kind(url: str) -> UrlMediaKind | None:
-    path = urlparse(url).path
-    guessed_type, _ = mimetypes.guess_type(path)
+def _guess_url_kind(url: str) -> tuple[bool, UrlMediaKind | None]:
+    """Classify `url` from its path extension alone.
+
+    Returns `(decided, kind)`; `decided` is false when only sniffing the
+    response headers can tell.
+    """
+
+    name = urlparse(url).path.rpartition("/")[2]
+    # `mimetypes` only inspects the trailing extension chain of the last path
+    # segment, so URLs sharing a suffix (`a.jpg`, `b.jpg`) share one lookup.
+    stem_len = len(name) - len(name.lstrip("."))
+    dot = name.find(".", stem_len)
+    return _guess_kind_for_suffix(name[dot:] if dot >= 0 else "")
+
+
+@functools.lru_cache(maxsize=256)
+def _guess_kind_for_suffix(suffix: str) -> tuple[bool, UrlMediaKind | None]:
+    guessed_type, _ = mimetypes.guess_type(f"/x{suffix}")
     if guessed_type:
         if _is_generic_binary_media_type(guessed_type):
-            return None
+            return True, None
         kind = _url_kind_from_media_type(guessed_type)
         if kind:
-            return kind
+            return True, kind
+    return False, None
 
-    sniffed_type = await _sniff_url_media_type(url)
+
+type UrlKindInfo = tuple[UrlMediaKind | None, str | None]
+
+
+async def _infer_url_kind(url: str, *, client: httpx.AsyncClient) -> UrlKindInfo:
+    """Return `(kind, sniffed_media_type)` for `url`.
+
+    `sniffed_media_type` is set only when the kind came from response headers;
+    an extensionless URL needs it passed explicitly to its content part.
+    """
+
+    decided, kind = _guess_url_kind(url)
+    if decided:
+        return kind, None
+
+    sniffed_type = await _sniff_url_media_type(url, client=client)
     if sniffed_type:
         if _is_generic_binary_media_type(sniffed_type):
-            return None
+            return None, None
         kind = _url_kind_from_media_type(sniffed_type)
         if kind:
-            return kind
+            return kind, sniffed_type
+
+    return None, None
 
-    return None
+
+async def _infer_url_kinds(urls: list[str]) -> dict[str, UrlKindInfo]:
+    """Infer kinds for `urls`, sniffing the undecided ones concurrently.
+
+    Sniffs share the pooled client and run under `asyncio.gather`, so wall
+    time is the slowest sniff rather than their sum.
+    """
+
+    kinds: dict[str, UrlKindInfo] = {}
+    pending: list[str] = []
+    for url in urls:
+        if url in kinds:
+            continue
+        decided, kind = _guess_url_kind(url)
+        kinds[url] = (kind, None)
+        if not decided:
+            pending.append(url)
+
+    if pending:
+        client = _sniff_client()
+        sniffed = await asyncio.gather(
+            *(_infer_url_kind(url, client=client) for url in pending)
+        )
+        kinds.update(zip(pending, sniffed, strict=True))
+    return kinds
 
 
 @tool_exception_guard
@@ -128,7 +233,7 @@ async def read_media[DepsT](
         media: A list of URLs and/or local file paths.
     """
 
-    results: list[MultiModalContent] = []
+    specs: list[tuple[str, bool]] = []
     for raw in media:
         spec = raw.strip()
         if not spec:
@@ -139,21 +244,26 @@ async def read_media[DepsT](
                 "Invalid media spec: kind prefixes like 'image:https://...' are not supported; "
                 "pass the URL/path directly."
             )
+        specs.append((spec, _is_http_url(spec)))
 
-        if _is_http_url(spec):
-            url_kind = await _infer_url_kind(spec)
+    url_kinds = await _infer_url_kinds([spec for spec, is_url in specs if is_url])
+
+    results: list[MultiModalContent] = []
+    for spec, is_url in specs:
+        if is_url:
+            url_kind, media_type = url_kinds[spec]
             if url_kind is None:
                 raise ValueError("Invalid URL/path or not a supported media file.")
             if url_kind == "image-url":
-                content = ImageUrl(url=spec)
+                content = ImageUrl(url=spec, media_type=media_type)
             elif url_kind == "audio-url":
-                content = AudioUrl(url=spec)
+                content = AudioUrl(url=spec, media_type=media_type)
             elif url_kind == "video-url":
-                content = VideoUrl(url=spec)
+                content = VideoUrl(url=spec, media_type=media_type)
             else:
-                content = DocumentUrl(url=spec)
-            # Fail fast
-            content._infer_media_type()
+                content = DocumentUrl(url=spec, media_type=media_type)
+            # Fail fast; honours an explicit (sniffed) media type.
+            _ = content.media_type
         else:
             expanded = os.path.expandvars(spec)
             path = Path(expanded).expanduser()
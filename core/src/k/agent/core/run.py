@@ -14,6 +14,7 @@ from pydantic_ai.messages import UserContent
 from k.agent.channels import channel_root
 from k.agent.core.agent import agent_run
 from k.agent.core.entities import Event
+from k.agent.core.media_tools import aclose_media_client
 from k.agent.memory.folder import FolderMemoryStore
 from k.agent.memory.paths import memory_root_from_config_base
 from k.config import Config
@@ -69,16 +70,19 @@ async def main() -> None:
     mem_store = FolderMemoryStore(
         root=memory_root_from_config_base(config.config_base),
     )
-    while True:
-        i = input("\n> ")
-        if i.lower() in {"exit", "quit"}:
-            print("Exiting the agent loop.")
-            break
-        mem = await agent_run(
-            model,
-            config,
-            mem_store,
-            Event(in_channel="direct_input", content=i),
-        )
-        mem_store.append(mem)
-        print(mem.dump_compated())
+    try:
+        while True:
+            i = input("\n> ")
+            if i.lower() in {"exit", "quit"}:
+                print("Exiting the agent loop.")
+                break
+            mem = await agent_run(
+                model,
+                config,
+                mem_store,
+                Event(in_channel="direct_input", content=i),
+            )
+            mem_store.append(mem)
+            print(mem.dump_compated())
+    finally:
+        await aclose_media_client()
@@ -11,6 +11,20 @@ from pathlib import Path
 
 from k.agent.channels import channel_root
 from k.agent.core.skills_uri import skills_root_from_config_base, skills_uri
+from k.io_helpers.file_cache import clear_text_cache, read_text_cached
+
+# skills root -> (per-file (uri, text) key, assembled prompt).
+_CONCAT_CACHE: dict[Path, tuple[tuple[tuple[str, str], ...], str]] = {}
+# channel SKILLS.md path -> (file text, rendered chunk).
+_CHANNEL_CACHE: dict[Path, tuple[str, str]] = {}
+
+
+def clear_skills_cache() -> None:
+    """Drop cached skills text and assembled prompts (e.g. for dev loops)."""
+
+    _CONCAT_CACHE.clear()
+    _CHANNEL_CACHE.clear()
+    clear_text_cache()
 
 
 def concat_skills_md(config_base: str | Path) -> str:
@@ -18,32 +32,39 @@ def concat_skills_md(config_base: str | Path) -> str:
 
     Returns a single string which is the concatenation of all found SKILLS.md files,
     separated by clear delimiters.
+
+    Each file is still stat-validated through `read_text_cached` (a directory
+    mtime does not change on in-place edits), but the assembled prompt is
+    reused while every file's cached text is unchanged.
     """
 
     skills_root = skills_root_from_config_base(config_base)
 
-    chunks: list[str] = []
-
+    found: list[tuple[str, str]] = []
     for group in ("core", "meta"):
-        group_root = skills_root / group
-        if not group_root.exists():
-            continue
-
+        # `glob` on a missing group directory yields nothing.
         for md in sorted(
-            group_root.glob("*/SKILLS.md"), key=lambda p: (p.parent.name, str(p))
+            (skills_root / group).glob("*/SKILLS.md"),
+            key=lambda p: (p.parent.name, str(p)),
         ):
-            content = md.read_text()
-            chunks.append(
-                "\n".join(
-                    [
-                        f"# ===== {skills_uri(f'{group}/{md.parent.name}/SKILLS.md')} =====",
-                        content.rstrip(),
-                        "",
-                    ]
+            content = read_text_cached(md)
+            if content is not None:
+                found.append(
+                    (skills_uri(f"{group}/{md.parent.name}/SKILLS.md"), content)
                 )
-            )
 
-    return "\n".join(chunks).rstrip() + "\n"
+    key = tuple(found)
+    cached = _CONCAT_CACHE.get(skills_root)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    chunks = [
+        "\n".join([f"# ===== {uri} =====", content.rstrip(), ""])
+        for uri, content in found
+    ]
+    out = "\n".join(chunks).rstrip() + "\n"
+    _CONCAT_CACHE[skills_root] = (key, out)
+    return out
 
 
 def maybe_load_channel_skill_md(
@@ -63,14 +84,19 @@ def maybe_load_channel_skill_md(
 
     root = channel_root(channel)
     md = skills_root_from_config_base(config_base) / group / root / "SKILLS.md"
-    if not md.exists():
+    content = read_text_cached(md)
+    if content is None:
         return None
 
-    content = md.read_text()
-    return "\n".join(
+    cached = _CHANNEL_CACHE.get(md)
+    if cached is not None and cached[0] == content:
+        return cached[1]
+    out = "\n".join(
         [
             f"# ===== {skills_uri(f'{group}/{root}/SKILLS.md')} =====",
             content.rstrip(),
             "",
         ]
     )
+    _CHANNEL_CACHE[md] = (content, out)
+    return out
@@ -12,9 +12,10 @@ multimodal types and their `kind` discriminator.
 
 from __future__ import annotations
 
+import asyncio
 import dataclasses
 import re
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from typing import cast
 
 from pydantic_ai import Agent, ToolOutput
@@ -359,6 +360,29 @@ async def run_compaction(
     return compacted.output
 
 
+async def run_compaction_batch(
+    model: Model | KnownModelName,
+    detailed_batches: Sequence[list[ModelRequest | ModelResponse]],
+    *,
+    max_concurrency: int = 16,
+) -> list[list[str]]:
+    """Compact several traces concurrently, at most `max_concurrency` at once.
+
+    Results are in `detailed_batches` order; the first failure propagates.
+    """
+
+    if max_concurrency <= 0:
+        raise ValueError(f"max_concurrency must be > 0; got {max_concurrency}")
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def compact_one(detailed: list[ModelRequest | ModelResponse]) -> list[str]:
+        async with sem:
+            return await run_compaction(model=model, detailed=detailed)
+
+    return await asyncio.gather(*(compact_one(d) for d in detailed_batches))
+
+
 async def main():
     from rich import print
 
@@ -373,6 +397,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
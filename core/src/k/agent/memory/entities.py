@@ -24,6 +24,7 @@ ids on append.
 
 from __future__ import annotations
 
+import functools
 import re
 from datetime import UTC, datetime
 
@@ -99,6 +100,18 @@ def is_memory_record_id(value: str) -> bool:
     return 0 <= decoded < (1 << 48)
 
 
+@functools.lru_cache(maxsize=1024)
+def _compacted_text(compacted: tuple[str, ...]) -> str:
+    """Return `str(list(compacted))`, memoized across agent runs.
+
+    The list repr (escaping every step string) dominates `dump_compated`, and
+    the same ancestors are rendered into every run's memory prompt. Keying on
+    the tuple of steps keeps in-place edits visible.
+    """
+
+    return str(list(compacted))
+
+
 class MemoryRecord(BaseModel):
     """Persisted memory record with hierarchical channel routing metadata.
 
@@ -160,10 +173,19 @@ class MemoryRecord(BaseModel):
     def short_id(self) -> str:
         return self.id_[:8]
 
+    def _dump_meta_json(self) -> str:
+        # Same text as `model_dump_json(include={"id_", "parents", "children"})`
+        # but ~5x cheaper: record ids are validated to the ordered-base64
+        # alphabet, so they need no JSON escaping. Memory prompts dump every
+        # selected record, so this runs once per record per agent run.
+        parents = f'"{'","'.join(self.parents)}"' if self.parents else ""
+        children = f'"{'","'.join(self.children)}"' if self.children else ""
+        return f'{{"id_":"{self.id_}","parents":[{parents}],"children":[{children}]}}'
+
     def dump_raw_pair(self) -> str:
         # return self.model_dump_json(exclude={"detailed", "compacted"})
-        return f"""<Meta>{self.model_dump_json(include={"id_", "parents", "children"})}</Meta><Instruct>{self.input}</Instruct><Response>{self.output}</Response>"""
+        return f"""<Meta>{self._dump_meta_json()}</Meta><Instruct>{self.input}</Instruct><Response>{self.output}</Response>"""
 
     def dump_compated(self) -> str:
         # return self.model_dump_json(exclude={"detailed"})
-        return f"""<Meta>{self.model_dump_json(include={"id_", "parents", "children"})}</Meta><Instruct>{self.input}</Instruct><Process>{self.compacted}</Process><Response>{self.output}</Response>"""
+        return f"""<Meta>{self._dump_meta_json()}</Meta><Instruct>{self.input}</Instruct><Process>{_compacted_text(tuple(self.compacted))}</Process><Response>{self.output}</Response>"""
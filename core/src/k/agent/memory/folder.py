@@ -37,10 +37,11 @@ Design notes / invariants:
 from __future__ import annotations
 
 import json
+import os
 import re
 import subprocess
 import tempfile
-from collections.abc import Set
+from collections.abc import Container, Iterable, Set
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -305,7 +306,7 @@ def _read_legacy_compacted_sidecar(path: Path, *, encoding: str) -> list[str]:
     return decoded
 
 
-def _dedupe_existing_ids(ids: list[str], *, existing_ids: set[str]) -> list[str]:
+def _dedupe_existing_ids(ids: list[str], *, existing_ids: Container[str]) -> list[str]:
     """Return ids in original order, keeping only existing ids and removing dups."""
 
     out: list[str] = []
@@ -331,13 +332,13 @@ def _is_loadable_record_file(path: Path) -> bool:
     return name.endswith(".json")
 
 
-def _is_record_related_file(path: Path) -> bool:
-    """Return whether `path` should participate in cache invalidation."""
+def _is_record_related_name(name: str) -> bool:
+    """Return whether a file named `name` participates in cache invalidation.
 
-    name = path.name
-    return name.endswith(
-        (".core.json", ".detailed.json", ".detailed.jsonl", ".compacted.json")
-    ) or _is_loadable_record_file(path)
+    Core, legacy, detailed and compacted-sidecar files all end in `.json`.
+    """
+
+    return name.endswith((".json", ".detailed.jsonl"))
 
 
 def _parse_rg_lines_with_numbers(output: str) -> list[tuple[Path, int, str]]:
@@ -408,6 +409,8 @@ class FolderMemoryStore(MemoryStore):
     def get_by_ids(
         self, ids: Set[MemoryRecordId], *, strict: bool = False
     ) -> list[MemoryRecord]:
+        if not ids:
+            return []
         self._load_if_needed()
 
         record_ids = {coerce_record_id(id_) for id_ in ids}
@@ -417,26 +420,16 @@ class FolderMemoryStore(MemoryStore):
             raise KeyError(f"Missing record(s): {missing_str}")
 
         records = [self._by_id[id_] for id_ in record_ids if id_ in self._by_id]
-        order = {record.id_: idx for idx, record in enumerate(self._records)}
-        records.sort(
-            key=lambda r: (
-                datetime_to_posix_millis(r.created_at),
-                order.get(r.id_, 1_000_000_000),
-            )
-        )
+        # `_records` is kept sorted by id, so tie-breaking on `id_` matches
+        # store order without indexing every record per call.
+        records.sort(key=lambda r: (datetime_to_posix_millis(r.created_at), r.id_))
         return records
 
     def get_parents(
         self, record: MemoryRecordRef, *, strict: bool = False
     ) -> list[str]:
         self._load_if_needed()
-        rec = self._coerce_record(record)
-        if strict:
-            missing = [id_ for id_ in rec.parents if id_ not in self._by_id]
-            if missing:
-                missing_str = ", ".join(str(i) for i in missing)
-                raise KeyError(f"Missing parent record(s): {missing_str}")
-        return list(rec.parents)
+        return self._parents_of(self._coerce_record(record), strict=strict)
 
     def get_children(
         self, record: MemoryRecordRef, *, strict: bool = False
@@ -457,38 +450,58 @@ class FolderMemoryStore(MemoryStore):
         level: int | None = None,
         strict: bool = False,
     ) -> list[str]:
+        return list(self.get_ancestor_depths([record], level=level, strict=strict))
+
+    def get_ancestor_depths(
+        self,
+        records: Iterable[MemoryRecordRef],
+        *,
+        level: int | None = None,
+        strict: bool = False,
+    ) -> dict[str, int]:
+        """Map ancestors of any of `records` to their breadth-first depth.
+
+        One walk covers all `records`: parents are depth 1 and each ancestor
+        keeps its shortest distance from any start record, so the ids with
+        depth `<= n` equal the union of `get_ancestors(r, level=n)` and a
+        shallow level can be derived from one deep walk. Keys are in visit
+        order (the `get_ancestors` order for a single record).
+        """
+
         if level is not None and level < 0:
             raise ValueError(f"level must be >= 0 or None; got {level}")
 
         self._load_if_needed()
-        current = self._coerce_record(record)
+        starts = [self._coerce_record(record) for record in records]
 
         if level == 0:
-            return []
+            return {}
 
-        ancestors: list[str] = []
-        seen: set[str] = set()
+        # Walk with `_parents_of`: the public `get_parents` re-validates the
+        # on-disk snapshot (a stat of every record file) per visited record.
+        frontier: list[str] = []
+        for start in starts:
+            frontier.extend(self._parents_of(start, strict=strict))
 
-        frontier = self.get_parents(current, strict=strict)
+        depths: dict[str, int] = {}
         depth = 0
         while frontier and (level is None or depth < level):
             depth += 1
             next_frontier: list[str] = []
             for parent_id in frontier:
-                if parent_id in seen:
+                if parent_id in depths:
                     continue
-                seen.add(parent_id)
-                ancestors.append(parent_id)
+                depths[parent_id] = depth
 
                 parent_record = self._by_id.get(parent_id)
                 if parent_record is None:
                     if strict:
                         raise KeyError(f"Unknown parent MemoryRecord id: {parent_id}")
                     continue
-                next_frontier.extend(self.get_parents(parent_record, strict=strict))
+                next_frontier.extend(self._parents_of(parent_record, strict=strict))
             frontier = next_frontier
 
-        return ancestors
+        return depths
 
     def get_between(
         self,
@@ -657,8 +670,9 @@ class FolderMemoryStore(MemoryStore):
                 f"Duplicate MemoryRecord id encountered while appending: {record.id_}"
             )
 
-        existing_ids = set(self._by_id)
-        record.parents = _dedupe_existing_ids(record.parents, existing_ids=existing_ids)
+        # The id index is the membership test; copying its keys into a set
+        # would cost O(store size) per append.
+        record.parents = _dedupe_existing_ids(record.parents, existing_ids=self._by_id)
 
         updated_parents: list[MemoryRecord] = []
         for parent_id in record.parents:
@@ -808,21 +822,29 @@ class FolderMemoryStore(MemoryStore):
         if not records_dir.exists():
             return _CacheKey(file_stats=tuple())
 
+        # `os.scandir` reports file types from the directory listing, so each
+        # record file costs one `stat` (a `Path.rglob` + `is_file` walk costs
+        # two); this key is recomputed on every store access.
         stats: list[tuple[str, int, int]] = []
-        for path in records_dir.rglob("*"):
-            if not path.is_file() or not _is_record_related_file(path):
-                continue
+        pending = [(str(records_dir), str(records_dir.relative_to(self.root)))]
+        while pending:
+            dir_path, rel_dir = pending.pop()
             try:
-                stat = path.stat()
+                entries = list(os.scandir(dir_path))
             except FileNotFoundError:
                 continue
-            stats.append(
-                (
-                    str(path.relative_to(self.root)),
-                    stat.st_mtime_ns,
-                    stat.st_size,
-                )
-            )
+            for entry in entries:
+                rel = f"{rel_dir}{os.sep}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, rel))
+                    continue
+                if not _is_record_related_name(entry.name) or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                stats.append((rel, stat.st_mtime_ns, stat.st_size))
         stats.sort(key=lambda item: item[0])
         return _CacheKey(file_stats=tuple(stats))
 
@@ -953,6 +975,16 @@ class FolderMemoryStore(MemoryStore):
 
         return repaired
 
+    def _parents_of(self, rec: MemoryRecord, *, strict: bool) -> list[str]:
+        """Return `rec.parents` from the loaded snapshot (no reload check)."""
+
+        if strict:
+            missing = [id_ for id_ in rec.parents if id_ not in self._by_id]
+            if missing:
+                missing_str = ", ".join(str(i) for i in missing)
+                raise KeyError(f"Missing parent record(s): {missing_str}")
+        return list(rec.parents)
+
     def _coerce_record(self, record: MemoryRecordRef) -> MemoryRecord:
         if isinstance(record, MemoryRecord):
             return record
@@ -0,0 +1,54 @@
+"""Stat-validated cache for small text files read on every agent run.
+
+Preference and skills markdown files are re-read for each run's system prompt
+but almost never change. `read_text_cached` keys each path's content on
+`(st_mtime_ns, st_size)`, so an unchanged file costs one `stat` instead of an
+open + read + decode, and any edit is picked up on the next call.
+
+An unchanged file yields the very same `str` object on every call. Callers
+that memoize something derived from the text (a rendered prompt chunk, an
+`lru_cache` entry) can key on that text cheaply: `str` caches its hash, and
+equality short-circuits on identity, so a warm lookup never compares the
+characters.
+
+Gotchas:
+- Missing files are not cached; they cost one failed `stat` per call.
+- An edit that keeps both size and nanosecond mtime unchanged is not noticed.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+_TEXT_CACHE: dict[Path, tuple[int, int, str]] = {}
+
+
+def read_text_cached(path: Path) -> str | None:
+    """Return the UTF-8 text of `path`, or `None` when it cannot be read.
+
+    Raises:
+        UnicodeDecodeError: if the file is not valid UTF-8.
+    """
+
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+
+    cached = _TEXT_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        _TEXT_CACHE.pop(path, None)
+        return None
+    _TEXT_CACHE[path] = (st.st_mtime_ns, st.st_size, text)
+    return text
+
+
+def clear_text_cache() -> None:
+    """Forget every cached file text."""
+
+    _TEXT_CACHE.clear()
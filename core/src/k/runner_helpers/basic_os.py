@@ -7,6 +7,7 @@ When both are `None`, commands run locally via `script -q -c ... /dev/null` to
 preserve pseudo-terminal behavior expected by shell-session tools.
 """
 
+import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
@@ -17,6 +18,31 @@ if TYPE_CHECKING:
 
 AGENT_CONFIG_BASE_EXPR = "${K_CONFIG_BASE:-~/.kapybara}"
 _AGENT_CONFIG_BASE_MARKER = "__KAPY_AGENT_CONFIG_BASE__="
+_AGENT_CONFIG_BASE_TTL_SECONDS = 60.0
+# Launcher command -> (resolved value, monotonic expiry).
+_AGENT_CONFIG_BASE_CACHE: dict[str, tuple[str, float]] = {}
+
+
+def _agent_config_base_launcher(basic_os_helper: "BasicOSHelper") -> str:
+    cmd = (
+        'if [ -n "${K_CONFIG_BASE:-}" ]; then __kapy_cfg_base="$K_CONFIG_BASE"; '
+        "else __kapy_cfg_base=~/.kapybara; fi; "
+        f'printf "{_AGENT_CONFIG_BASE_MARKER}%s\\n" "$__kapy_cfg_base"'
+    )
+    return basic_os_helper.command(cmd)
+
+
+def cached_agent_config_base_value(*, basic_os_helper: "BasicOSHelper") -> str | None:
+    """Return the cached `agent_config_base_value` result, or `None` if stale.
+
+    Never touches the shell, so callers can check it before creating a
+    `ShellSessionManager` at all.
+    """
+
+    cached = _AGENT_CONFIG_BASE_CACHE.get(_agent_config_base_launcher(basic_os_helper))
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    return None
 
 
 async def agent_config_base_value(
@@ -29,15 +55,21 @@ async def agent_config_base_value(
     This resolves in the same shell transport/runtime used by `bash_impl`
     (via `BasicOSHelper.command(...)` + `ShellSessionManager`), so the value
     matches the agent's execution environment instead of Python process env.
+
+    Resolving costs one shell spawn (an SSH round trip in remote mode), so the
+    result is cached per launcher command for `_AGENT_CONFIG_BASE_TTL_SECONDS`;
+    back-to-back runs against the same transport reuse it (see
+    `cached_agent_config_base_value`).
     """
 
-    cmd = (
-        'if [ -n "${K_CONFIG_BASE:-}" ]; then __kapy_cfg_base="$K_CONFIG_BASE"; '
-        "else __kapy_cfg_base=~/.kapybara; fi; "
-        f'printf "{_AGENT_CONFIG_BASE_MARKER}%s\\n" "$__kapy_cfg_base"'
-    )
+    launcher = _agent_config_base_launcher(basic_os_helper)
+    now = time.monotonic()
+    cached = _AGENT_CONFIG_BASE_CACHE.get(launcher)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
     session_id = await shell_manager.new_shell(
-        basic_os_helper.command(cmd),
+        launcher,
         desc="resolve-agent-config-base",
     )
 
@@ -46,7 +78,12 @@ async def agent_config_base_value(
     for line in merged_output.splitlines():
         marker_idx = line.find(_AGENT_CONFIG_BASE_MARKER)
         if marker_idx >= 0:
-            return line[marker_idx + len(_AGENT_CONFIG_BASE_MARKER) :].strip()
+            value = line[marker_idx + len(_AGENT_CONFIG_BASE_MARKER) :].strip()
+            _AGENT_CONFIG_BASE_CACHE[launcher] = (
+                value,
+                now + _AGENT_CONFIG_BASE_TTL_SECONDS,
+            )
+            return value
 
     raise RuntimeError(
         "Could not resolve runtime K_CONFIG_BASE value from shell output"
@@ -1,11 +1,16 @@
+import time
 from pathlib import Path
 
 import pytest
 
-from k.agent.core.agent import MyDeps
+from k.agent.core.agent import MyDeps, _system_runtime_prompt
 from k.agent.core.entities import Event
 from k.agent.memory.folder import FolderMemoryStore
 from k.config import Config
+from k.runner_helpers.basic_os import (
+    _AGENT_CONFIG_BASE_CACHE,
+    _agent_config_base_launcher,
+)
 
 
 @pytest.mark.anyio
@@ -27,3 +32,25 @@ async def test_mydeps_async_context_closes_cleanly(tmp_path: Path) -> None:
 
     # Ensure `close()` is idempotent.
     await deps.close()
+
+
+@pytest.mark.anyio
+async def test_runtime_prompt_skips_shell_manager_on_cache_hit(
+    tmp_path: Path,
+) -> None:
+    config = Config(config_base=tmp_path / ".kapybara")
+    deps = MyDeps(
+        config=config,
+        memory_storage=FolderMemoryStore(config.config_base / "memories"),
+        memory_parents=[],
+        start_event=Event(in_channel="test", content="healthcheck"),
+    )
+    launcher = _agent_config_base_launcher(deps.basic_os_helper)
+    _AGENT_CONFIG_BASE_CACHE[launcher] = ("/cached/.kapybara", time.monotonic() + 60)
+    try:
+        async with deps:
+            prompt = await _system_runtime_prompt(deps)
+            assert "/cached/.kapybara" in prompt
+            assert deps._shell_manager is None
+    finally:
+        _AGENT_CONFIG_BASE_CACHE.pop(launcher, None)
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import importlib
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import pytest
-from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    UserPromptPart,
+)
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.concurrency import ConcurrencyLimitedModel
+from pydantic_ai.models.test import TestModel
+from pydantic_ai.settings import ModelSettings
 
-from k.agent.core.agent import agent, agent_run
+from k.agent.core.agent import agent, agent_run, agent_run_batch
 from k.agent.core.entities import Event
 from k.agent.memory.entities import MemoryRecord
 from k.agent.memory.folder import FolderMemoryStore
@@ -102,3 +114,180 @@ async def test_agent_run_returns_compacted_memory_record(
     assert event_meta.startswith("<EventMeta>")
     assert '"in_channel":"test"' in event_meta
     assert '"content"' not in event_meta
+
+
+@pytest.mark.anyio
+async def test_agent_run_batch_bounds_concurrency_and_keeps_order(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_agent_config_base_value(**kwargs: Any) -> str:
+        _ = kwargs
+        return str(tmp_path)
+
+    async def fake_agent_run(**kwargs: Any) -> _FakeRunResult:
+        nonlocal in_flight, max_in_flight
+        content = kwargs["user_prompt"][3]
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if content == "boom":
+            raise RuntimeError("boom")
+        return _FakeRunResult(
+            output=MemoryRecord(in_channel="test", input=""),
+            _messages=[
+                ModelRequest(parts=[UserPromptPart(content=(content,))]),
+                ModelResponse(parts=[TextPart(content="finish_action")]),
+            ],
+        )
+
+    monkeypatch.setattr(agent, "run", fake_agent_run)
+    monkeypatch.setattr(
+        agent_module, "agent_config_base_value", fake_agent_config_base_value
+    )
+
+    config = Config(config_base=tmp_path / ".kapybara")
+    results = await agent_run_batch(
+        model="test-model",
+        config=config,
+        memory_store=FolderMemoryStore(config.config_base / "memories"),
+        instructs=[
+            Event(in_channel="test", content=content)
+            for content in ("a", "boom", "c", "d")
+        ],
+        max_concurrency=2,
+    )
+
+    assert max_in_flight == 2
+    assert isinstance(results[1], RuntimeError)
+    assert [r.input for r in results if isinstance(r, MemoryRecord)] == [
+        "a",
+        "c",
+        "d",
+    ]
+
+
+@pytest.mark.anyio
+async def test_agent_run_batch_limits_in_flight_model_requests(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    in_flight = 0
+    max_in_flight = 0
+    seen_models: list[Any] = []
+
+    class _SlowModel(TestModel):
+        async def request(
+            self,
+            messages: list[ModelMessage],
+            model_settings: ModelSettings | None,
+            model_request_parameters: ModelRequestParameters,
+        ) -> ModelResponse:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return ModelResponse(parts=[TextPart(content="ok")])
+
+    async def fake_agent_config_base_value(**kwargs: Any) -> str:
+        _ = kwargs
+        return str(tmp_path)
+
+    async def fake_agent_run(**kwargs: Any) -> _FakeRunResult:
+        model = kwargs["model"]
+        seen_models.append(model)
+        await model.request([], None, ModelRequestParameters())
+        return _FakeRunResult(
+            output=MemoryRecord(in_channel="test", input=""),
+            _messages=[
+                ModelRequest(
+                    parts=[UserPromptPart(content=(kwargs["user_prompt"][3],))]
+                ),
+                ModelResponse(parts=[TextPart(content="finish_action")]),
+            ],
+        )
+
+    monkeypatch.setattr(agent, "run", fake_agent_run)
+    monkeypatch.setattr(
+        agent_module, "agent_config_base_value", fake_agent_config_base_value
+    )
+
+    base_model = _SlowModel()
+    config = Config(config_base=tmp_path / ".kapybara")
+    results = await agent_run_batch(
+        model=base_model,
+        config=config,
+        memory_store=FolderMemoryStore(config.config_base / "memories"),
+        instructs=[Event(in_channel="test", content=str(i)) for i in range(6)],
+        max_concurrency=6,
+        max_model_requests=2,
+    )
+
+    assert all(isinstance(r, MemoryRecord) for r in results)
+    assert len({id(m) for m in seen_models}) == 1
+    assert isinstance(seen_models[0], ConcurrencyLimitedModel)
+    assert seen_models[0].wrapped is base_model
+    assert max_in_flight == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("max_model_requests", [0, -1])
+async def test_agent_run_batch_rejects_non_positive_max_model_requests(
+    tmp_path: Path, max_model_requests: int
+) -> None:
+    config = Config(config_base=tmp_path / ".kapybara")
+    with pytest.raises(ValueError, match="max_model_requests"):
+        await agent_run_batch(
+            model=TestModel(),
+            config=config,
+            memory_store=FolderMemoryStore(config.config_base / "memories"),
+            instructs=[],
+            max_model_requests=max_model_requests,
+        )
+
+
+def test_appended_messages_view_matches_list_append() -> None:
+    base = [
+        ModelRequest(parts=[UserPromptPart(content="q")]),
+        ModelResponse(parts=[TextPart(content="a")]),
+    ]
+    extra = ModelRequest(parts=[UserPromptPart(content="next")])
+    view = agent_module._AppendedMessages(base, extra)
+    expected = [*base, extra]
+
+    assert len(view) == 3
+    assert list(view) == expected
+    assert [view[i] for i in range(-3, 3)] == expected + expected
+    assert view[1:] == expected[1:]
+    assert list(reversed(view)) == expected[::-1]
+    with pytest.raises(IndexError):
+        view[3]
+    assert len(base) == 2
+
+
+@pytest.mark.anyio
+async def test_memory_select_splits_ancestors_by_depth(tmp_path: Path) -> None:
+    store = FolderMemoryStore(tmp_path / "memories")
+    chain: list[MemoryRecord] = []
+    for idx in range(5):
+        record = MemoryRecord(
+            in_channel="test",
+            input=f"i{idx}",
+            compacted=[f"c{idx}"],
+            output=f"o{idx}",
+            detailed=[],
+            created_at=datetime(2026, 1, 1, idx),
+            parents=[chain[-1].id_] if chain else [],
+        )
+        store.append(record)
+        chain.append(record)
+
+    all_recs, recent = await agent_module._memory_select(
+        store, [chain[-1].id_], compacted_level_num=1, raw_pair_level_num=3
+    )
+
+    assert [r.id_ for r in all_recs] == [r.id_ for r in chain[1:]]
+    assert recent == {chain[-1].id_, chain[-2].id_}
@@ -56,6 +56,9 @@ def test_channel_path_helpers() -> None:
         channel="telegram/chat/2/thread/2",
         prefix="telegram/chat/1",
     )
+    assert channel_has_prefix(channel="telegram/chat/1", prefix="telegram/chat/1")
+    assert not channel_has_prefix(channel="telegram/chat/10", prefix="telegram/chat/1")
+    assert iter_channel_prefixes("telegram") == ["telegram"]
     assert iter_channel_prefixes("telegram/chat/1") == [
         "telegram",
         "telegram/chat",
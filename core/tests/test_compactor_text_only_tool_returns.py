@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pytest
 from pydantic_ai.messages import (
     BinaryContent,
     FileUrl,
@@ -8,8 +9,9 @@ from pydantic_ai.messages import (
     ToolReturnPart,
     UserPromptPart,
 )
+from pydantic_ai.models.test import TestModel
 
-from k.agent.memory.compactor import print_detailed
+from k.agent.memory.compactor import print_detailed, run_compaction_batch
 
 
 class _DummyFileUrl(FileUrl):
@@ -162,3 +164,15 @@ def test_print_detailed_replaces_all_multimodal_user_prompt_parts_with_placehold
     rendered = print_detailed(detailed)
     assert "non-text user content omitted" not in rendered
     assert "https://example.com/only-user-image.png" in rendered
+
+
+@pytest.mark.anyio
+async def test_run_compaction_batch_returns_one_result_per_trace() -> None:
+    trace = [ModelRequest(parts=[UserPromptPart(content="hello")])]
+
+    results = await run_compaction_batch(
+        TestModel(), [trace, trace, trace], max_concurrency=2
+    )
+
+    assert len(results) == 3
+    assert all(isinstance(r, list) for r in results)
@@ -6,6 +6,7 @@ from types import SimpleNamespace
 from k.agent.core.agent import concat_skills_prompt
 from k.agent.core.entities import Event
 from k.agent.core.run import _extract_input_event_channel_root
+from k.agent.core.skills_md import concat_skills_md
 from k.config import Config
 
 
@@ -89,3 +90,18 @@ def test_concat_skills_prompt_skips_channel_skills_when_unknown_roots(
     prompt = concat_skills_prompt(ctx)  # type: ignore[arg-type]
     assert "<BasicSkills>" in prompt
     assert "<ChannelSkills>" not in prompt
+
+
+def test_concat_skills_md_reuses_prompt_until_a_skill_changes(tmp_path: Path) -> None:
+    config_base = tmp_path / ".kapybara"
+    _write_skill(config_base, group="core", name="a", content="first")
+
+    out = concat_skills_md(config_base)
+    assert concat_skills_md(config_base) is out
+
+    _write_skill(config_base, group="core", name="a", content="edited text")
+    _write_skill(config_base, group="meta", name="b", content="added")
+    updated = concat_skills_md(config_base)
+    assert "edited text" in updated
+    assert "added" in updated
+    assert "first" not in updated
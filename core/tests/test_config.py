@@ -3,7 +3,11 @@ from pathlib import Path
 import pytest
 
 from k.config import Config
-from k.runner_helpers.basic_os import BasicOSHelper, agent_config_base_value
+from k.runner_helpers.basic_os import (
+    _AGENT_CONFIG_BASE_CACHE,
+    BasicOSHelper,
+    agent_config_base_value,
+)
 
 
 def test_config_defaults_expand_to_home_paths(tmp_path: Path, monkeypatch) -> None:
@@ -135,6 +139,7 @@ async def test_agent_config_base_value_reads_shell_runtime_marker() -> None:
         async def interrupt(self, session_id: str) -> None:
             _ = session_id
 
+    _AGENT_CONFIG_BASE_CACHE.clear()
     helper = _FakeBasicOSHelper()
     shell_manager = _FakeShellManager()
 
@@ -147,3 +152,12 @@ async def test_agent_config_base_value_reads_shell_runtime_marker() -> None:
     assert "K_CONFIG_BASE" in helper.last_command
     assert shell_manager.command is not None
     assert shell_manager.command.startswith("wrapped:")
+
+    shell_manager.command = None
+    assert (
+        await agent_config_base_value(
+            basic_os_helper=helper, shell_manager=shell_manager
+        )
+        == "/runtime/.kapybara"
+    )
+    assert shell_manager.command is None
@@ -32,3 +32,15 @@ def test_memory_record_requires_in_channel() -> None:
                 "detailed": [],
             }
         )
+
+
+def test_event_meta_json_matches_dump_and_tracks_mutation() -> None:
+    event = Event(
+        in_channel="telegram/chat/1",
+        out_channel="telegram/chat/2",
+        content="x" * 100,
+    )
+    assert event.meta_json == event.model_dump_json(exclude={"content"})
+
+    event.out_channel = None
+    assert event.meta_json == event.model_dump_json(exclude={"content"})
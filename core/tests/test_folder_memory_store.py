@@ -125,6 +125,12 @@ def test_folder_store_get_parents_children_and_ancestors(tmp_path) -> None:
     assert store.get_ancestors(missing, level=0) == []
     assert store.get_ancestors(missing, level=1) == [child.id_]
     assert store.get_ancestors(missing, level=2) == [child.id_, parent.id_]
+    # Multi-start walk keeps the shortest depth from any start record.
+    assert store.get_ancestor_depths([missing, child.id_]) == {
+        child.id_: 1,
+        parent.id_: 1,
+    }
+    assert store.get_ancestor_depths([missing], level=1) == {child.id_: 1}
 
     # After reload, dangling child links are dropped.
     store.refresh()
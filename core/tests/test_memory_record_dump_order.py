@@ -22,3 +22,29 @@ def test_memory_record_dump_order_is_input_compacted_output() -> None:
     assert (
         dumped.index('"input"') < dumped.index('"compacted"') < dumped.index('"output"')
     )
+
+
+def test_memory_record_dumps_embed_meta_json() -> None:
+    parent = MemoryRecord(
+        in_channel="test",
+        created_at=datetime(2026, 2, 13, 2, 8, 9, tzinfo=UTC),
+        input="p",
+    )
+    r = MemoryRecord(
+        in_channel="test",
+        created_at=datetime(2026, 2, 13, 2, 8, 10, tzinfo=UTC),
+        parents=[parent.id_, parent.id_],
+        input="in",
+    )
+
+    meta = r.model_dump_json(include={"id_", "parents", "children"})
+    assert r.dump_raw_pair().startswith(f"<Meta>{meta}</Meta>")
+    assert r.dump_compated().startswith(f"<Meta>{meta}</Meta>")
+
+
+def test_memory_record_dump_compated_tracks_compacted_edits() -> None:
+    r = MemoryRecord(in_channel="test", input="in", compacted=["a", "it's"])
+    assert f"<Process>{['a', "it's"]}</Process>" in r.dump_compated()
+
+    r.compacted.append("b")
+    assert f"<Process>{['a', "it's", 'b']}</Process>" in r.dump_compated()
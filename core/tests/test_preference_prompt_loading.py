@@ -73,3 +73,20 @@ def test_load_preferences_prompt_omits_default_when_root_exists(
     assert "preferred root" in prompt
     assert f"Path: {default}" not in prompt
     assert "default root" not in prompt
+
+
+def test_load_preferences_prompt_picks_up_edited_file(tmp_path: Path) -> None:
+    pref_root = tmp_path / ".kapybara" / "preferences"
+    pref_root.mkdir(parents=True)
+    root_pref_path = pref_root / "PREFERENCES.md"
+    root_pref_path.write_text("original text", encoding="utf-8")
+
+    first = _load_preferences_prompt(in_channel="telegram", pref_root=pref_root)
+    assert _load_preferences_prompt(in_channel="telegram", pref_root=pref_root) is (
+        first
+    )
+
+    root_pref_path.write_text("second edit", encoding="utf-8")
+    second = _load_preferences_prompt(in_channel="telegram", pref_root=pref_root)
+    assert "second edit" in second
+    assert "original text" not in second
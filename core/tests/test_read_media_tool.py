@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import mimetypes
 from pathlib import Path
+from urllib.parse import urlparse
 
+import httpx
 import pytest
-from pydantic_ai.messages import ImageUrl
+from pydantic_ai.messages import DocumentUrl, ImageUrl
 
+from k.agent.core import media_tools
 from k.agent.core.agent import read_media
 
 
@@ -94,3 +99,115 @@ async def test_read_media_rejects_empty_strings() -> None:
     out = await read_media(["  "])
 
     assert out == "Invalid media spec: empty string"
+
+
+@pytest.mark.anyio
+async def test_read_media_sniffs_extensionless_urls_concurrently(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    in_flight = 0
+    peak = 0
+    types = {"/img": "image/png", "/doc": "application/pdf; charset=binary"}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, headers={"Content-Type": types[request.url.path]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(media_tools, "_sniff_client", lambda: client)
+
+    try:
+        out = await read_media(["https://example.com/img", "https://example.com/doc"])
+    finally:
+        await client.aclose()
+
+    assert isinstance(out, list)
+    assert [type(x) for x in out] == [ImageUrl, DocumentUrl]
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_sniff_client_is_shared_until_closed() -> None:
+    client = media_tools._sniff_client()
+    assert media_tools._sniff_client() is client
+
+    await media_tools.aclose_media_client()
+    assert client.is_closed
+    replacement = media_tools._sniff_client()
+    assert replacement is not client
+    await media_tools.aclose_media_client()
+
+
+def _reference_guess_url_kind(
+    url: str,
+) -> tuple[bool, media_tools.UrlMediaKind | None]:
+    guessed_type, _ = mimetypes.guess_type(urlparse(url).path)
+    if guessed_type:
+        if media_tools._is_generic_binary_media_type(guessed_type):
+            return True, None
+        kind = media_tools._url_kind_from_media_type(guessed_type)
+        if kind:
+            return True, kind
+    return False, None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/a.jpg",
+        "https://example.com/A.JPG",
+        "https://example.com/a.PDF",
+        "https://example.com/.jpg",
+        "https://example.com/..jpg",
+        "https://example.com/a..jpg",
+        "https://example.com/a.b.c.mp3",
+        "https://example.com/a.tar.gz",
+        "https://example.com/a.tgz",
+        "https://example.com/a.svgz",
+        "https://example.com/a.txt.gz",
+        "https://example.com/a.bin",
+        "https://example.com/a.unknownext",
+        "https://example.com/a.",
+        "https://example.com/a.png?x=1.pdf",
+        "https://example.com/a#b.pdf",
+        "https://example.com/a.mp4;p=1",
+        "https://example.com/d.jpg/file",
+        "https://example.com/",
+        "https://example.com",
+    ],
+)
+def test_guess_url_kind_matches_mimetypes_on_url_path(url: str) -> None:
+    assert media_tools._guess_url_kind(url) == _reference_guess_url_kind(url)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "http://a",
+        "HTTPS://a",
+        "Http://a/b",
+        "https://u@h",
+        "http://[::1]/",
+        "https://a:8080",
+        "https://\ta",
+        "https://",
+        "https:///p",
+        "https://?q",
+        "https://#f",
+        "ftp://a",
+        "http:/a",
+        "http:a",
+        "http//a",
+        "httpss://a",
+        "example.com/x",
+        "/local/p",
+    ],
+)
+def test_is_http_url_matches_urlparse(value: str) -> None:
+    parsed = urlparse(value)
+    expected = parsed.scheme in {"http", "https"} and bool(parsed.netloc)
+    assert media_tools._is_http_url(value) is expected
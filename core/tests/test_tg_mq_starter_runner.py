@@ -0,0 +1,261 @@
+import json
+import logging
+import time
+from typing import Any
+
+import pytest
+from kapy_collections.starters.telegram_mq.runner import (
+    _MAX_PENDING_UPDATES,
+    _accept_updates,
+    _evict_oldest_pending,
+    _handle_deliveries_individually,
+    _mq_to_update,
+    _parse_amqp_bodies,
+)
+
+
+def _update(update_id: Any, *, sender_id: int = 42) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": sender_id, "first_name": "Alice"},
+            "chat": {"id": 99, "type": "supergroup"},
+            "text": f"m{update_id}",
+        },
+    }
+
+
+def test_accept_updates_sorts_out_of_order_batch() -> None:
+    pending: dict[int, dict[str, Any]] = {}
+    accepted, last = _accept_updates(
+        [_update(12), _update(10), _update(11)],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=None,
+        bot_user_id=None,
+    )
+
+    assert [u["update_id"] for u in accepted] == [10, 11, 12]
+    assert list(pending) == [10, 11, 12]
+    assert last == 12
+
+
+def test_accept_updates_drops_duplicates_and_already_consumed_ids() -> None:
+    pending: dict[int, dict[str, Any]] = {5: _update(5)}
+    accepted, last = _accept_updates(
+        [_update(7), _update(5), _update(6), _update(7), _update("8")],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=5,
+        bot_user_id=None,
+    )
+
+    assert [u["update_id"] for u in accepted] == [6, 7]
+    assert list(pending) == [5, 6, 7]
+    assert last == 7
+
+
+def test_accept_updates_single_delivery_fast_path() -> None:
+    pending: dict[int, dict[str, Any]] = {}
+    accepted, last = _accept_updates(
+        [_update(3)],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=2,
+        bot_user_id=None,
+    )
+    assert [u["update_id"] for u in accepted] == [3]
+    assert last == 3
+
+    for stale in ([_update(3)], [_update("4")]):
+        accepted, last = _accept_updates(
+            stale,
+            pending_updates_by_id=pending,
+            last_consumed_update_id=last,
+            bot_user_id=None,
+        )
+        assert accepted == []
+        assert last == 3
+
+    topic = {"update_id": 4, "message": {"forum_topic_created": {"name": "t"}}}
+    accepted, last = _accept_updates(
+        [topic],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=last,
+        bot_user_id=None,
+    )
+    assert accepted == []
+    assert last == 3
+    assert list(pending) == [3]
+
+
+def test_accept_updates_skips_bot_authored_updates() -> None:
+    pending: dict[int, dict[str, Any]] = {}
+    accepted, last = _accept_updates(
+        [_update(2), _update(3, sender_id=7), _update(1)],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=None,
+        bot_user_id=7,
+    )
+
+    assert [u["update_id"] for u in accepted] == [1, 2]
+    assert list(pending) == [1, 2]
+    # The cursor only advances to the last accepted id.
+    assert last == 2
+
+
+def test_accept_updates_keeps_cursor_when_only_bot_updates_arrive() -> None:
+    pending: dict[int, dict[str, Any]] = {}
+    accepted, last = _accept_updates(
+        [_update(9, sender_id=7)],
+        pending_updates_by_id=pending,
+        last_consumed_update_id=8,
+        bot_user_id=7,
+    )
+
+    assert accepted == []
+    assert pending == {}
+    assert last == 8
+
+
+def test_evict_oldest_pending_keeps_newest_updates() -> None:
+    pending: dict[int, dict[str, Any]] = {}
+    last = None
+    for start in range(0, _MAX_PENDING_UPDATES + 30, 10):
+        _, last = _accept_updates(
+            [_update(i) for i in reversed(range(start, start + 10))],
+            pending_updates_by_id=pending,
+            last_consumed_update_id=last,
+            bot_user_id=None,
+        )
+
+    _evict_oldest_pending(pending)
+
+    assert len(pending) == _MAX_PENDING_UPDATES
+    assert list(pending) == list(range(30, _MAX_PENDING_UPDATES + 30))
+
+
+def test_evict_oldest_pending_is_noop_below_limit() -> None:
+    pending = {1: _update(1), 2: _update(2)}
+    _evict_oldest_pending(pending, max_pending=2)
+    assert list(pending) == [1, 2]
+
+
+def _mq_message(**overrides: Any) -> dict[str, Any]:
+    msg: dict[str, Any] = {
+        "chat_id": -100123,
+        "message_id": 77,
+        "sender_id": 42,
+        "sender_username": "alice",
+        "sender_fullname": "Alice",
+        "text": "hi",
+        "date": "2026-01-02T03:04:05Z",
+    }
+    msg.update(overrides)
+    return msg
+
+
+@pytest.mark.parametrize(
+    ("date", "expected"),
+    [
+        ("2026-01-02T03:04:05Z", 1767323045),
+        ("2026-01-02T03:04:05+00:00", 1767323045),
+        ("2026-01-02T11:04:05+08:00", 1767323045),
+    ],
+)
+def test_mq_to_update_parses_iso_dates(date: str, expected: int) -> None:
+    update = _mq_to_update(_mq_message(date=date))
+
+    assert update["update_id"] == 77
+    assert update["message"]["date"] == expected
+    assert update["message"]["chat"] == {"id": -100123, "type": "supergroup"}
+
+
+@pytest.mark.parametrize("date", [None, 1767323045, "not-a-date", ""])
+def test_mq_to_update_falls_back_to_now_for_bad_dates(date: Any) -> None:
+    msg = _mq_message(date=date)
+    if date is None:
+        del msg["date"]
+
+    before = int(time.time())
+    ts = _mq_to_update(msg)["message"]["date"]
+    assert before <= ts <= int(time.time())
+
+
+def test_mq_to_update_maps_reply() -> None:
+    update = _mq_to_update(
+        _mq_message(
+            is_reply=True,
+            reply_to={"message_id": 5, "sender_id": 9, "text": "earlier"},
+        )
+    )
+
+    reply = update["message"]["reply_to_message"]
+    assert reply["message_id"] == 5
+    assert reply["from"]["id"] == 9
+    assert reply["text"] == "earlier"
+
+
+def test_parse_amqp_bodies_skips_non_dict_reply_to(caplog) -> None:
+    bodies = [
+        json.dumps(_mq_message(message_id=1, is_reply=True, reply_to="oops")).encode(),
+        json.dumps(_mq_message(message_id=2)).encode(),
+        b"[1, 2]",
+        b"{not json",
+        json.dumps({"update_id": 3, "message": {"text": "raw"}}).encode(),
+    ]
+
+    with caplog.at_level(logging.WARNING):
+        updates = _parse_amqp_bodies(bodies)
+
+    assert [u["update_id"] for u in updates] == [2, 3]
+    failures = [
+        r for r in caplog.records if "Failed to parse AMQP message" in r.getMessage()
+    ]
+    assert len(failures) == 3
+
+
+class _FakeDelivery:
+    def __init__(self, delivery_tag: int, body: bytes) -> None:
+        self.delivery_tag = delivery_tag
+        self.body = body
+        self.settled: list[str] = []
+
+    async def ack(self, multiple: bool = False) -> None:
+        assert not multiple
+        self.settled.append("ack")
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.settled.append(f"reject(requeue={requeue})")
+
+
+@pytest.mark.anyio
+async def test_handle_deliveries_individually_rejects_only_poison() -> None:
+    batch = [_FakeDelivery(tag, b"%d" % tag) for tag in (1, 2, 3)]
+    handled: list[list[bytes]] = []
+
+    async def handle_bodies(bodies: list[bytes]) -> None:
+        if bodies == [b"2"]:
+            raise RuntimeError("poison")
+        handled.append(bodies)
+
+    error = await _handle_deliveries_individually(batch, handle_bodies)  # type: ignore[arg-type]
+
+    assert isinstance(error, RuntimeError)
+    assert handled == [[b"1"], [b"3"]]
+    assert [d.settled for d in batch] == [
+        ["ack"],
+        ["reject(requeue=False)"],
+        ["ack"],
+    ]
+
+
+@pytest.mark.anyio
+async def test_handle_deliveries_individually_acks_all_after_transient_failure() -> (
+    None
+):
+    batch = [_FakeDelivery(tag, b"x") for tag in (1, 2)]
+
+    async def handle_bodies(bodies: list[bytes]) -> None:
+        _ = bodies
+
+    assert await _handle_deliveries_individually(batch, handle_bodies) is None  # type: ignore[arg-type]
+    assert [d.settled for d in batch] == [["ack"], ["ack"]]
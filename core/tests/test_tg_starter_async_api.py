@@ -1,56 +1,151 @@
+import urllib.parse
+
+import httpx
 import pytest
-from kapy_collections.starters.telegram import TelegramBotApi
+from kapy_collections.starters.telegram import TelegramBotApi, TelegramBotApiError
+from kapy_collections.starters.telegram.api import _encode_form, _read_bounded
+
+
+def _install_mock_client(api: TelegramBotApi, handler) -> None:
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
 
 
 @pytest.mark.anyio
-async def test_telegram_bot_api_async_wrappers_call_sync_impl(monkeypatch) -> None:
+async def test_telegram_bot_api_async_methods_share_pooled_client() -> None:
     api = TelegramBotApi(token="test-token")
+    seen: list[httpx.Request] = []
 
-    got_me_called = False
-    got_updates: tuple[int | None, int] | None = None
-    got_send_message: tuple[int, str, int | None, int | None, str] | None = None
-
-    def fake_get_me_sync(self):
-        nonlocal got_me_called
-        got_me_called = True
-        return {"id": 123, "username": "MyBot"}
-
-    def fake_get_updates_sync(self, *, offset: int | None, timeout_seconds: int):
-        nonlocal got_updates
-        got_updates = (offset, timeout_seconds)
-        return [{"update_id": 1, "message": {"text": "hi"}}]
-
-    def fake_send_message_sync(
-        self,
-        *,
-        chat_id: int,
-        text: str,
-        reply_to_message_id: int | None = None,
-        message_thread_id: int | None = None,
-        parse_mode: str = "HTML",
-    ):
-        nonlocal got_send_message
-        got_send_message = (
-            chat_id,
-            text,
-            reply_to_message_id,
-            message_thread_id,
-            parse_mode,
-        )
-        return {"message_id": 999}
-
-    monkeypatch.setattr(TelegramBotApi, "_get_me_sync", fake_get_me_sync)
-    monkeypatch.setattr(TelegramBotApi, "_get_updates_sync", fake_get_updates_sync)
-    monkeypatch.setattr(TelegramBotApi, "_send_message_sync", fake_send_message_sync)
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        method = request.url.path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            return httpx.Response(
+                200, json={"ok": True, "result": {"id": 123, "username": "MyBot"}}
+            )
+        if method == "getUpdates":
+            return httpx.Response(
+                200,
+                json={
+                    "ok": True,
+                    "result": [{"update_id": 1, "message": {"text": "hi"}}, "junk"],
+                },
+            )
+        if method == "sendMessage":
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": 999}})
+        return httpx.Response(404)
+
+    _install_mock_client(api, handler)
+    client = api._client
 
     me = await api.get_me()
-    assert got_me_called is True
     assert me["id"] == 123
 
     updates = await api.get_updates(offset=5, timeout_seconds=12)
-    assert got_updates == (5, 12)
-    assert updates[0]["update_id"] == 1
+    assert updates == [{"update_id": 1, "message": {"text": "hi"}}]
+    assert seen[1].url.path == "/bottest-token/getUpdates"
+    assert seen[1].url.params["offset"] == "5"
+    assert seen[1].url.params["timeout"] == "12"
+    assert seen[1].url.params["limit"] == "100"
 
-    msg = await api.send_message(chat_id=42, text="hello", reply_to_message_id=7)
-    assert got_send_message == (42, "hello", 7, None, "HTML")
+    await api.get_updates(offset=None, timeout_seconds=30)
+    assert "offset" not in seen[2].url.params
+
+    msg = await api.send_message(chat_id=42, text="hello\x00", reply_to_message_id=7)
     assert msg["message_id"] == 999
+    form = dict(httpx.QueryParams(seen[3].content.decode()))
+    assert form == {
+        "chat_id": "42",
+        "text": "hello\ufffd",
+        "parse_mode": "HTML",
+        "reply_to_message_id": "7",
+    }
+
+    assert api._client is client
+    await api.aclose()
+    assert api._client is None
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_telegram_bot_api_raises_on_non_ok_payload() -> None:
+    api = TelegramBotApi(token="test-token")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"ok": False, "description": "Unauthorized"})
+
+    _install_mock_client(api, handler)
+    with pytest.raises(TelegramBotApiError, match="getMe failed: Unauthorized"):
+        await api.get_me()
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_telegram_bot_api_checks_result_type_and_http_status() -> None:
+    api = TelegramBotApi(token="test-token")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/getUpdates"):
+            return httpx.Response(200, json={"ok": True, "result": {}})
+        return httpx.Response(502, content=b"bad gateway")
+
+    _install_mock_client(api, handler)
+    with pytest.raises(
+        TelegramBotApiError, match="getUpdates failed: missing result list"
+    ):
+        await api.get_updates(offset=None, timeout_seconds=1)
+    with pytest.raises(TelegramBotApiError, match="sendMessage failed: HTTP 502"):
+        await api.send_message(chat_id=1, text="x")
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_read_bounded_rejects_oversized_bodies() -> None:
+    small = httpx.Response(200, content=b'{"ok": true}')
+    assert await _read_bounded(small, method="getUpdates", max_bytes=64) == bytearray(
+        b'{"ok": true}'
+    )
+
+    big = httpx.Response(200, content=b"x" * 65)
+    with pytest.raises(
+        TelegramBotApiError, match="getUpdates failed: response too large"
+    ):
+        await _read_bounded(big, method="getUpdates", max_bytes=64)
+
+
+def test_encode_form_matches_urlencode() -> None:
+    data = {"chat_id": -100123, "text": "a b&c=d/é\n😀+", "parse_mode": "HTML"}
+
+    assert _encode_form(data) == urllib.parse.urlencode(
+        {k: str(v) for k, v in data.items()}, quote_via=urllib.parse.quote
+    ).encode("ascii")
+
+
+@pytest.mark.anyio
+async def test_get_updates_reuses_cached_method_url(monkeypatch) -> None:
+    api = TelegramBotApi(token="test-token")
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True, "result": []})
+
+    _install_mock_client(api, handler)
+    await api.get_updates(offset=1, timeout_seconds=5)
+    cached = api._method_urls["getUpdates"]
+
+    parsed: list[str] = []
+    real_urlparse = httpx._urls.urlparse
+
+    def counting_urlparse(url: str = "", **kwargs):
+        parsed.append(url)
+        return real_urlparse(url, **kwargs)
+
+    monkeypatch.setattr(httpx._urls, "urlparse", counting_urlparse)
+    await api.get_updates(offset=2, timeout_seconds=5)
+
+    # Only the query is re-encoded; the token URL is not parsed from a string.
+    assert all("getUpdates" not in url for url in parsed)
+    assert api._method_urls["getUpdates"] is cached
+    assert seen[1].url.path == "/bottest-token/getUpdates"
+    assert dict(seen[1].url.params) == {"timeout": "5", "limit": "100", "offset": "2"}
+    await api.aclose()
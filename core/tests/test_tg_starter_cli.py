@@ -0,0 +1,52 @@
+import kapy_collections.starters._observability as observability
+import logfire
+import pytest
+
+
+def test_init_observability_runs_once(monkeypatch) -> None:
+    calls: list[str] = []
+
+    monkeypatch.setattr(observability, "_observability_initialized", False)
+    monkeypatch.setattr(logfire, "configure", lambda: calls.append("configure"))
+    monkeypatch.setattr(
+        logfire, "instrument_pydantic_ai", lambda: calls.append("instrument")
+    )
+    monkeypatch.setattr(
+        observability.logging,
+        "basicConfig",
+        lambda **_kwargs: calls.append("basicConfig"),
+    )
+
+    observability.init_observability()
+    observability.init_observability()
+
+    assert calls == ["configure", "instrument", "basicConfig"]
+
+
+def test_init_observability_retries_after_failure(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def failing_configure() -> None:
+        calls.append("configure")
+        raise RuntimeError("no token")
+
+    monkeypatch.setattr(observability, "_observability_initialized", False)
+    monkeypatch.setattr(logfire, "configure", failing_configure)
+    monkeypatch.setattr(
+        logfire, "instrument_pydantic_ai", lambda: calls.append("instrument")
+    )
+    monkeypatch.setattr(
+        observability.logging,
+        "basicConfig",
+        lambda **_kwargs: calls.append("basicConfig"),
+    )
+
+    with pytest.raises(RuntimeError, match="no token"):
+        observability.init_observability()
+    assert observability._observability_initialized is False
+
+    monkeypatch.setattr(logfire, "configure", lambda: calls.append("configure"))
+    observability.init_observability()
+
+    assert calls == ["configure", "configure", "instrument", "basicConfig"]
+    assert observability._observability_initialized is True
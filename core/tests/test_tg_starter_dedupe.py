@@ -1,6 +1,9 @@
 from kapy_collections.starters.telegram import (
     extract_update_id,
+    filter_non_forum_topic_created_updates,
     filter_unseen_updates,
+    filter_updates_in_time_window,
+    filter_updates_pipeline,
 )
 
 
@@ -21,3 +24,32 @@ def test_filter_unseen_updates_skips_processed_and_duplicates() -> None:
 
     res = filter_unseen_updates(updates, last_processed_update_id=9)
     assert [u["update_id"] for u in res] == [10, 11]
+
+
+def test_filter_updates_pipeline_matches_chained_filters() -> None:
+    updates = [
+        {"update_id": 9, "message": {"text": "old", "date": 1000}},
+        {"update_id": 10, "message": {"text": "new-1", "date": 1000}},
+        {"update_id": 10, "message": {"text": "dup", "date": 1000}},
+        {"update_id": 11, "message": {"forum_topic_created": {}, "date": 1000}},
+        {"update_id": 12, "message": {"text": "stale", "date": 100}},
+        {"update_id": 13, "callback_query": {"data": "no-date"}},
+        {"update_id": "14", "message": {"text": "bad-id"}},
+    ]
+
+    unseen = filter_unseen_updates(updates, last_processed_update_id=9)
+    chained, dropped = filter_non_forum_topic_created_updates(unseen)
+    assert filter_updates_pipeline(updates, last_processed_update_id=9) == (
+        chained,
+        dropped,
+    )
+
+    windowed = filter_updates_in_time_window(
+        chained, now_unix_seconds=1050, window_seconds=60
+    )
+    kept, dropped = filter_updates_pipeline(
+        updates, last_processed_update_id=9, now_unix_seconds=1050, window_seconds=60
+    )
+    assert kept == windowed
+    assert [u["update_id"] for u in kept] == [10, 13]
+    assert dropped == 1
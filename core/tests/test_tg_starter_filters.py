@@ -10,6 +10,7 @@ from kapy_collections.starters.telegram import (
     extract_chat_type,
     filter_non_forum_topic_created_updates,
     group_updates_by_chat_id,
+    trigger_flags_for_updates,
     update_is_forum_topic_created,
     update_is_private_chat,
     update_is_reply_to_bot,
@@ -31,10 +32,16 @@ def test_update_matches_keyword_is_case_insensitive() -> None:
     assert update_matches_keyword(update, keyword="world") is True
 
 
-def test_update_matches_keyword_falls_back_to_json() -> None:
+def test_update_matches_keyword_falls_back_to_string_values() -> None:
     update = {"update_id": 1, "custom": {"payload": "needle"}}
     assert update_matches_keyword(update, keyword="needle") is True
 
+    nested = {"update_id": 1, "custom": {"items": [{"note": "Deep NEEDLE"}]}}
+    assert update_matches_keyword(nested, keyword="needle") is True
+    # Only string values are searched, not keys or numbers.
+    assert update_matches_keyword(nested, keyword="items") is False
+    assert update_matches_keyword(nested, keyword="1") is False
+
 
 def test_extract_chat_id() -> None:
     assert extract_chat_id({"message": {"chat": {"id": 123}}}) == 123
@@ -42,6 +49,8 @@ def test_extract_chat_id() -> None:
         extract_chat_id({"callback_query": {"message": {"chat": {"id": -99}}}}) == -99
     )
     assert extract_chat_id({"update_id": 1}) is None
+    # bool is an int subclass but never a valid chat id.
+    assert extract_chat_id({"message": {"chat": {"id": True}}}) is None
 
 
 def test_extract_chat_type_and_private_detection() -> None:
@@ -71,6 +80,13 @@ def test_update_is_forum_topic_created() -> None:
     }
     assert update_is_forum_topic_created(service_update) is True
     assert update_is_forum_topic_created(normal_update) is False
+    assert (
+        update_is_forum_topic_created(
+            {"callback_query": {"message": {"forum_topic_created": {}}}}
+        )
+        is True
+    )
+    assert update_is_forum_topic_created({"poll": {"forum_topic_created": {}}}) is False
 
 
 def test_filter_non_forum_topic_created_updates_drops_service_updates() -> None:
@@ -135,6 +151,20 @@ def test_chat_group_is_triggered_by_reply() -> None:
     )
 
 
+def test_trigger_flags_for_updates_reports_each_condition() -> None:
+    updates = [
+        {"message": {"chat": {"id": 1, "type": "group"}, "text": "ping @mybot"}},
+        {"message": {"chat": {"id": 2, "type": "private"}, "text": "plain"}},
+        {"callback_query": {"id": "q", "from": {"id": 7}, "game_short_name": "Kw"}},
+    ]
+    assert trigger_flags_for_updates(
+        updates, keyword=" kw ", bot_user_id=123, bot_username="MyBot"
+    ) == {"keyword": True, "private": True, "mention": True, "reply": False}
+    assert trigger_flags_for_updates(
+        updates, keyword="  ", bot_user_id=None, bot_username=None
+    ) == {"keyword": False, "private": True, "mention": False, "reply": False}
+
+
 def test_dispatch_groups_for_batch_dispatches_all_groups_when_any_triggers() -> None:
     updates = [
         {"update_id": 1, "message": {"chat": {"id": 1, "type": "group"}, "text": "hi"}},
@@ -222,6 +252,10 @@ def test_dispatch_groups_for_batch_returns_none_when_no_trigger() -> None:
 def test_expand_chat_id_watchlist_adds_supergroup_variants() -> None:
     assert _expand_chat_id_watchlist({-1886218691}) == {-1886218691, -1001886218691}
     assert _expand_chat_id_watchlist({-1001886218691}) == {-1886218691, -1001886218691}
+    # Digits after the prefix keep their value even with leading zeros.
+    assert _expand_chat_id_watchlist({-1000123}) == {-1000123, -123}
+    # A bare `-100` has nothing after the prefix, so it gets one prepended.
+    assert _expand_chat_id_watchlist({-100, 42}) == {-100, -100100, 42}
 
 
 def test_group_updates_by_chat_id_groups_and_keeps_unknown_when_no_allowlist() -> None:
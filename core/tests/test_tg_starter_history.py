@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import anyio
 import pytest
 from kapy_collections.starters.telegram import (
     append_updates_jsonl,
@@ -14,6 +15,13 @@ from kapy_collections.starters.telegram.runner import (
     overlay_dispatch_groups_with_recent,
     update_last_trigger_update_id_by_chat,
 )
+from kapy_collections.starters.telegram_mq.runner import (
+    _AppendUpdatesJob,
+    _flush_persist_writer,
+    _PersistJob,
+    _run_persist_writer,
+    _SaveTriggerCursorJob,
+)
 
 
 def test_append_and_load_recent_updates_grouped_by_chat_id(tmp_path) -> None:
@@ -209,3 +217,29 @@ def test_cap_dispatch_groups_per_chat_rejects_non_positive_limit() -> None:
             {1: [{"update_id": 1, "message": {"chat": {"id": 1}}}]},
             per_chat_limit=0,
         )
+
+
+@pytest.mark.anyio
+async def test_persist_writer_coalesces_appends_and_keeps_latest_cursor(
+    tmp_path,
+) -> None:
+    store = tmp_path / "updates.jsonl"
+    cursor = trigger_cursor_state_path_for_updates_store(store)
+    send, receive = anyio.create_memory_object_stream[_PersistJob](16)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(_run_persist_writer, receive)
+        for update_id in (1, 2):
+            await send.send(
+                _AppendUpdatesJob(
+                    store,
+                    [{"update_id": update_id, "message": {"chat": {"id": 7}}}],
+                )
+            )
+        await send.send(_SaveTriggerCursorJob(cursor, {7: 1}))
+        await send.send(_SaveTriggerCursorJob(cursor, {7: 2}))
+        await _flush_persist_writer(send)
+
+        recent = load_recent_updates_grouped_by_chat_id(store, per_chat_limit=10)
+        assert [u["update_id"] for u in recent[7]] == [1, 2]
+        assert load_last_trigger_update_id_by_chat(cursor) == {7: 2}
+        await send.aclose()
@@ -0,0 +1,34 @@
+import datetime
+
+import pytest
+from kapy_collections.starters.telegram import _format_unix_seconds, _parse_timezone
+
+
+def test_parse_timezone_offsets_and_names() -> None:
+    assert _parse_timezone("UTC+8").utcoffset(None) == datetime.timedelta(hours=8)
+    assert _parse_timezone("-0530").utcoffset(None) == -datetime.timedelta(
+        hours=5, minutes=30
+    )
+    assert _parse_timezone(" z ") is datetime.UTC
+    assert _parse_timezone("UTC+8") is _parse_timezone("UTC+8")
+    with pytest.raises(ValueError):
+        _parse_timezone("UTC+24")
+
+
+@pytest.mark.parametrize(
+    "tz",
+    [
+        datetime.UTC,
+        datetime.timezone(datetime.timedelta(hours=8)),
+        datetime.timezone(-datetime.timedelta(hours=5, minutes=30)),
+        datetime.timezone(datetime.timedelta(seconds=37)),
+    ],
+)
+@pytest.mark.parametrize("unix_seconds", [0, 86_399, 1_700_000_000, -1])
+def test_format_unix_seconds_matches_isoformat(
+    tz: datetime.tzinfo, unix_seconds: int
+) -> None:
+    expected = datetime.datetime.fromtimestamp(unix_seconds, tz=tz).isoformat(
+        timespec="seconds"
+    )
+    assert _format_unix_seconds(unix_seconds, tz=tz) == expected
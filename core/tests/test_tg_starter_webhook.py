@@ -0,0 +1,45 @@
+from functools import partial
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+from anyio.abc import SocketAttribute
+from kapy_collections.starters.telegram.webhook import (
+    _handle_webhook_connection,
+    _receive_update_batch,
+)
+
+
+@pytest.mark.anyio
+async def test_webhook_receiver_queues_authenticated_updates() -> None:
+    send, receive = anyio.create_memory_object_stream[dict[str, Any]](10)
+    listener = await anyio.create_tcp_listener(local_host="127.0.0.1", local_port=0)
+    port = listener.extra(SocketAttribute.local_port)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(
+            listener.serve,
+            partial(_handle_webhook_connection, secret_token="s3cret", send=send),
+        )
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+            ok_1 = await client.post("/hook", json={"update_id": 1}, headers=headers)
+            ok_2 = await client.post("/hook", json={"update_id": 2}, headers=headers)
+            bad_secret = await client.post(
+                "/hook",
+                json={"update_id": 3},
+                headers={"X-Telegram-Bot-Api-Secret-Token": "nope"},
+            )
+            not_json = await client.post("/hook", content=b"{", headers=headers)
+            wrong_method = await client.get("/hook", headers=headers)
+
+        assert ok_1.status_code == 200
+        assert ok_2.status_code == 200
+        assert bad_secret.status_code == 401
+        assert not_json.status_code == 400
+        assert wrong_method.status_code == 405
+
+        batch = await _receive_update_batch(receive)
+        assert batch == [{"update_id": 1}, {"update_id": 2}]
+        tg.cancel_scope.cancel()